@@ -377,3 +377,13 @@ def test_dataset_config_can_generate_schema():
         tmp_file = Path(tmpdir) / "dataset-schema.json"
         DatasetConfig.generate_schema(tmp_file)
         assert tmp_file.exists()
+
+
+def test_ureg_is_reexported():
+    import pint
+
+    from tsdat.config.variables import ureg
+    from tsdat.config.variables.ureg import get_ureg
+
+    assert isinstance(ureg, pint.UnitRegistry)
+    assert ureg is get_ureg()
@@ -1,4 +1,5 @@
 import re
+import shutil
 import tempfile
 from pathlib import Path
 from typing import Any, Dict
@@ -7,7 +8,12 @@ import pytest
 
 from tsdat import ConfigError
 from tsdat.config.dataset import DatasetConfig
-from tsdat.config.pipeline import PipelineConfig
+from tsdat.config.pipeline import (
+    PipelineConfig,
+    get_pipeline_cache_key,
+    load_pipeline,
+    pipeline_cache,
+)
 from tsdat.config.quality import QualityConfig
 from tsdat.config.retriever import RetrieverConfig
 from tsdat.config.storage import StorageConfig
@@ -59,3 +65,48 @@ def test_pipeline_config_can_generate_schema():
         tmp_file = Path(tmpdir) / "pipeline-schema.json"
         PipelineConfig.generate_schema(tmp_file)
         assert tmp_file.exists()
+
+
+def test_load_pipeline_reuses_cached_pipeline(tmp_path: Path):
+    config_dir = tmp_path / "yaml"
+    shutil.copytree("test/config/yaml", config_dir)
+    config_path = config_dir / "pipeline.yaml"
+    cache_dir = tmp_path / "cache"
+
+    pipeline = load_pipeline(config_path, cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("*.pkl"))) == 1
+
+    cached = load_pipeline(config_path, cache_dir=cache_dir)
+    assert cached is not pipeline
+    assert model_to_dict(cached.dataset_config) == model_to_dict(  # type: ignore
+        pipeline.dataset_config  # type: ignore
+    )
+
+    # Editing a linked config file invalidates the cached pipeline
+    key = get_pipeline_cache_key(config_path)
+    dataset_path = config_dir / "dataset.yaml"
+    dataset_path.write_text(
+        dataset_path.read_text().replace("title: title", "title: new title")
+    )
+    assert get_pipeline_cache_key(config_path) != key
+    reloaded = load_pipeline(config_path, cache_dir=cache_dir)
+    assert reloaded.dataset_config.attrs.title == "new title"  # type: ignore
+    assert len(list(cache_dir.glob("*.pkl"))) == 2
+
+
+def test_load_pipeline_cache_is_opt_in_and_bounded(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    config_path = Path("test/config/yaml/pipeline.yaml")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    cache_dir = tmp_path / "tsdat" / "pipelines"
+
+    monkeypatch.delenv("TSDAT_PIPELINE_CACHE", raising=False)
+    load_pipeline(config_path)
+    assert not cache_dir.exists()
+
+    monkeypatch.setenv("TSDAT_PIPELINE_CACHE", "on")
+    monkeypatch.setattr(pipeline_cache, "MAX_CACHED_PIPELINES", 2)
+    for title in ("a", "b", "c"):
+        load_pipeline(config_path, {"/dataset/overrides/~1attrs~1title": title})
+    assert len(list(cache_dir.glob("*.pkl"))) == 2
@@ -1,9 +1,13 @@
 import os
+import tarfile
 import tempfile
+import zipfile
 from datetime import datetime
+from io import BytesIO
 from pathlib import Path
 from typing import Any, Dict, Type
 
+import numpy as np
 import pandas as pd
 import pytest
 import xarray as xr
@@ -18,6 +22,7 @@ from tsdat.io.handlers import (
     ZarrHandler,
 )
 from tsdat.io.readers import (
+    BinaryRecordReader,
     CSVReader,
     NetCDFReader,
     ParquetReader,
@@ -81,6 +86,24 @@ def test_file_readers(
     assert_close(dataset, sample_dataset, check_fill_value=False)
 
 
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_csv_reader_projects_columns(engine: str):
+    reader = CSVReader(parameters={"read_csv_kwargs": {"engine": engine}})
+    variables = {"First Data Var": "float32", "missing": None}
+    dataset = reader.read_subset("test/io/data/input.csv", variables)
+    assert list(dataset.data_vars) == ["First Data Var"]
+    assert dataset["First Data Var"].dtype == "float32"
+
+    reader.parameters.read_csv_kwargs["index_col"] = "timestamp"
+    dataset = reader.read_subset("test/io/data/input.csv", variables)
+    assert list(dataset.data_vars) == ["First Data Var"]
+    assert "timestamp" in dataset.coords
+
+    reader = CSVReader(parameters={"project_columns": False})
+    dataset = reader.read_subset("test/io/data/input.csv", {"timestamp": None})
+    assert list(dataset.data_vars) == ["timestamp", "First Data Var"]
+
+
 def test_tar_reader(sample_dataset: xr.Dataset):
     params = {
         "read_tar_kwargs": {"mode": "r:gz"},
@@ -109,6 +132,98 @@ def test_zip_reader(sample_dataset: xr.Dataset):
     assert_close(dataset["input.nc"], expected, check_fill_value=False)
 
 
+def test_netcdf_reader_drops_unused_variables():
+    reader = NetCDFReader()
+    dataset = reader.read_subset("test/io/data/input.nc", {"First Data Var": None})
+    assert set(dataset.variables) == {"index", "First Data Var"}
+
+    # Unknown variables don't strip the dataset
+    dataset = reader.read_subset("test/io/data/input.nc", {"missing": None})
+    assert "timestamp" in dataset
+
+
+def test_netcdf_reader_auto_engine():
+    pytest.importorskip("h5netcdf")
+    reader = NetCDFReader(parameters={"engine": "auto"})
+    assert reader._select_engine("test/io/data/input.nc") == "h5netcdf"
+    assert reader._select_engine("test/io/data/input.csv") is None
+    dataset = reader.read("test/io/data/input.nc")
+    assert "First Data Var" in dataset
+
+
+def test_binary_record_reader(tmp_path: Path):
+    dtype = np.dtype(
+        {
+            "names": ["sync", "seconds", "counts"],
+            "formats": [">u2", ">f8", (">u2", (2,))],
+            "offsets": [0, 4, 12],
+            "itemsize": 20,
+        }
+    )
+    records = np.zeros(3, dtype=dtype)
+    records["sync"] = [0xA55A, 0xA55A, 0]
+    records["seconds"] = [0.5, 1.5, 2.5]
+    records["counts"] = [[1, 2], [3, 4], [5, 6]]
+    filepath = tmp_path / "records.bin"
+    filepath.write_bytes(b"HEADER" + records.tobytes() + b"\x00")
+
+    reader = BinaryRecordReader(
+        parameters={
+            "header_size": 6,
+            "byteorder": ">",
+            "record_size": 20,
+            "fields": {
+                "sync": {"dtype": "u2"},
+                "seconds": {"dtype": "f8", "offset": 4},
+                "counts": {"dtype": "u2", "shape": [2], "dims": ["index", "channel"]},
+            },
+            "sync_field": "sync",
+            "sync_value": 0xA55A,
+        }
+    )
+    dataset = reader.read(filepath.as_posix())
+    assert dataset["seconds"].values.tolist() == [0.5, 1.5]
+    assert dataset["counts"].dims == ("index", "channel")
+    assert dataset["counts"].values.tolist() == [[1, 2], [3, 4]]
+
+    # Streams are read from their buffer
+    dataset = reader.read(BytesIO(filepath.read_bytes()))  # type: ignore
+    assert dataset["seconds"].values.tolist() == [0.5, 1.5]
+
+    reader.parameters.on_invalid_sync = "raise"
+    with pytest.raises(ValueError, match="1 of 3 records"):
+        reader.read(filepath.as_posix())
+
+
+@pytest.mark.parametrize("reader_class", [TarReader, ZipReader])
+def test_archive_reader_reads_members_in_parallel(
+    reader_class: Type[DataReader], tmp_path: Path
+):
+    archive = tmp_path / "hourly.zip"
+    content = Path("test/io/data/input.csv").read_bytes()
+    if reader_class is TarReader:
+        archive = tmp_path / "hourly.tar"
+        with tarfile.open(archive, "w") as tar:
+            for hour in range(4):
+                tar.add("test/io/data/input.csv", arcname=f"data.{hour:02d}.csv")
+            tar.add("test/io/data/input.nc", arcname="ignored.nc")
+    else:
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            for hour in range(4):
+                zip_file.writestr(f"data.{hour:02d}.csv", content)
+            zip_file.writestr("__MACOSX/data.00.csv", content)
+
+    params = {
+        "max_workers": 4,
+        "readers": {r".*\.csv": {"classname": "tsdat.io.readers.CSVReader"}},
+    }
+    reader = reader_class(parameters=recursive_instantiate(params))
+    datasets = reader.read(archive.as_posix())
+    assert list(datasets) == [f"data.{hour:02d}.csv" for hour in range(4)]
+    for dataset in datasets.values():
+        assert dataset["First Data Var"].values.tolist() == [71.4, 71.2, 71.1]
+
+
 def test_netcdf_writer(sample_dataset: xr.Dataset):
     expected = sample_dataset.copy(deep=True)  # type: ignore
     writer = NetCDFWriter(file_extension=".nc")
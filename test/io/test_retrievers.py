@@ -1,5 +1,7 @@
 import os
+import re
 from pathlib import Path
+from typing import Dict, List
 
 import numpy as np
 import pandas as pd
@@ -19,6 +21,7 @@ from tsdat import (
     assert_close,
     recursive_instantiate,
 )
+from tsdat.io.retrievers import _concat_sequential, perform_data_retrieval
 from tsdat.transform.converters import _ADIBaseTransformer
 
 # Coords used in sample input data
@@ -166,6 +169,170 @@ def test_simple_extract_multifile_dataset(
     assert_close(dataset, expected)
 
 
+def test_default_retriever_reuses_retrieval_plan(
+    simple_retriever: DefaultRetriever,
+    dataset_config: DatasetConfig,
+):
+    simple_retriever.retrieve(["test/io/data/input.csv"], dataset_config)
+    simple_retriever.retrieve(["test/io/data/input_extended.csv"], dataset_config)
+    assert len(simple_retriever._plans) == 1
+
+    # Variables missing from the inputs must not modify the retrieval rules
+    (dummy_var,) = simple_retriever.data_vars["dummy_var"].values()
+    assert dummy_var.name == ["dummy_var", "foo", "bar"]
+
+
+def test_default_retriever_concatenates_sequential_inputs(
+    simple_retriever: DefaultRetriever,
+    dataset_config: DatasetConfig,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    input_keys = ["test/io/data/input_extended.csv", "test/io/data/input.csv"]
+    simple_retriever.parameters.concat_sequential = False
+    merged = simple_retriever.retrieve(input_keys, dataset_config)
+
+    simple_retriever.parameters.concat_sequential = True
+    with monkeypatch.context() as m:
+        m.setattr(xr, "merge", None)  # the fast path must not fall back to xr.merge
+        concatenated = simple_retriever.retrieve(input_keys, dataset_config)
+    xr.testing.assert_identical(concatenated, merged)
+    assert {k: v.dtype for k, v in concatenated.variables.items()} == {
+        k: v.dtype for k, v in merged.variables.items()
+    }
+
+    # Like merging, filling missing records promotes ints, booleans, and strings
+    datasets = [
+        xr.Dataset(
+            {
+                "count": ("time", np.array([1, 2], dtype=np.int32)),
+                "flag": ("time", np.array([True, False])),
+                "label": ("time", np.array(["a", "b"])),
+                "height": ("height", [1.0, 2.0]),
+            },
+            coords={"time": pd.date_range("2022-04-05", periods=2, freq="h") + offset},
+        )
+        for offset in (pd.Timedelta(0), pd.Timedelta("2h"))
+    ]
+    concatenated = _concat_sequential(datasets)
+    assert concatenated is not None
+    merged = xr.merge(datasets, join="outer", compat="no_conflicts")
+    xr.testing.assert_identical(concatenated, merged)
+    assert concatenated["count"].dtype == merged["count"].dtype == np.float64
+    assert concatenated["flag"].dtype == merged["flag"].dtype == np.float64
+    assert concatenated["label"].dtype == merged["label"].dtype == object
+
+    # Small integers are promoted to float32, like xarray does
+    datasets = [
+        xr.Dataset(
+            {
+                "small": ("time", np.array([1, 2], dtype=np.int16)),
+                "large": ("time", np.array([1, 2], dtype=np.uint32)),
+                "single": ("time", np.array([1, 2], dtype=np.float32)),
+            },
+            coords={"time": pd.date_range("2022-04-05", periods=2, freq="h") + offset},
+        )
+        for offset in (pd.Timedelta(0), pd.Timedelta("2h"))
+    ]
+    concatenated = _concat_sequential(datasets)
+    assert concatenated is not None
+    merged = xr.merge(datasets, join="outer", compat="no_conflicts")
+    xr.testing.assert_identical(concatenated, merged)
+    assert concatenated["small"].dtype == merged["small"].dtype == np.float32
+    assert concatenated["large"].dtype == merged["large"].dtype == np.float64
+    assert concatenated["single"].dtype == merged["single"].dtype == np.float32
+
+    # Overlapping inputs need to be merged
+    assert _concat_sequential([merged, merged.isel(time=[-1])]) is None
+
+
+@pytest.mark.parametrize("file_start", ["00:00", "12:00"])
+def test_storage_retriever_reuses_fetch_window(
+    tmp_path: Path,
+    vap_dataset_config: DatasetConfig,
+    monkeypatch: pytest.MonkeyPatch,
+    file_start: str,
+):
+    storage = FileSystem(parameters={"storage_root": tmp_path})  # type: ignore
+    # Files that don't start at midnight hold data past the end of each day
+    times = pd.date_range(  # type: ignore
+        f"2022-04-05 {file_start}", periods=16, freq="6h"
+    )
+    for day in range(4):
+        dataset = xr.Dataset(
+            coords={"time": times[4 * day : 4 * (day + 1)]},
+            data_vars={"temp": ("time", np.arange(4.0) + 4 * day, {"units": "degC"})},
+            attrs={"datastream": "humboldt.buoy.b1"},
+        )
+        storage.save_data(dataset)
+
+    retriever = StorageRetriever(
+        parameters={"fetch_parameters": {"time_padding": "24h"}},  # type: ignore
+        coords={"time": {re.compile(".*"): RetrievedVariable(name="time")}},
+        data_vars={"temperature": {re.compile(".*"): RetrievedVariable(name="temp")}},
+    )
+
+    def retrieve(start: str, end: str) -> xr.Dataset:
+        inputs: Dict[str, xr.Dataset] = {}
+
+        def capture(input_data: Dict[str, xr.Dataset]) -> Dict[str, xr.Dataset]:
+            inputs.update({k: v.copy(deep=True) for k, v in input_data.items()})
+            for dataset in input_data.values():
+                dataset["temp"].values[:] = -9999  # Must not leak into the next window
+            return input_data
+
+        key = f"humboldt.buoy.b1::{start}::{end}"
+        retriever.retrieve(
+            [key], vap_dataset_config, storage=storage, input_data_hook=capture
+        )
+        return inputs[key]
+
+    expected = [retrieve("20220406", "20220407"), retrieve("20220407", "20220408")]
+
+    opened: List[str] = []
+    open_data_files = FileSystem._open_data_files
+
+    def spy(self: FileSystem, *filepaths: Path) -> List[xr.Dataset]:
+        opened.extend(filepath.name for filepath in filepaths)
+        return open_data_files(self, *filepaths)
+
+    monkeypatch.setattr(FileSystem, "_open_data_files", spy)
+    with retriever.sliding_window():
+        actual = [retrieve("20220406", "20220407"), retrieve("20220407", "20220408")]
+
+    # Each file is only read once, and the data are the same as without the window
+    assert len(opened) == len(set(opened)) == 4
+    for actual_inputs, expected_inputs in zip(actual, expected):
+        xr.testing.assert_identical(actual_inputs, expected_inputs)
+
+
+def test_perform_data_retrieval_selects_first_matching_input(
+    caplog: pytest.LogCaptureFixture,
+):
+    inputs = {
+        "sgp.met.b1": xr.Dataset({"temp": ("time", [1.0]), "rh": ("time", [2.0])}),
+        "sgp.aeri.b1": xr.Dataset({"temp": ("time", [3.0])}),
+    }
+    data_var_rules = {
+        "temp": {
+            re.compile(r"nsa\..*"): RetrievedVariable(name="missing"),
+            re.compile(r".*\.aeri\..*"): RetrievedVariable(name="temp"),
+        },
+        "rh": {re.compile(r".*"): RetrievedVariable(name="rh")},
+        "pres": {re.compile(r".*"): RetrievedVariable(name="pres")},
+        "wspd": {re.compile(r"nsa\..*"): RetrievedVariable(name="wspd")},
+    }
+
+    dataset, selections = perform_data_retrieval(inputs, {}, data_var_rules)
+
+    assert dataset.data_vars["temp"].values.tolist() == [3.0]
+    assert selections.data_vars["temp"].source == "sgp.aeri.b1"
+    assert selections.data_vars["rh"].source == "sgp.met.b1"
+    assert dataset.data_vars["pres"].equals(xr.DataArray([]))
+    assert "wspd" not in selections.data_vars
+    assert "no matching variable could be found" in caplog.text
+    assert "Could not retrieve variable 'wspd'" in caplog.text
+
+
 @pytest.mark.requires_adi
 def test_storage_retriever(
     storage_retriever: StorageRetriever, vap_dataset_config: DatasetConfig
@@ -14,7 +14,7 @@ import xarray as xr
 from pytest import fixture
 
 from tsdat.io.base import Storage
-from tsdat.io.storage import FileSystem, FileSystemS3, ZarrLocalStorage
+from tsdat.io.storage import FileSystem, FileSystemS3, ZarrLocalStorage, fetch_cache
 from tsdat.testing import assert_close
 
 
@@ -119,6 +119,20 @@ def s3_storage(aws_credentials: Any):
         s3.stop()  # type: ignore
 
 
+def test_s3_storage_warns_input_manifest_is_ignored(
+    aws_credentials: Any, caplog: pytest.LogCaptureFixture
+):
+    with moto.mock_aws():  # type: ignore
+        storage = FileSystemS3(
+            parameters=FileSystemS3.Parameters(
+                **{"bucket": "tsdat-core", "input_manifest": "hash"},  # type: ignore
+            )
+        )
+    assert storage.parameters.input_manifest == "off"
+    assert storage.get_input_manifest() is None
+    assert "input_manifest='hash' is ignored" in caplog.text
+
+
 @pytest.mark.parametrize(
     "storage_fixture, dataset_fixture",
     [
@@ -149,6 +163,39 @@ def test_storage_saves_and_fetches_data(
     assert_close(dataset, expected_dataset)
 
 
+def test_filesystem_fetch_cache(tmp_path: Path, sample_dataset: xr.Dataset):
+    storage = FileSystem(
+        parameters={"storage_root": tmp_path, "fetch_cache": "read_only"}  # type: ignore
+    )
+    storage.save_data(sample_dataset)
+    fetch_kwargs: Any = dict(
+        start=datetime(2022, 4, 5),
+        end=datetime(2022, 4, 6),
+        datastream="sgp.testing_storage.a0",
+    )
+    fetch_cache.clear()
+    hits = fetch_cache.hits
+
+    first = storage.fetch_data(**fetch_kwargs)
+    second = storage.fetch_data(**fetch_kwargs)
+    assert fetch_cache.hits == hits + 1
+    assert_close(second, sample_dataset)
+
+    # Read-only views can be reassigned, but not modified in place
+    with pytest.raises(ValueError):
+        second["temperature"].values[0] = 0
+    first["temperature"] = first["temperature"] * 2
+    assert_close(storage.fetch_data(**fetch_kwargs), sample_dataset)
+
+    # Rewriting the file invalidates the cached data
+    sample_dataset["temperature"] += 1
+    storage.save_data(sample_dataset)
+    (filepath,) = tmp_path.glob("**/*.nc")
+    os.utime(filepath, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert_close(storage.fetch_data(**fetch_kwargs), sample_dataset)
+    fetch_cache.clear()
+
+
 @pytest.mark.parametrize(
     "storage_fixture",
     ["file_storage", "file_storage_v2", "zarr_storage", "s3_storage"],
@@ -313,6 +360,36 @@ def test_storage_saves_ancillary_files(
         os.remove(expected_filepath)
 
 
+def test_filesystem_moves_ancillary_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    storage = FileSystem(
+        parameters=FileSystem.Parameters(storage_root=tmp_path / "root")  # type: ignore
+    )
+    with storage.uploadable_dir() as tmp_dir:
+        # Created next to the storage area so files can be renamed into it
+        assert tmp_dir.parent == storage.parameters.storage_root
+        (tmp_dir / "plots").mkdir()
+        (tmp_dir / "plots/a.png").write_text("a")
+        inode = (tmp_dir / "plots/a.png").stat().st_ino
+    saved = storage.parameters.storage_root / "plots/a.png"
+    assert saved.read_text() == "a" and saved.stat().st_ino == inode
+    assert not tmp_dir.exists()
+
+    # Falls back to copying, e.g., across filesystems
+    def replace(src: Any, dst: Any):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "replace", replace)
+    with storage.uploadable_dir() as tmp_dir:
+        (tmp_dir / "b.png").write_text("b")
+    assert (storage.parameters.storage_root / "b.png").read_text() == "b"
+    assert sorted(p.name for p in storage.parameters.storage_root.iterdir()) == [
+        "b.png",
+        "plots",
+    ]
+
+
 def test_last_modified_zarr(
     zarr_storage: ZarrLocalStorage,
     sample_dataset: xr.Dataset,
@@ -1,12 +1,32 @@
+import shutil
+import time
+import tracemalloc
+from datetime import datetime
 from pathlib import Path
+from typing import Any, List
 
 import numpy as np
 import pandas as pd
 import pytest
 import xarray as xr
 
-from tsdat import PipelineConfig, assert_close
-from tsdat.pipeline.pipelines import TransformationPipeline
+from tsdat import PipelineConfig, assert_close, tracing
+from tsdat.metrics import MetricsStore
+from tsdat.pipeline.pipelines import (
+    RunManyError,
+    TransformationPipeline,
+    group_inputs_by_window,
+)
+from tsdat.qc.base import QualityHandler, QualityManager
+from tsdat.qc.checkers import CheckMissing
+from tsdat.tracing import (
+    CallbackSink,
+    SpanRecord,
+    add_sink,
+    disable_memory_profiling,
+    enable_memory_profiling,
+    remove_sink,
+)
 
 
 def test_ingest_pipeline():
@@ -78,6 +98,366 @@ def test_ingest_pipeline():
     assert plot_path.exists()
 
 
+def test_ingest_pipeline_chunked(tmp_path: Path):
+    config = PipelineConfig.from_yaml(
+        Path("test/config/yaml/pipeline.yaml"),
+        overrides={"/storage/parameters/storage_root": tmp_path.as_posix()},
+    )
+    pipeline = config.instantiate_pipeline()
+    pipeline.run_chunked(["test/io/data/input.csv"], chunk_size=2)
+
+    data_dir = tmp_path / "data/sgp.example.b1"
+    saved = sorted(p.name for p in data_dir.glob("*.nc"))
+    assert saved == [
+        "sgp.example.b1.20220324.214300.nc",
+        "sgp.example.b1.20220324.214500.nc",
+    ]
+    datasets = [xr.open_dataset(data_dir / name) for name in saved]
+    combined = xr.concat(datasets, dim="time", data_vars="minimal")
+    np.testing.assert_allclose(
+        combined["first"].data, (np.array([71.4, 71.2, 71.1]) - 32) * 5 / 9
+    )
+
+
+def test_ingest_pipeline_run_many(tmp_path: Path):
+    config = PipelineConfig.from_yaml(
+        Path("test/config/yaml/pipeline.yaml"),
+        overrides={"/storage/parameters/storage_root": tmp_path.as_posix()},
+    )
+    pipeline = config.instantiate_pipeline()
+    inputs = []
+    for name, source in [
+        ("sgp.example.00.20220324.214600.csv", "test/io/data/input_extended.csv"),
+        ("sgp.example.00.20220324.214300.csv", "test/io/data/input.csv"),
+    ]:
+        inputs.append((tmp_path / name).as_posix())
+        shutil.copy(source, inputs[-1])
+
+    # A failing window doesn't stop the others from being processed
+    bad_input = tmp_path / "sgp.example.00.20220323.000000.csv"
+    bad_input.write_text("not a valid input\n")
+    with pytest.raises(RunManyError, match="1 of 2 windows failed") as error:
+        pipeline.run_many([bad_input.as_posix(), *inputs], window="1D")
+    groups = error.value.groups
+    assert list(error.value.errors) == [datetime(2022, 3, 23)]
+
+    assert groups[datetime(2022, 3, 24)] == sorted(inputs)
+    saved = list((tmp_path / "data/sgp.example.b1").glob("*.nc"))
+    assert [p.name for p in saved] == ["sgp.example.b1.20220324.214300.nc"]
+    assert xr.open_dataset(saved[0]).sizes["time"] == 6
+
+    assert pipeline.run_many(inputs, window="1D") == {
+        datetime(2022, 3, 24): sorted(inputs)
+    }
+
+    groups = group_inputs_by_window(
+        inputs, window="3min", filename_template="sgp.example.00.{date_time}.csv"
+    )
+    assert list(groups) == [
+        datetime(2022, 3, 24, 21, 42),
+        datetime(2022, 3, 24, 21, 45),
+    ]
+
+
+def test_prepare_retrieved_dataset():
+    config = PipelineConfig.from_yaml(Path("test/config/yaml/pipeline.yaml"))
+    pipeline = config.instantiate_pipeline()
+    retrieved = pipeline.retriever.retrieve(
+        ["test/io/data/input.csv"], pipeline.dataset_config
+    )
+
+    dataset = pipeline.prepare_retrieved_dataset(retrieved.copy())
+    assert "index" not in dataset
+    assert dataset["first"].attrs["units"] == "degC"
+    # Variables that already have the right dtype aren't copied
+    assert np.shares_memory(dataset["first"].data, retrieved["first"].data)
+
+    # Variables that weren't retrieved are filled with writable arrays, which quality
+    # handlers, hooks, and callers can modify in place
+    dataset = pipeline.prepare_retrieved_dataset(retrieved.drop_vars("first"))
+    assert dataset["first"].attrs["units"] == "degC"
+    assert (dataset["first"] == -9999).all()
+
+    class SetFirst(QualityHandler):
+        def run(
+            self, dataset: xr.Dataset, variable_name: str, failures: Any
+        ) -> xr.Dataset:
+            dataset[variable_name].values[0] = 1.0
+            return dataset
+
+    manager = QualityManager(
+        name="Set first value",
+        checker=CheckMissing(),
+        handlers=[SetFirst()],
+        apply_to=["first"],
+    )
+    dataset = manager.run(dataset)
+    assert dataset["first"].values.tolist() == [1.0, -9999.0, -9999.0]
+    dataset["first"][1] = 2.0
+    assert dataset["first"].values.tolist() == [1.0, 2.0, -9999.0]
+
+    # Configured variables are kept even if their names contain 'qc'
+    config_vars = pipeline.dataset_config.data_vars
+    config_vars["sqcount"] = config_vars["first"].copy(update={"name": "sqcount"})
+    dataset = pipeline.prepare_retrieved_dataset(retrieved.copy())
+    assert (dataset["sqcount"] == -9999).all()
+    assert dataset["sqcount"].attrs["units"] == "degC"
+    retrieved["sqcount"] = retrieved["first"].assign_attrs(flag_masks=1)
+    dataset = pipeline.prepare_retrieved_dataset(retrieved.copy())
+    assert dataset["sqcount"].values.tolist() == retrieved["first"].values.tolist()
+    assert dataset["sqcount"].attrs["flag_masks"] == [1]
+
+
+def test_ingest_pipeline_tracing(tmp_path: Path):
+    config = PipelineConfig.from_yaml(
+        Path("test/config/yaml/pipeline.yaml"),
+        overrides={"/storage/parameters/storage_root": tmp_path.as_posix()},
+    )
+    pipeline = config.instantiate_pipeline()
+    records: List[SpanRecord] = []
+    sink = add_sink(CallbackSink(records.append))
+    try:
+        pipeline.run(["test/io/data/input.csv"])
+    finally:
+        remove_sink(sink)
+
+    paths = [record.path for record in records]
+    assert paths[-1] == "run"
+    for path in [
+        "run/retrieve/read",
+        "run/prepare_retrieved_dataset",
+        "run/quality/quality_manager",
+        "run/decode_cf",
+        "run/save_data/write",
+        "run/hook_plot_dataset",
+    ]:
+        assert path in paths
+    assert all(r.context["datastream"] == "sgp.example.b1" for r in records)
+    assert all(r.context["input_key"] == "test/io/data/input.csv" for r in records)
+    managers = [r.attrs["manager"] for r in records if r.name == "quality_manager"]
+    assert managers == [m.name for m in pipeline.quality.managers]
+
+    # Once the sink is removed tracing is off again
+    pipeline.run(["test/io/data/input.csv"])
+    assert len(records) == len(paths)
+
+
+def test_ingest_pipeline_memory_profiling(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+):
+    config = PipelineConfig.from_yaml(
+        Path("test/config/yaml/pipeline.yaml"),
+        overrides={"/storage/parameters/storage_root": tmp_path.as_posix()},
+    )
+    pipeline = config.instantiate_pipeline()
+    tracing_before = tracemalloc.is_tracing()
+    records: List[SpanRecord] = []
+    sink = add_sink(CallbackSink(records.append))
+    enable_memory_profiling(threshold=2.0, min_bytes=0)
+    try:
+        pipeline.run(["test/io/data/input.csv"])
+    finally:
+        disable_memory_profiling()
+        remove_sink(sink)
+
+    memory = {r.path: r.memory for r in records}
+    assert all(m is not None for m in memory.values())
+    assert memory["run/retrieve"]["dataset_nbytes"] is None  # type: ignore
+    prepare = memory["run/prepare_retrieved_dataset"]
+    assert prepare["dataset_nbytes"] > 0  # type: ignore
+    assert memory["run"]["peak"] >= prepare["peak"]  # type: ignore
+    flagged = [path for path, m in memory.items() if m["flagged"]]  # type: ignore
+    assert flagged
+    assert f"{flagged[0]} allocated up to" in caplog.text
+
+    # Spans running in background threads don't leave entries on the memory stack
+    monkeypatch.setenv("TSDAT_BACKGROUND_WORKERS", "1")
+    enable_memory_profiling(threshold=2.0, min_bytes=0)
+    try:
+        for _ in range(3):
+            pipeline.run(["test/io/data/input.csv"])
+        pipeline.wait_for_background()
+        assert tracing._memory_spans.get() == ()
+    finally:
+        disable_memory_profiling()
+    assert tracemalloc.is_tracing() == tracing_before
+
+    # Tracing started by someone else is left running
+    tracemalloc.start()
+    try:
+        enable_memory_profiling()
+        disable_memory_profiling()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_ingest_pipeline_records_metrics(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    config = PipelineConfig.from_yaml(
+        Path("test/config/yaml/pipeline.yaml"),
+        overrides={"/storage/parameters/storage_root": tmp_path.as_posix()},
+    )
+    pipeline = config.instantiate_pipeline()
+    monkeypatch.setenv("TSDAT_METRICS_DB", (tmp_path / "metrics.db").as_posix())
+    pipeline.run(["test/io/data/input.csv"])
+    with pytest.raises(FileNotFoundError):
+        pipeline.run(["test/io/data/missing.csv"])
+
+    runs = MetricsStore(tmp_path / "metrics.db").query(datastream="sgp.example.b1")
+    assert [run.status for run in runs] == ["success", "failed"]
+    run = runs[0]
+    assert run.input_key == "test/io/data/input.csv"
+    assert run.files_read == 1 and run.files_written == 1
+    assert run.bytes_read == Path("test/io/data/input.csv").stat().st_size
+    assert run.bytes_written > 0
+    assert run.rows_in == run.rows_out == 3
+    assert run.qc_failures == sum(run.qc.values())
+    assert "run/quality" in run.stages and run.seconds >= run.stages["run"]
+    assert runs[1].error.startswith("FileNotFoundError")  # type: ignore
+
+
+def test_ingest_pipeline_records_background_metrics(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    config = PipelineConfig.from_yaml(
+        Path("test/config/yaml/pipeline.yaml"),
+        overrides={"/storage/parameters/storage_root": tmp_path.as_posix()},
+    )
+    pipeline = config.instantiate_pipeline()
+    monkeypatch.setenv("TSDAT_METRICS_DB", (tmp_path / "metrics.db").as_posix())
+    monkeypatch.setenv("TSDAT_BACKGROUND_WORKERS", "1")
+    plot = type(pipeline).hook_plot_dataset
+
+    def slow_plot(self: Any, dataset: xr.Dataset):
+        time.sleep(0.2)  # Still plotting while the next run saves its data
+        plot(self, dataset)
+
+    monkeypatch.setattr(type(pipeline), "hook_plot_dataset", slow_plot)
+    inputs = ["test/io/data/input.csv", "test/io/data/input_extended.csv"]
+    for input_key in inputs:
+        pipeline.run([input_key])
+    pipeline.wait_for_background()
+
+    # Each run's metrics are recorded once its plots are done, with its own spans
+    runs = MetricsStore(tmp_path / "metrics.db").query(datastream="sgp.example.b1")
+    assert [run.input_key for run in runs] == inputs
+    for run in runs:
+        assert run.files_written == 1
+        assert run.stages["run/hook_plot_dataset"] >= 0.2
+        assert run.stages["run/save_data"] < run.stages["run/hook_plot_dataset"]
+
+
+def test_ingest_pipeline_background_plotting(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    config = PipelineConfig.from_yaml(
+        Path("test/config/yaml/pipeline.yaml"),
+        overrides={"/storage/parameters/storage_root": tmp_path.as_posix()},
+    )
+    pipeline = config.instantiate_pipeline()
+    monkeypatch.setenv("TSDAT_BACKGROUND_WORKERS", "1")
+    plot = tmp_path / (
+        "ancillary/sgp/sgp.example.b1/sgp.example.b1.20220324.214300.example.png"
+    )
+
+    dataset = pipeline.run(["test/io/data/input.csv"])
+    assert pipeline.ds is dataset
+    assert not pipeline.wait_for_background()
+    assert plot.is_file()
+    plot.unlink()
+
+    # Changes the plot hook makes for plotting don't reach the saved dataset
+    def label(dataset: xr.Dataset):
+        dataset.attrs["plot_title"] = "title"
+        dataset["first"].attrs["plot_label"] = "label"
+
+    with monkeypatch.context() as patch:
+        patch.setattr(type(pipeline), "hook_plot_dataset", lambda _, ds: label(ds))
+        dataset = pipeline.run(["test/io/data/input.csv"], wait=True)
+    assert "plot_title" not in dataset.attrs
+    assert "plot_label" not in dataset["first"].attrs
+    (saved_file,) = tmp_path.glob("data/*/*.nc")
+    with xr.open_dataset(saved_file) as saved:
+        assert "plot_title" not in saved.attrs
+        assert "plot_label" not in saved["first"].attrs
+
+    # Plots of runs whose data couldn't be saved aren't uploaded
+    def fail(dataset: xr.Dataset):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(type(pipeline.storage), "save_data", lambda _, ds: fail(ds))
+    with pytest.raises(OSError, match="disk full"):
+        pipeline.run(["test/io/data/input.csv"])
+    pipeline.wait_for_background()
+    assert not plot.exists()
+    monkeypatch.undo()
+
+    # Errors from plotting are raised when waiting for them
+    monkeypatch.setenv("TSDAT_BACKGROUND_WORKERS", "1")
+    monkeypatch.setattr(type(pipeline), "hook_plot_dataset", lambda _, ds: fail(ds))
+    pipeline.run(["test/io/data/input.csv"])
+    with pytest.raises(OSError, match="disk full"):
+        pipeline.wait_for_background()
+    with pytest.raises(OSError, match="disk full"):
+        pipeline.run(["test/io/data/input.csv"], wait=True)
+
+
+def test_ingest_pipeline_input_manifest(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    config = PipelineConfig.from_yaml(
+        Path("test/config/yaml/pipeline.yaml"),
+        overrides={
+            "/storage/parameters/storage_root": tmp_path.as_posix(),
+            "/storage/parameters/input_manifest": "hash",
+        },
+    )
+    pipeline = config.instantiate_pipeline()
+    input_file = tmp_path / "input.csv"
+    shutil.copy("test/io/data/input.csv", input_file)
+    inputs = [input_file.as_posix()]
+
+    assert pipeline.run(inputs) is not None
+    assert (tmp_path / ".input_manifest.sqlite").is_file()
+    # Redelivered files with the same contents are skipped, unless forced
+    shutil.copy("test/io/data/input.csv", input_file)
+    assert pipeline.run(inputs) is None
+    assert pipeline.run(inputs, force=True) is not None
+
+    with input_file.open("a") as file:
+        file.write("\n")
+    assert pipeline.run(inputs) is not None
+    assert pipeline.run(inputs) is None
+
+    # Inputs are only recorded once they are plotted, so they are processed again if
+    # their background plots fail
+    def fail(dataset: xr.Dataset):
+        raise OSError("disk full")
+
+    with input_file.open("a") as file:
+        file.write("\n")
+    monkeypatch.setenv("TSDAT_BACKGROUND_WORKERS", "1")
+    monkeypatch.setattr(type(pipeline), "hook_plot_dataset", lambda _, ds: fail(ds))
+    assert pipeline.run(inputs) is not None
+    assert pipeline.wait_for_background(raise_errors=False)
+    assert pipeline.run(inputs) is not None
+    assert pipeline.wait_for_background(raise_errors=False)
+    monkeypatch.undo()
+    monkeypatch.setenv("TSDAT_BACKGROUND_WORKERS", "1")
+    assert pipeline.run(inputs) is not None
+    assert not pipeline.wait_for_background()
+    assert pipeline.run(inputs) is None
+    monkeypatch.undo()
+
+    # Chunked runs use the manifest too
+    with input_file.open("a") as file:
+        file.write("\n")
+    pipeline.run_chunked(inputs, chunk_size=2)
+    assert pipeline.run(inputs) is None
+
+
 @pytest.mark.requires_adi
 def test_transformation_pipeline():
     expected = xr.Dataset(
@@ -1,8 +1,22 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
 import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
 
+import pytest
+import xarray as xr
 from typer.testing import CliRunner
 
+from tsdat import StorageRetriever
 from tsdat.cli import app
+from tsdat.metrics import MetricsStore, RunMetrics
 
 runner = CliRunner()
 
@@ -29,3 +43,246 @@ def test_schema_generation():
         )
         assert result.exit_code == 0
         assert "ioos dataset standards" in result.stdout
+
+
+def test_run_many(tmp_path: Path):
+    inputs_file = tmp_path / "inputs.txt"
+    inputs_file.write_text(
+        f"{shutil.copy('test/io/data/input.csv', tmp_path / 'raw.20220324.214300.csv')}"
+        "\n"
+        f"{shutil.copy('test/io/data/input_extended.csv', tmp_path / 'raw.20220324.214600.csv')}"
+    )
+    result = runner.invoke(
+        app,
+        [
+            "run-many",
+            "test/config/yaml/pipeline.yaml",
+            "--inputs-file",
+            str(inputs_file),
+            "--window",
+            "3min",
+        ],
+        env={
+            "TSDAT_STORAGE_ROOT": str(tmp_path / "storage"),
+            "TSDAT_PIPELINE_CACHE": str(tmp_path / "cache"),
+        },
+    )
+    assert result.exit_code == 0, result.stdout
+    assert "Processed 2 inputs in 2 windows" in result.stdout
+    assert len(list((tmp_path / "storage").glob("data/*/*.nc"))) == 2
+
+
+def test_run(tmp_path: Path):
+    result = runner.invoke(
+        app,
+        [
+            "run",
+            "test/config/yaml",
+            "test/io/data/input.csv",
+            "test/io/data/input_extended.csv",
+            "test/io/data/unknown.txt",
+            "--glob",
+            "pipeline.yaml",
+            "--workers",
+            "2",
+        ],
+        env={
+            "TSDAT_STORAGE_ROOT": str(tmp_path),
+            "TSDAT_PIPELINE_CACHE": str(tmp_path / "cache"),
+        },
+    )
+    assert result.exit_code == 0, result.stdout
+    assert "Processed 3 inputs: 2 succeeded, 0 failed, 1 skipped" in result.stdout
+    assert len(list(tmp_path.glob("data/*/*.nc"))) == 2
+
+
+def test_serve(tmp_path: Path):
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    (spool_dir / "job1.txt").write_text("test/io/data/input.csv\n")
+    (spool_dir / "job2.txt").write_text("# comment\ntest/io/data/unknown.txt\n")
+
+    result = runner.invoke(
+        app,
+        [
+            "serve",
+            "test/config/yaml",
+            str(spool_dir),
+            "--glob",
+            "pipeline.yaml",
+            "--once",
+        ],
+        env={
+            "TSDAT_STORAGE_ROOT": str(tmp_path),
+            "TSDAT_PIPELINE_CACHE": str(tmp_path / "cache"),
+        },
+    )
+    assert result.exit_code == 0, result.stdout
+    assert "Processed 2 jobs" in result.stdout
+    assert (spool_dir / "done" / "job1.txt").exists()
+    assert (spool_dir / "done" / "job2.txt").exists()
+    stats = json.loads((spool_dir / "stats.json").read_text())
+    assert stats["pipelines"]["test/config/yaml/pipeline.yaml"]["count"] == 1
+    assert len(list(tmp_path.glob("data/*/*.nc"))) == 1
+
+
+def test_serve_latency(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from tsdat.pipeline import dispatcher
+    from tsdat.pipeline.worker import PipelineWorker
+
+    def run_task(task: Tuple[str, Optional[Path], bool]) -> dispatcher.DispatchResult:
+        time.sleep(0.2)
+        return dispatcher.DispatchResult(
+            task[0], task[0], "success", None, 0.2, time.time()
+        )
+
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    for name in ("a", "b"):
+        (spool_dir / f"{name}.txt").write_text(f"{name}\n")
+    worker = PipelineWorker(
+        Path("test/config/yaml"), spool_dir, pattern="pipeline.yaml"
+    )
+    monkeypatch.setattr(dispatcher, "_run_task", run_task)
+    assert worker.process_pending() == 2
+
+    # Each job's latency ends when its own input key is done, not the whole batch
+    latency = worker.stats["b"].last_latency - worker.stats["a"].last_latency
+    assert latency >= 0.15
+
+
+def test_serve_requeues_abandoned_jobs(tmp_path: Path):
+    from tsdat.pipeline.worker import PipelineWorker
+
+    # Claimed by a worker that was killed, by an older version, and by a live worker
+    finished = subprocess.Popen([sys.executable, "-c", "pass"])
+    finished.wait()
+    spool_dir = tmp_path / "spool"
+    host = socket.gethostname()
+    for owner, name in [
+        (f"{host}.{finished.pid}", "killed.txt"),
+        ("", "old.txt"),
+        (f"{host}.{os.getppid()}", "running.txt"),
+    ]:
+        job = spool_dir / ".processing" / owner / name
+        job.parent.mkdir(parents=True, exist_ok=True)
+        job.write_text("test/io/data/unknown.txt\n")
+
+    worker = PipelineWorker(
+        Path("test/config/yaml"), spool_dir, pattern="pipeline.yaml"
+    )
+    assert worker.process_pending() == 2
+    assert sorted(p.name for p in (spool_dir / "done").iterdir()) == [
+        "killed.txt",
+        "old.txt",
+    ]
+    assert (
+        spool_dir / ".processing" / f"{host}.{os.getppid()}" / "running.txt"
+    ).exists()
+    assert not (spool_dir / ".processing" / f"{host}.{finished.pid}").exists()
+    worker.close()
+
+
+def test_report(tmp_path: Path):
+    store = MetricsStore(tmp_path / "metrics.db")
+    for i, seconds in enumerate([1.0, 1.1, 0.9, 1.0, 3.0, 3.2]):
+        store.append(
+            RunMetrics(
+                started=datetime(2024, 1, 1, i, tzinfo=timezone.utc),
+                pipeline="IngestPipeline",
+                datastream="sgp.example.b1",
+                input_key=f"input_{i}.csv",
+                tsdat_version="1.0" if seconds < 2 else "1.1",
+                status="success",
+                seconds=seconds,
+                bytes_read=1024**2,
+                stages={"run": seconds, "run/quality": seconds - 0.5, "run/read": 0.5},
+            )
+        )
+
+    result = runner.invoke(
+        app, ["report", "--recent", "2"], env={"TSDAT_METRICS_DB": str(store.path)}
+    )
+    assert result.exit_code == 0, result.stdout
+    assert "sgp.example.b1: 6 runs (0 failed)" in result.stdout
+    assert "tsdat 1.1: median 3.10s" in result.stdout
+    assert "REGRESSION (largest slowdown in 'run/quality')" in result.stdout
+    assert "1 datastreams, 1 with regressions" in result.stdout
+
+
+def test_backfill(tmp_path: Path):
+    state_file = tmp_path / "backfill.json"
+    args = [
+        "backfill",
+        "test/io/yaml/vap-pipeline.yaml",
+        "20220405",
+        "20220407",
+        "--state-file",
+        str(state_file),
+    ]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.stdout
+    assert "[2/2] 20220406.000000-20220407.000000: success" in result.stdout
+    assert "Completed through 2022-04-07T00:00:00" in result.stdout
+    assert len(json.loads(state_file.read_text())["completed"]) == 2
+
+    # Windows completed by the first backfill are skipped
+    result = runner.invoke(app, args + ["--workers", "2"])
+    assert result.exit_code == 0, result.stdout
+    assert "Processed 0 windows (2 skipped, 0 failed)" in result.stdout
+
+    # Each window is a block processed in parallel by the worker processes
+    result = runner.invoke(app, args + ["--workers", "2", "--restart"])
+    assert result.exit_code == 0, result.stdout
+    assert "Processed 2 windows (0 skipped, 0 failed)" in result.stdout
+    assert "Completed through 2022-04-07T00:00:00" in result.stdout
+    assert len(json.loads(state_file.read_text())["completed"]) == 2
+
+
+def test_update(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    state_file = tmp_path / "incremental.json"
+    args = ["update", "test/io/yaml/vap-pipeline.yaml", "--state-file", str(state_file)]
+
+    retrieved: List[Tuple[StorageRetriever, Any, Any, xr.Dataset]] = []
+    retrieve = StorageRetriever.retrieve
+
+    def spy(self: StorageRetriever, *args: Any, **kwargs: Any) -> xr.Dataset:
+        dataset = retrieve(self, *args, **kwargs)
+        retrieved.append((self, args, kwargs, dataset.copy(deep=True)))
+        return dataset
+
+    # The first update processes every window with input data
+    monkeypatch.setattr(StorageRetriever, "retrieve", spy)
+    result = runner.invoke(app, args)
+    monkeypatch.undo()
+    assert result.exit_code == 0, result.stdout
+    assert "[1/2] 20220405.000000-20220406.000000: success" in result.stdout
+    assert "[2/2] 20220406.000000-20220407.000000: success" in result.stdout
+    state = json.loads(state_file.read_text())
+    assert set(state["watermarks"]) == {"humboldt.buoy_z06.a1", "humboldt.buoy_z07.a1"}
+
+    # Adjacent windows updated together get the same data as separate retrievals
+    assert len(retrieved) == 2
+    for retriever, retrieve_args, retrieve_kwargs, dataset in retrieved:
+        expected = retrieve(retriever, *retrieve_args, **retrieve_kwargs)
+        xr.testing.assert_identical(dataset, expected)
+
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.stdout
+    assert "Recomputed 0 windows" in result.stdout
+
+    # Only windows reading the modified file (including as padding) are recomputed
+    modified = Path(
+        "test/io/data/retriever-store/data/humboldt.buoy_z07.a1/"
+        "humboldt.buoy_z07.a1.20220405.000000.nc"
+    )
+    stat = modified.stat()
+    try:
+        os.utime(modified, (stat.st_atime, stat.st_mtime + 60))
+        result = runner.invoke(app, args + ["--dry-run"])
+        assert result.stdout.strip() == "2022-04-05T00:00:00 - 2022-04-06T00:00:00"
+        result = runner.invoke(app, args)
+        assert result.exit_code == 0, result.stdout
+        assert "Recomputed 1 windows" in result.stdout
+    finally:
+        os.utime(modified, (stat.st_atime, stat.st_mtime))
@@ -0,0 +1,31 @@
+import importlib
+import subprocess
+import sys
+
+import tsdat
+
+
+def test_import_tsdat_is_lazy():
+    # Run in a fresh interpreter since other tests have already imported everything
+    code = (
+        "import sys, tsdat; heavy = {'xarray', 'pandas', 'pint', 'act'};"
+        " print(sorted(heavy.intersection(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def test_lazy_names_match_subpackage_exports():
+    for module_name, names in tsdat._LAZY_IMPORTS.items():  # type: ignore
+        module = importlib.import_module(f"tsdat.{module_name}")
+        exported = getattr(module, "__all__", None)
+        if exported is not None:
+            assert set(exported) <= set(tsdat.__all__), module_name
+        for name in names:
+            assert getattr(tsdat, name) is getattr(module, name)
+
+    assert tsdat.FileSystem.__name__ == "FileSystem"  # type: ignore
+    assert "IngestPipeline" in dir(tsdat)
+    assert isinstance(tsdat.io, type(tsdat))  # type: ignore
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from tsdat.utils import decode_cf, normalize_cf_encoding
+
+
+def _make_dataset(**extra_vars: xr.Variable) -> xr.Dataset:
+    time = pd.date_range("2024-08-08", periods=4, freq="1h")
+    dataset = xr.Dataset(
+        coords=dict(
+            time=("time", time, {"units": "Seconds since 1970-01-01 00:00:00"}),
+            height=("height", [1.0, 2.0], {"units": "m"}),
+        ),
+        data_vars=dict(
+            temp=(
+                ("time", "height"),
+                np.array([[1.0, -9999.0], [2.0, 3.0], [-9999.0, 4.0], [5.0, 6.0]]),
+                {"units": "degC", "_FillValue": -9999.0},
+            ),
+            count=("time", np.array([1, -9999, 3, 4], dtype=np.int32)),
+            flag=("time", np.array([0, 1, 0, 1], dtype=np.int16)),
+            label=("height", np.array(["a", "b"]), {"long_name": "Label"}),
+            scalar=((), 1.5, {"_FillValue": np.nan}),
+            pi=((), 3.14, {"_FillValue": None}),
+            **extra_vars,  # type: ignore
+        ),
+        attrs={"title": "test"},
+    )
+    dataset["count"].attrs.update(_FillValue=-9999, missing_value=-9999)
+    dataset["flag"].attrs["_FillValue"] = -1
+    dataset["temp"].encoding["_FillValue"] = -9999.0
+    dataset["time"].encoding["dtype"] = "float64"
+    return dataset
+
+
+@pytest.mark.parametrize(
+    "extra_vars",
+    (
+        {},
+        # These still need xarray.decode_cf()
+        {"packed": xr.Variable("time", [1, 2, 3, 4], {"scale_factor": 0.5})},
+        {"offset": xr.Variable("time", [0, 1, 2, 3], {"units": "days since 2024"})},
+    ),
+)
+def test_normalize_cf_encoding(extra_vars: dict):
+    expected = decode_cf(_make_dataset(**extra_vars)).load()
+    dataset = _make_dataset(**extra_vars)
+    temp = dataset["temp"].data
+
+    actual = normalize_cf_encoding(dataset)
+
+    xr.testing.assert_identical(actual, expected)
+    for name, variable in expected.variables.items():
+        assert actual[name].encoding == variable.encoding, name
+        assert actual[name].dtype == variable.dtype, name
+    if not extra_vars:
+        assert actual is dataset
+        assert actual["temp"].data is temp  # Masked in place
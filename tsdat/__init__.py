@@ -6,33 +6,198 @@ other domains as well.
 
 -------------------------------------------------------------------------------------"""
 
-# NOTE: The '*' imports are constrained by the '__all__' property defined by each module
-# so we are only importing the methods and classes deemed most important by each module.
-from .config.dataset import *
-from .config.pipeline import *
-from .config.storage import *
-from .config.retriever import *
-from .config.quality import *
-from .config.utils import *
-
-from .io.base import *
-from .io.converters import *
-from .io.handlers import *
-from .io.readers import *
-from .io.retrievers import *
-from .io.storage import *
-from .io.writers import *
-
-from .pipeline.base import *
-from .pipeline.pipelines import *
-
-from .qc.base import *
-from .qc.checkers import *
-from .qc.handlers import *
-
-from .utils import *
-
-from .testing import *
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .config.dataset import *
+    from .config.pipeline import *
+    from .config.storage import *
+    from .config.retriever import *
+    from .config.quality import *
+    from .config.utils import *
+
+    from .io.base import *
+    from .io.converters import *
+    from .io.handlers import *
+    from .io.readers import *
+    from .io.retrievers import *
+    from .io.storage import *
+    from .io.writers import *
+
+    from .pipeline.base import *
+    from .pipeline.pipelines import *
+
+    from .qc.base import *
+    from .qc.checkers import *
+    from .qc.handlers import *
+
+    from .utils import *
+
+    from .testing import *
+
+# NOTE: Importing every subpackage pulls in xarray, pandas, pint, act, etc., which takes
+# seconds. The public names are instead imported from their subpackage the first time
+# they are accessed (see __getattr__ below). Keep this in sync with the '__all__' of
+# each subpackage; test/test_init.py checks that it is.
+_LAZY_IMPORTS: Dict[str, List[str]] = {
+    "config.dataset": ["ACDDDatasetConfig", "DatasetConfig", "IOOSDatasetConfig"],
+    "config.pipeline": ["PipelineConfig", "get_pipeline_cache_key", "load_pipeline"],
+    "config.storage": ["StorageConfig"],
+    "config.retriever": ["RetrieverConfig"],
+    "config.quality": ["QualityConfig"],
+    "config.utils": [
+        "Config",
+        "ConfigError",
+        "Overrideable",
+        "ParameterizedConfigClass",
+        "YamlModel",
+        "find_duplicates",
+        "get_code_version",
+        "matches_overridable_schema",
+        "read_yaml",
+        "recursive_instantiate",
+    ],
+    "io.base": [
+        "ArchiveReader",
+        "DataConverter",
+        "DataHandler",
+        "DataReader",
+        "DataWriter",
+        "FileHandler",
+        "FileWriter",
+        "RetrievalRuleSelections",
+        "RetrievedDataset",
+        "RetrievedVariable",
+        "Retriever",
+        "Storage",
+    ],
+    "io.converters": ["NearestNeighbor", "StringToDatetime", "UnitsConverter"],
+    "io.handlers": [
+        "A2eCSVHandler",
+        "CSVHandler",
+        "NetCDFHandler",
+        "ParquetHandler",
+        "SplitNetCDFHandler",
+        "ZarrHandler",
+    ],
+    "io.readers": [
+        "BinaryRecordReader",
+        "CSVReader",
+        "NetCDFReader",
+        "ParquetReader",
+        "ZarrReader",
+        "ZipReader",
+    ],
+    "io.retrievers": ["DefaultRetriever", "StorageRetriever", "StorageRetrieverInput"],
+    "io.storage": [
+        "FetchCache",
+        "FileSystem",
+        "FileSystemS3",
+        "InputManifest",
+        "ZarrLocalStorage",
+    ],
+    "io.writers": [
+        "CSVWriter",
+        "NetCDFWriter",
+        "ParquetWriter",
+        "SplitNetCDFWriter",
+        "ZarrWriter",
+    ],
+    "pipeline.base": ["Pipeline"],
+    "pipeline.pipelines": ["IngestPipeline", "RunManyError", "TransformationPipeline"],
+    "qc.base": [
+        "QualityChecker",
+        "QualityHandler",
+        "QualityManagement",
+        "QualityManager",
+    ],
+    "qc.checkers": [
+        "CheckArrayMaskThreshold",
+        "CheckFailDelta",
+        "CheckFailMax",
+        "CheckFailMin",
+        "CheckFailRangeMax",
+        "CheckFailRangeMin",
+        "CheckFailStd",
+        "CheckMissing",
+        "CheckMonotonic",
+        "CheckValidDelta",
+        "CheckValidMax",
+        "CheckValidMin",
+        "CheckValidRangeMax",
+        "CheckValidRangeMin",
+        "CheckValidStd",
+        "CheckWarnDelta",
+        "CheckWarnMax",
+        "CheckWarnMin",
+        "CheckWarnRangeMax",
+        "CheckWarnRangeMin",
+        "CheckWarnStd",
+    ],
+    "qc.handlers": [
+        "CubicSplineInterp",
+        "DataQualityError",
+        "FailPipeline",
+        "RecordQualityResults",
+        "RemoveFailedValues",
+        "SortDatasetByCoordinate",
+    ],
+    "utils": [
+        "FILENAME_TEMPLATE",
+        "ParameterizedClass",
+        "StandardsType",
+        "assign_data",
+        "datetime_substitutions",
+        "decode_cf",
+        "get_dataset_dim_groups",
+        "get_datastream",
+        "get_fields_from_dataset",
+        "get_fields_from_datastream",
+        "get_file_datetime",
+        "get_filename",
+        "get_start_date_and_time_str",
+        "get_start_time",
+        "model_to_dict",
+        "normalize_cf_encoding",
+        "record_corrections_applied",
+    ],
+    "testing": ["assert_close"],
+}
+_SUBMODULES = [
+    "config",
+    "const",
+    "io",
+    "metrics",
+    "pipeline",
+    "qc",
+    "testing",
+    "tracing",
+    "tstring",
+    "utils",
+]
+
+_name_to_module: Dict[str, str] = {
+    name: module for module, names in _LAZY_IMPORTS.items() for name in names
+}
+
+__all__ = [*_name_to_module, "get_version"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _name_to_module:
+        module = import_module(f".{_name_to_module[name]}", __name__)
+        value = getattr(module, name)
+    elif name in _SUBMODULES:
+        value = import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    globals()[name] = value  # Only look it up once
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted({*globals(), *__all__, *_SUBMODULES})
 
 
 def get_version() -> str:
@@ -1,2 +1,8 @@
+from .backfill import backfill as backfill
 from .cli import app as app
 from .generate_schema.generate_schema import generate_schema as generate_schema
+from .report import report as report
+from .run import run as run
+from .run_many import run_many as run_many
+from .serve import serve as serve
+from .update import update as update
@@ -0,0 +1,74 @@
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from ..pipeline.backfill import Backfill, BackfillSummary, WindowResult
+from ..pipeline.pipelines.transformation_pipeline import _parse_date
+
+
+def backfill(
+    config: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="The pipeline config file to run."
+    ),
+    start: str = typer.Argument(
+        ..., help="The start of the range, formatted as YYYYMMDD or YYYYMMDD.hhmmss."
+    ),
+    end: str = typer.Argument(..., help="The end of the range, in the same format."),
+    days: float = typer.Option(
+        1.0, min=0.0, help="The length of each window, in days."
+    ),
+    workers: int = typer.Option(1, min=1, help="The number of worker processes."),
+    block_size: int = typer.Option(
+        1,
+        min=1,
+        help="The number of consecutive windows each worker processes at a time,"
+        " sharing the data fetched for them.",
+    ),
+    state_file: Optional[Path] = typer.Option(
+        None,
+        dir_okay=False,
+        help="JSON file recording completed windows, so an interrupted backfill can be"
+        " resumed. Defaults to '.backfill.<config name>.json' next to the config.",
+    ),
+    restart: bool = typer.Option(
+        False, help="Process all windows, even ones completed by an earlier backfill."
+    ),
+):
+    if state_file is None:
+        state_file = config.parent / f".backfill.{config.stem}.json"
+    if restart:
+        state_file.unlink(missing_ok=True)
+
+    runner = Backfill(
+        config,
+        _parse_date(start),
+        _parse_date(end),
+        days=days,
+        workers=workers,
+        block_size=block_size,
+        state_file=state_file,
+    )
+
+    def on_progress(result: WindowResult, summary: BackfillSummary) -> None:
+        done = summary.windows - summary.remaining
+        line = f"[{done}/{summary.windows}] {result.key}: {result.status}"
+        if result.status != "skipped":
+            line += f" in {result.seconds:.1f}s"
+        if result.error:
+            line += f" ({result.error})"
+        if summary.eta_seconds is not None:
+            eta = timedelta(seconds=round(summary.eta_seconds))
+            line += f", {summary.windows_per_hour:.1f} windows/h, ETA {eta}"
+        print(line)
+
+    summary = runner.run(on_progress)
+    print(
+        f"Processed {summary.completed} windows ({summary.skipped} skipped,"
+        f" {summary.failed} failed) in {summary.seconds:.1f}s"
+    )
+    if summary.completed_through is not None:
+        print(f"Completed through {summary.completed_through.isoformat()}")
+    if summary.failed:
+        raise typer.Exit(code=1)
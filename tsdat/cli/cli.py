@@ -2,7 +2,13 @@
 
 import typer
 
+from .backfill import backfill
 from .generate_schema.generate_schema import generate_schema
+from .report import report
+from .run import run
+from .run_many import run_many
+from .serve import serve
+from .update import update
 
 app = typer.Typer(no_args_is_help=True)
 
@@ -10,6 +16,26 @@ app = typer.Typer(no_args_is_help=True)
 app.command(help="Generate schemas to validate yaml configuration files.")(
     generate_schema
 )
+app.command(
+    help="Route input keys to the pipelines their triggers match and run them."
+)(run)
+app.command(
+    name="run-many",
+    help="Run an ingest pipeline on many inputs, once per output time window.",
+)(run_many)
+app.command(
+    help="Process input keys queued in a spool directory with long-lived pipelines."
+)(serve)
+app.command(
+    help="Reprocess a date range with a transformation pipeline, one window at a time."
+)(backfill)
+app.command(
+    help="Recompute only the windows of a transformation pipeline whose input data"
+    " changed since the last update."
+)(update)
+app.command(
+    help="Summarize recorded pipeline run metrics and flag performance regressions."
+)(report)
 
 
 @app.callback()
@@ -0,0 +1,18 @@
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+
+def collect_input_keys(
+    inputs: Optional[List[str]], inputs_file: Optional[Path]
+) -> List[str]:
+    """Combines the input keys given on the command line with those listed (one per
+    line) in the inputs file."""
+    input_keys = list(inputs or [])
+    if inputs_file is not None:
+        lines = inputs_file.read_text().splitlines()
+        input_keys.extend(line.strip() for line in lines if line.strip())
+    if not input_keys:
+        raise typer.BadParameter("No input keys were provided.")
+    return input_keys
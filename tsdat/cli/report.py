@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from ..metrics import MetricsStore, summarize_runs
+
+
+def report(
+    db: Path = typer.Option(
+        ...,
+        envvar="TSDAT_METRICS_DB",
+        exists=True,
+        dir_okay=False,
+        help="The metrics database. Defaults to $TSDAT_METRICS_DB.",
+    ),
+    datastream: Optional[str] = typer.Option(
+        None, help="Only report on this datastream."
+    ),
+    days: Optional[float] = typer.Option(
+        None, min=0, help="Only include runs from the last number of days."
+    ),
+    recent: int = typer.Option(
+        5, min=1, help="The number of recent runs compared against earlier runs."
+    ),
+    threshold: float = typer.Option(
+        1.5, min=1, help="Slowdown factor above which recent runs are flagged."
+    ),
+):
+    since = None
+    if days is not None:
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+    runs = MetricsStore(db).query(datastream=datastream, since=since)
+    summaries = summarize_runs(runs, recent=recent, threshold=threshold)
+
+    for summary in summaries:
+        print(
+            f"{summary.datastream}: {summary.runs} runs ({summary.failed} failed),"
+            f" median {summary.median_seconds:.2f}s"
+        )
+        if summary.median_throughput is not None:
+            print(f"  throughput: {summary.median_throughput / 1024**2:.2f} MB/s read")
+        if summary.median_rows_out is not None:
+            print(f"  records out: {summary.median_rows_out:g} (median)")
+        print(f"  qc failures: {summary.median_qc_failures:g} (median)")
+        for version, seconds in summary.seconds_by_version.items():
+            print(f"  tsdat {version}: median {seconds:.2f}s")
+        if summary.recent_seconds is not None:
+            print(
+                f"  last {recent} runs: median {summary.recent_seconds:.2f}s vs"
+                f" {summary.baseline_seconds:.2f}s before"
+            )
+        if summary.regression:
+            print(f"  REGRESSION (largest slowdown in '{summary.slowest_stage}')")
+    regressions = sum(summary.regression for summary in summaries)
+    print(f"{len(summaries)} datastreams, {regressions} with regressions")
@@ -0,0 +1,58 @@
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+from ..pipeline.dispatcher import PipelineDispatcher
+from .collect_input_keys import collect_input_keys
+
+
+def run(
+    config_dir: Path = typer.Argument(
+        ...,
+        exists=True,
+        file_okay=False,
+        help="The directory to search for pipeline config files.",
+    ),
+    inputs: Optional[List[str]] = typer.Argument(
+        None, help="The input keys to process."
+    ),
+    inputs_file: Optional[Path] = typer.Option(
+        None,
+        exists=True,
+        dir_okay=False,
+        help="A file listing additional input keys to process, one per line.",
+    ),
+    workers: int = typer.Option(
+        1, min=1, help="The number of worker processes used to run pipelines."
+    ),
+    glob: str = typer.Option(
+        "**/pipeline*.yaml", help="Glob pattern used to find pipeline config files."
+    ),
+    force: bool = typer.Option(
+        False,
+        help="Process inputs even if the storage's input manifest shows they were"
+        " already processed and haven't changed.",
+    ),
+):
+    input_keys = collect_input_keys(inputs, inputs_file)
+    dispatcher = PipelineDispatcher.from_dir(config_dir, glob)
+    print(f"Loaded {len(dispatcher.config_paths)} pipeline configs from {config_dir}")
+
+    results = dispatcher.run(input_keys, workers=workers, force=force)
+    for result in results:
+        line = f"{result.status:<8} {result.seconds:8.2f}s  {result.input_key}"
+        if result.pipeline is not None:
+            line += f"  ->  {result.pipeline}"
+        if result.error is not None:
+            line += f"  ({result.error})"
+        print(line)
+
+    counts = Counter(result.status for result in results)
+    print(
+        f"Processed {len(results)} inputs: {counts['success']} succeeded,"
+        f" {counts['failed']} failed, {counts['skipped']} skipped"
+    )
+    if counts["failed"]:
+        raise typer.Exit(code=1)
@@ -0,0 +1,60 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import typer
+
+from ..config.pipeline.pipeline_cache import load_pipeline
+from ..pipeline.pipelines import RunManyError
+from .collect_input_keys import collect_input_keys
+
+
+def run_many(
+    config: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="The pipeline config file to run."
+    ),
+    inputs: Optional[List[str]] = typer.Argument(
+        None, help="The input keys to process."
+    ),
+    inputs_file: Optional[Path] = typer.Option(
+        None,
+        exists=True,
+        dir_okay=False,
+        help="A file listing additional input keys to process, one per line.",
+    ),
+    window: str = typer.Option(
+        "1D", help="The length of each output time window, e.g., '1D' or '6h'."
+    ),
+    filename_template: Optional[str] = typer.Option(
+        None,
+        help="Template used to extract the time from input filenames. Defaults to the"
+        " first YYYYMMDD[.hhmmss] date in each filename.",
+    ),
+    force: bool = typer.Option(
+        False,
+        help="Process inputs even if the storage's input manifest shows they were"
+        " already processed and haven't changed.",
+    ),
+):
+    input_keys = collect_input_keys(inputs, inputs_file)
+
+    pipeline = load_pipeline(config)
+    errors: Dict[datetime, BaseException] = {}
+    try:
+        groups = pipeline.run_many(  # type: ignore
+            input_keys, window=window, filename_template=filename_template, force=force
+        )
+    except RunManyError as e:
+        groups, errors = e.groups, e.errors
+    for window_start, window_inputs in groups.items():
+        line = f"{window_start.isoformat()}: {len(window_inputs)} inputs"
+        if window_start in errors:
+            error = errors[window_start]
+            line += f" (failed: {type(error).__name__}: {error})"
+        print(line)
+    print(
+        f"Processed {len(input_keys)} inputs in {len(groups)} windows"
+        f" ({len(errors)} failed)"
+    )
+    if errors:
+        raise typer.Exit(code=1)
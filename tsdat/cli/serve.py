@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import typer
+
+from ..pipeline.worker import PipelineWorker
+
+
+def serve(
+    config_dir: Path = typer.Argument(
+        ...,
+        exists=True,
+        file_okay=False,
+        help="The directory to search for pipeline config files.",
+    ),
+    spool_dir: Path = typer.Argument(
+        ...,
+        file_okay=False,
+        help="The directory to read jobs (files listing input keys) from.",
+    ),
+    workers: int = typer.Option(
+        1, min=1, help="The number of worker processes used to run pipelines."
+    ),
+    glob: str = typer.Option(
+        "**/pipeline*.yaml", help="Glob pattern used to find pipeline config files."
+    ),
+    poll_interval: float = typer.Option(
+        1.0, min=0.0, help="Seconds to wait between checks for new jobs."
+    ),
+    once: bool = typer.Option(
+        False, help="Process the jobs that are already queued and exit."
+    ),
+):
+    worker = PipelineWorker(
+        config_dir,
+        spool_dir,
+        pattern=glob,
+        workers=workers,
+        poll_interval=poll_interval,
+    )
+    print(f"Loaded {len(worker.dispatcher.config_paths)} pipeline configs")
+    if once:
+        try:
+            worker.process_pending()
+        finally:
+            worker.close()
+    else:
+        worker.serve()
+
+    for name, stats in worker.stats.items():
+        print(
+            f"{name}: {stats.count} runs, {stats.failures} failed,"
+            f" mean {stats.mean_seconds:.2f}s, max {stats.max_seconds:.2f}s"
+        )
+    print(f"Processed {worker.jobs_processed} jobs")
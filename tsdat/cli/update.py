@@ -0,0 +1,50 @@
+from pathlib import Path
+from typing import Optional
+
+import typer
+
+from ..pipeline.backfill import BackfillSummary, WindowResult
+from ..pipeline.incremental import IncrementalUpdate
+
+
+def update(
+    config: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="The pipeline config file to run."
+    ),
+    days: float = typer.Option(
+        1.0, min=0.0, help="The length of each window, in days."
+    ),
+    state_file: Optional[Path] = typer.Option(
+        None,
+        dir_okay=False,
+        help="JSON file recording the input data consumed by each window. Defaults to"
+        " '.incremental.<config name>.json' next to the config.",
+    ),
+    dry_run: bool = typer.Option(
+        False, help="Only print the windows that would be recomputed."
+    ),
+):
+    if state_file is None:
+        state_file = config.parent / f".incremental.{config.stem}.json"
+    runner = IncrementalUpdate(config, state_file, days=days)
+
+    if dry_run:
+        for start, end in runner.find_stale_windows():
+            print(f"{start.isoformat()} - {end.isoformat()}")
+        return
+
+    def on_progress(result: WindowResult, summary: BackfillSummary) -> None:
+        done = summary.windows - summary.remaining
+        line = f"[{done}/{summary.windows}] {result.key}: {result.status}"
+        line += f" in {result.seconds:.1f}s"
+        if result.error:
+            line += f" ({result.error})"
+        print(line)
+
+    summary = runner.run(on_progress)
+    print(
+        f"Recomputed {summary.completed} windows ({summary.failed} failed) in"
+        f" {summary.seconds:.1f}s"
+    )
+    if summary.failed:
+        raise typer.Exit(code=1)
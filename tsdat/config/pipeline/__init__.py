@@ -1,5 +1,8 @@
+from .pipeline_cache import get_pipeline_cache_key, load_pipeline
 from .pipeline_config import PipelineConfig
 
 __all__ = [
     "PipelineConfig",
+    "get_pipeline_cache_key",
+    "load_pipeline",
 ]
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from jsonpointer import set_pointer  # type: ignore
+
+from ...pipeline.base import Pipeline
+from ..utils import matches_overridable_schema, read_yaml
+from .pipeline_config import PipelineConfig, get_resolved_cfg_path
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHED_PIPELINES = 64
+"""The number of pipelines kept in the cache directory. The least recently used ones are
+removed first."""
+
+
+def load_pipeline(
+    config_path: Path,
+    overrides: Optional[Dict[str, Any]] = None,
+    cache_dir: Optional[Path] = None,
+) -> Pipeline:
+    """---------------------------------------------------------------------------------
+    Instantiates the pipeline from its config file, reusing a cached copy if possible.
+
+    Validating the configs and instantiating every class they reference is a large part
+    of the cost of short pipeline runs. The instantiated pipeline is therefore pickled
+    to the cache directory under a hash of everything it was built from: the contents
+    of the pipeline config and every linked config file, the overrides, the source of
+    every module a ``classname`` refers to, the tsdat and Python versions, the working
+    directory, and any ``TSDAT_*`` environment variables. Changing any of these simply
+    results in a new cache entry, and only the `MAX_CACHED_PIPELINES` most recently used
+    entries are kept. Pipelines that can't be pickled are not cached.
+
+    The cache is off unless a directory is given by the `cache_dir` argument or the
+    ``TSDAT_PIPELINE_CACHE`` environment variable. Set ``TSDAT_PIPELINE_CACHE=on`` to use
+    ``~/.cache/tsdat/pipelines`` (respecting ``XDG_CACHE_HOME``).
+
+    NOTE: Cached pipelines are unpickled, which can run arbitrary code, so only use a
+    cache directory that no one else can write to.
+
+    Args:
+        config_path (Path): The path to the pipeline config file.
+        overrides (Optional[Dict[str, Any]]): Overrides to apply to the pipeline config,
+            as in `PipelineConfig.from_yaml()`. Defaults to None.
+        cache_dir (Optional[Path]): The directory to cache pipelines in. Defaults to
+            the ``TSDAT_PIPELINE_CACHE`` environment variable.
+
+    Returns:
+        Pipeline: The instantiated pipeline.
+
+    ---------------------------------------------------------------------------------"""
+    cache_dir = _get_cache_dir(cache_dir)
+    if cache_dir is None:
+        return PipelineConfig.from_yaml(config_path, overrides).instantiate_pipeline()
+
+    cache_file = cache_dir / f"{get_pipeline_cache_key(config_path, overrides)}.pkl"
+    if cache_file.is_file():
+        try:
+            with open(cache_file, "rb") as file:
+                pipeline = pickle.load(file)
+            os.utime(cache_file)  # Marks it as recently used
+            return pipeline
+        except Exception:
+            logger.warning("Ignoring unreadable pipeline cache file %s", cache_file)
+
+    pipeline = PipelineConfig.from_yaml(config_path, overrides).instantiate_pipeline()
+    try:
+        data = pickle.dumps(pipeline, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        logger.debug("Pipeline %s can't be cached: %s", config_path, e)
+        return pipeline
+
+    # Write to a temporary file first so concurrent readers never see a partial file
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=cache_dir, delete=False) as file:
+        file.write(data)
+    os.replace(file.name, cache_file)
+    _prune(cache_dir)
+    return pipeline
+
+
+def get_pipeline_cache_key(
+    config_path: Path, overrides: Optional[Dict[str, Any]] = None
+) -> str:
+    """Returns a hash of everything the pipeline instantiated from the config depends
+    on. See `load_pipeline()` for details."""
+    from ... import get_version
+
+    config_path = Path(config_path)
+    config = read_yaml(config_path)
+    for pointer, new_value in (overrides or {}).items():
+        set_pointer(config, pointer, new_value)
+
+    sources: List[Path] = [config_path]
+    configs: List[Any] = [config]
+    for field in ("retriever", "dataset", "quality", "storage"):
+        value = config.get(field)
+        if isinstance(value, dict) and matches_overridable_schema(value):
+            linked_path = get_resolved_cfg_path(value["path"], config_path)  # type: ignore
+            sources.append(linked_path)
+            configs.append(read_yaml(linked_path))
+    modules = sorted({c.rsplit(".", 1)[0] for c in _find_classnames(configs)})
+
+    digest = hashlib.sha256()
+    environment = {k: v for k, v in os.environ.items() if k.startswith("TSDAT_")}
+    environment.pop("TSDAT_PIPELINE_CACHE", None)
+    header = [get_version(), sys.version, os.getcwd(), environment, overrides]
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode())
+    for path in sources:
+        digest.update(path.resolve().as_posix().encode())
+        digest.update(path.read_bytes())
+    for module in modules:
+        digest.update(module.encode())
+        origin = _get_module_origin(module)
+        if origin is not None:
+            digest.update(origin.read_bytes())
+    return digest.hexdigest()
+
+
+def _get_cache_dir(cache_dir: Optional[Path]) -> Optional[Path]:
+    if cache_dir is not None:
+        return Path(cache_dir)
+    setting = os.environ.get("TSDAT_PIPELINE_CACHE", "").strip()
+    if setting.lower() in ("", "0", "off", "false"):
+        return None
+    if setting.lower() not in ("1", "on", "true"):
+        return Path(setting)
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "tsdat" / "pipelines"
+
+
+def _prune(cache_dir: Path) -> None:
+    # Removes the least recently used pipelines. Files removed concurrently are ignored
+    entries: List[Tuple[float, Path]] = []
+    for path in cache_dir.glob("*.pkl"):
+        try:
+            entries.append((path.stat().st_mtime, path))
+        except OSError:
+            pass
+    entries.sort(reverse=True)
+    for _, path in entries[MAX_CACHED_PIPELINES:]:
+        path.unlink(missing_ok=True)
+
+
+def _find_classnames(obj: Any) -> Iterator[str]:
+    if isinstance(obj, dict):
+        for key, value in obj.items():  # type: ignore
+            if key == "classname" and isinstance(value, str):
+                yield value
+            else:
+                yield from _find_classnames(value)
+    elif isinstance(obj, list):
+        for item in obj:  # type: ignore
+            yield from _find_classnames(item)
+
+
+def _get_module_origin(module: str) -> Optional[Path]:
+    try:
+        spec = find_spec(module)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not Path(spec.origin).is_file():
+        return None
+    return Path(spec.origin)
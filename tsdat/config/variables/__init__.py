@@ -1,11 +1,24 @@
 # IDEA: Variables/Coordinates via __root__=Dict[str, Variable/Coordinate]
 # TODO: Variables/Coordinates validators; name uniqueness, coords has time, etc
 
+from typing import Any
+
 from .coordinate import Coordinate
+from .ureg import get_ureg
 from .variable import Variable
 from .variable_attributes import VariableAttributes
 
-from .ureg import ureg
+# Importing the submodule binds its name here, which would shadow the registry
+globals().pop("ureg", None)
+
+
+def __getattr__(name: str) -> Any:
+    # `from tsdat.config.variables import ureg` returns the pint UnitRegistry, which is
+    # only built when first used
+    if name == "ureg":
+        return get_ureg()
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
 
 __all__ = [
     "Coordinate",
@@ -1,41 +1,62 @@
 import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
-from pint import UnitRegistry
+if TYPE_CHECKING:  # pragma: no cover
+    from pint import UnitRegistry
 
-ureg = UnitRegistry(autoconvert_offset_to_baseunit=True)
 
-# Latitude/Longitude
-ureg.define("@alias degree = degree_north")
-ureg.define("@alias degree = degree_N")
-ureg.define("@alias degree = degN")
-ureg.define("@alias degree = degree_east")
-ureg.define("@alias degree = degree_E")
-ureg.define("@alias degree = degE")
+@lru_cache(maxsize=None)
+def get_ureg() -> "UnitRegistry":
+    """Returns the pint UnitRegistry used by tsdat, with the extra units and aliases
+    commonly found in tsdat datasets. The registry is slow to build, so it is created
+    the first time it is needed rather than when tsdat is imported."""
+    from pint import UnitRegistry
 
-# Power
-ureg.define("var = volt * ampere * imaginary")
-ureg.define("@alias var = VAR")
+    # Some of the definitions below intentionally replace pint's defaults (e.g., '%')
+    ureg = UnitRegistry(autoconvert_offset_to_baseunit=True, on_redefinition="ignore")
 
-# Temperature
-ureg.define("@alias degree_Fahrenheit = degree_F")
-ureg.define("@alias degree_Celsius = degree_C")
-ureg.define("@alias degree_Rankine = degree_R")
-ureg.define("@alias kelvin = Kelvin")
+    # Latitude/Longitude
+    ureg.define("@alias degree = degree_north")
+    ureg.define("@alias degree = degree_N")
+    ureg.define("@alias degree = degN")
+    ureg.define("@alias degree = degree_east")
+    ureg.define("@alias degree = degree_E")
+    ureg.define("@alias degree = degE")
 
-# Salinity
-ureg.define("psu = []")
+    # Power
+    ureg.define("var = volt * ampere * imaginary")
+    ureg.define("@alias var = VAR")
 
-# Parts per
-ureg.define("ppm = 1e-6")
-ureg.define("ppb = 1e-9")
-ureg.define("ppt = 1e-12")
+    # Temperature
+    ureg.define("@alias degree_Fahrenheit = degree_F")
+    ureg.define("@alias degree_Celsius = degree_C")
+    ureg.define("@alias degree_Rankine = degree_R")
+    ureg.define("@alias kelvin = Kelvin")
 
-# Percent
-ureg.define("@alias percent = %")
+    # Salinity
+    ureg.define("psu = []")
 
-# Other
-ureg.define("fraction = []")
-ureg.define("unitless = []")
+    # Parts per
+    ureg.define("ppm = 1e-6")
+    ureg.define("ppb = 1e-9")
+    ureg.define("ppt = 1e-12")
+
+    # Percent
+    ureg.define("@alias percent = %")
+
+    # Other
+    ureg.define("fraction = []")
+    ureg.define("unitless = []")
+
+    return ureg
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards compatibility for `from tsdat.config.variables.ureg import ureg`
+    if name == "ureg":
+        return get_ureg()
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 
 def check_unit(unit_str: str, keep_exp: bool) -> str:
@@ -43,7 +64,7 @@ def check_unit(unit_str: str, keep_exp: bool) -> str:
 
     if not unit_str or unit_str == "1":
         return unit_str
-    
+
     # Not recognized by pint, but we want it to be valid
     if unit_str.lower().startswith("seconds since"):
         return unit_str
@@ -56,7 +77,7 @@ def check_unit(unit_str: str, keep_exp: bool) -> str:
     unit_str = unit_exponent.sub("^", unit_str)
 
     # Validate with pint unit registry
-    ureg(unit_str)
+    get_ureg()(unit_str)
 
     # Remove exponent if not used
     if not keep_exp and not carrot_flag:
@@ -1,10 +1,25 @@
+import re
 from abc import ABC
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from typing import (
+    IO,
+    Callable,
     Dict,
+    List,
+    Pattern,
+    Tuple,
+    Union,
 )
 
+import xarray as xr
+from pydantic import PrivateAttr
+
 from .data_reader import DataReader
 
+# Opens an archive member and returns a readable binary stream for it
+MemberOpener = Callable[[], IO[bytes]]
+
 
 class ArchiveReader(DataReader, ABC):
     """------------------------------------------------------------------------------------
@@ -17,6 +32,9 @@ class ArchiveReader(DataReader, ABC):
 
     exclude: str = ""
 
+    _exclude_pattern: Pattern[str] = PrivateAttr()
+    _reader_patterns: List[Tuple[Pattern[str], DataReader]] = PrivateAttr()
+
     def __init__(self, parameters: Dict = None):  # type: ignore
         super().__init__(parameters=parameters)
 
@@ -25,3 +43,66 @@ class ArchiveReader(DataReader, ABC):
         exclude = [".*\\_\\_MACOSX/.*", ".*\\.DS_Store"]
         exclude.extend(getattr(self.parameters, "exclude", []))
         self.parameters.exclude = "(?:% s)" % "|".join(exclude)
+
+        # Compile the patterns once instead of for every archive member
+        self._exclude_pattern = re.compile(self.parameters.exclude)
+        readers: Dict[str, DataReader] = getattr(self.parameters, "readers", {})
+        self._reader_patterns = [
+            (re.compile(pattern), reader)
+            for pattern, reader in readers.items()
+            if reader
+        ]
+
+    def _match_member_readers(self, filename: str) -> List[DataReader]:
+        """Returns the DataReaders that should be used to read the archive member."""
+        if self._exclude_pattern.match(filename):
+            return []
+        return [r for pattern, r in self._reader_patterns if pattern.match(filename)]
+
+    def _read_members(
+        self,
+        members: List[Tuple[str, DataReader, MemberOpener]],
+        max_workers: int = 1,
+    ) -> Dict[str, xr.Dataset]:
+        """------------------------------------------------------------------------------------
+        Reads archive members with their DataReaders, optionally in parallel.
+
+        DataReaders that set `supports_streams` are handed the member stream directly,
+        avoiding an in-memory copy of the member. Other DataReaders get a BytesIO copy.
+
+        Args:
+            members (List[Tuple[str, DataReader, MemberOpener]]): The member filename,
+                the DataReader to use, and a callable that opens the member for reading.
+            max_workers (int): The number of threads used to decode members. Defaults to
+                1, which reads members sequentially.
+
+        Returns:
+            Dict[str, xr.Dataset]: A mapping of {label: xr.Dataset} in member order.
+
+        ------------------------------------------------------------------------------------
+        """
+
+        def decode(
+            filename: str, reader: DataReader, open_member: MemberOpener
+        ) -> Dict[str, xr.Dataset]:
+            with open_member() as stream:
+                if reader.supports_streams:
+                    data = reader.read(stream)  # type: ignore
+                else:
+                    data = reader.read(BytesIO(stream.read()))  # type: ignore
+            if isinstance(data, xr.Dataset):
+                data = {filename: data}
+            return data
+
+        results: List[Union[Dict[str, xr.Dataset], None]] = []
+        if max_workers > 1 and len(members) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(decode, *member) for member in members]
+                results = [future.result() for future in futures]
+        else:
+            results = [decode(*member) for member in members]
+
+        output: Dict[str, xr.Dataset] = {}
+        for data in results:
+            output.update(data or {})
+        return output
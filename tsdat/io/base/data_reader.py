@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 from typing import (
+    ClassVar,
     Dict,
+    Iterator,
+    Optional,
     Union,
 )
 
@@ -14,6 +17,10 @@ from ...utils import (
 class DataReader(ParameterizedClass, ABC):
     """Base class for reading data from an input source."""
 
+    supports_streams: ClassVar[bool] = False
+    """Whether `read()` can consume a readable binary stream in place of a path. Archive
+    readers pass such DataReaders the member stream directly instead of a copy."""
+
     @abstractmethod
     def read(
         self,
@@ -41,3 +48,62 @@ class DataReader(ParameterizedClass, ABC):
 
         -----------------------------------------------------------------------------"""
         ...
+
+    def read_subset(
+        self,
+        input_key: str,
+        variables: Dict[str, Optional[str]],
+    ) -> Union[xr.Dataset, Dict[str, xr.Dataset]]:
+        """-----------------------------------------------------------------------------
+        Reads data given an input key, optionally limited to the requested variables.
+
+        Retrievers call this method instead of `read()` when they know in advance which
+        input variables they will use. DataReaders that can skip parsing unneeded
+        variables (or parse them directly as a target dtype) should override this
+        method. The default implementation ignores the hints and calls `read()`, so the
+        returned dataset may contain more variables than were requested.
+
+        Args:
+            input_key (str): An input key matching the DataReader's regex pattern that
+                should be used to load data.
+            variables (Dict[str, Optional[str]]): A mapping of input variable names to
+                the dtype they may be parsed as, or None if the dtype should be left for
+                the reader to determine.
+
+        Returns:
+            Union[xr.Dataset, Dict[str, xr.Dataset]]: The raw data extracted from the
+                provided input key.
+
+        -----------------------------------------------------------------------------"""
+        return self.read(input_key)
+
+    def read_chunks(
+        self,
+        input_key: str,
+        chunk_size: int,
+        variables: Optional[Dict[str, Optional[str]]] = None,
+    ) -> Iterator[Union[xr.Dataset, Dict[str, xr.Dataset]]]:
+        """-----------------------------------------------------------------------------
+        Reads data given an input key as a sequence of time-ordered chunks.
+
+        Streaming DataReaders should override this method to yield datasets holding at
+        most `chunk_size` records along the time dimension, so that the whole input
+        never has to be held in memory at once. The default implementation yields the
+        entire input as a single chunk.
+
+        Args:
+            input_key (str): An input key matching the DataReader's regex pattern that
+                should be used to load data.
+            chunk_size (int): The maximum number of records to include in each chunk.
+            variables (Dict[str, Optional[str]], optional): Input variables to read, as
+                described in `read_subset()`. Defaults to None (read everything).
+
+        Yields:
+            Union[xr.Dataset, Dict[str, xr.Dataset]]: The raw data extracted from the
+                provided input key, one chunk at a time.
+
+        -----------------------------------------------------------------------------"""
+        if variables is None:
+            yield self.read(input_key)
+        else:
+            yield self.read_subset(input_key, variables)
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import (
     Any,
     Dict,
+    Iterator,
     List,
     Optional,
     Pattern,
@@ -56,6 +57,32 @@ class Retriever(ParameterizedClass, ABC):
         -----------------------------------------------------------------------------"""
         ...
 
+    def retrieve_chunks(
+        self,
+        input_keys: List[str],
+        dataset_config: DatasetConfig,
+        chunk_size: int,
+        **kwargs: Any,
+    ) -> Iterator[xr.Dataset]:
+        """-----------------------------------------------------------------------------
+        Retrieves the input data as a sequence of time-ordered chunks.
+
+        Each yielded dataset has the same structure as the output of `retrieve()`, but
+        only holds a slice of the records. Retrievers that cannot stream their inputs
+        yield the fully retrieved dataset as a single chunk, which is the default.
+
+        Args:
+            input_keys (List[str]): The input keys the registered DataReaders should
+                read from.
+            dataset_config (DatasetConfig): The specification of the output dataset.
+            chunk_size (int): The maximum number of records to read per chunk.
+
+        Yields:
+            xr.Dataset: The retrieved dataset, one chunk at a time.
+
+        -----------------------------------------------------------------------------"""
+        yield self.retrieve(input_keys, dataset_config, **kwargs)
+
     def match_coord(self, var_name: str, input_key: str) -> RetrievedVariable | None:
         mapping = self.coords[var_name]
         for pattern, ret_var in mapping.items():
@@ -4,11 +4,13 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
 from typing import (
+    TYPE_CHECKING,
     Any,
     Callable,
     Dict,
     Generator,
     List,
+    Optional,
     Union,
 )
 
@@ -24,6 +26,9 @@ from ...utils import (
 )
 from .data_handler import DataHandler
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..storage.input_manifest import InputManifest
+
 
 class Storage(ParameterizedClass, ABC):
     """Abstract base class for the tsdat Storage API. Subclasses of Storage are used in
@@ -105,6 +110,11 @@ class Storage(ParameterizedClass, ABC):
         """
         return []
 
+    def get_input_manifest(self) -> Optional["InputManifest"]:
+        """Returns the record of inputs already processed into this storage area, used
+        by pipelines to skip unchanged inputs, or None if inputs aren't tracked."""
+        return None
+
     @abstractmethod
     def save_data(self, dataset: xr.Dataset, **kwargs: Any):
         """-----------------------------------------------------------------------------
@@ -282,24 +292,38 @@ class Storage(ParameterizedClass, ABC):
         Yields:
             Path: A temporary directory where files can be saved.
         """
-        tmp_dir = tempfile.TemporaryDirectory()
+        tmp_dir = self._get_uploadable_tmp_dir()
         tmp_dirpath = Path(tmp_dir.name)
-
-        yield tmp_dirpath
-
-        for path in tmp_dirpath.glob("**/*"):
-            if path.is_file():
-                # Users are expected to call self.get_ancillary_filename() with
-                # root_dir=tmp_dir (yield value from this function) or save files to
-                # tmp_dir / filename (using root_dir=None, the default, for
-                # get_ancillary_filename()).
-                #
-                # With these assumptions, we can get the target filepath by replacing
-                # tmp_dir with self.parameters.storage_root
-                target = self.parameters.storage_root / path.relative_to(tmp_dirpath)
-                self.save_ancillary_file(path, target_path=target)
-
-        tmp_dir.cleanup()
+        try:
+            yield tmp_dirpath
+
+            # Listed up front since the files may be moved out of tmp_dir
+            for path in list(tmp_dirpath.glob("**/*")):
+                if path.is_file():
+                    # Users are expected to call self.get_ancillary_filename() with
+                    # root_dir=tmp_dir (yield value from this function) or save files to
+                    # tmp_dir / filename (using root_dir=None, the default, for
+                    # get_ancillary_filename()).
+                    #
+                    # With these assumptions, we can get the target filepath by
+                    # replacing tmp_dir with self.parameters.storage_root
+                    target = self.parameters.storage_root / path.relative_to(
+                        tmp_dirpath
+                    )
+                    self._publish_ancillary_file(path, target_path=target)
+        finally:
+            tmp_dir.cleanup()
+
+    def _get_uploadable_tmp_dir(self) -> tempfile.TemporaryDirectory:  # type: ignore
+        """Returns the temporary directory used by `uploadable_dir()`. Subclasses that
+        save ancillary files locally can create it next to the storage area, so the
+        files can be moved there instead of copied."""
+        return tempfile.TemporaryDirectory()
+
+    def _publish_ancillary_file(self, filepath: Path, target_path: Path):
+        """Saves a file from the `uploadable_dir()` to the storage area. The file is
+        deleted afterwards, so subclasses may move it instead of copying it."""
+        self.save_ancillary_file(filepath, target_path=target_path)
 
     def _get_substitutions(
         self,
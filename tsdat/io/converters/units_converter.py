@@ -5,7 +5,7 @@ import pandas as pd
 import xarray as xr
 from pint.errors import PintError
 
-from tsdat.config.variables.ureg import check_unit, ureg
+from tsdat.config.variables.ureg import check_unit, get_ureg
 
 from ...config.dataset import DatasetConfig
 from ...config.variables import Variable
@@ -57,10 +57,10 @@ class UnitsConverter(DataConverter):
         try:
             # Run pint and set output data
             out_dtype = dataset_config[variable_name].dtype
-            converted = (data.data * ureg(input_units)).to(output_units).magnitude
+            converted = (data.data * get_ureg()(input_units)).to(output_units).magnitude
             data_array = data.copy(data=converted.astype(out_dtype))
         except AttributeError:
-            print(f"{data=}, {ureg(input_units)=}, {output_units=}")
+            print(f"{data=}, {get_ureg()(input_units)=}, {output_units=}")
             raise
 
         # Use original output units text
@@ -1,4 +1,5 @@
 from .a2e_csv_reader import A2eCSVReader as A2eCSVReader
+from .binary_record_reader import BinaryRecordReader
 from .csv_reader import CSVReader
 from .netcdf_reader import NetCDFReader
 from .parquet_reader import ParquetReader
@@ -7,6 +8,7 @@ from .zarr_reader import ZarrReader
 from .zip_reader import ZipReader
 
 __all__ = [
+    "BinaryRecordReader",
     "CSVReader",
     "NetCDFReader",
     "ParquetReader",
@@ -0,0 +1,170 @@
+import logging
+import os
+from typing import Any, Dict, List, Literal, Optional, Union
+
+import numpy as np
+import xarray as xr
+from numpy.typing import NDArray
+from pydantic import BaseModel, Extra, StrictInt, validator
+
+from ..base import DataReader
+
+logger = logging.getLogger(__name__)
+
+
+class BinaryRecordField(BaseModel, extra=Extra.forbid):
+    """Describes a single field of a fixed-length binary record."""
+
+    dtype: str
+    """The numpy dtype of the field, e.g., 'f4', '<u2', or 'S8'."""
+
+    offset: Optional[int] = None
+    """The byte offset of the field within a record. Defaults to the end of the
+    previous field."""
+
+    shape: List[int] = []
+    """The shape of the field within each record, for array-valued fields."""
+
+    dims: Optional[List[str]] = None
+    """The dimensions of the field. Defaults to the record dimension followed by
+    '{name}_dim_{i}' for each axis in 'shape'."""
+
+
+class BinaryRecordReader(DataReader):
+    """---------------------------------------------------------------------------------
+    Reads files made of fixed-length binary records into an xarray Dataset.
+
+    The record layout is described by a structured numpy dtype built from the `fields`
+    parameter. The file is memory-mapped (copy-on-write) and each field is exposed as a
+    zero-copy view into the mapping, so no per-record unpacking takes place and data
+    are only paged in from disk once they are used. Records are indexed along the `dim`
+    dimension.
+
+    Example configuration:
+
+    ```yaml
+    readers:
+      .*\\.bin:
+        classname: tsdat.io.readers.BinaryRecordReader
+        parameters:
+          header_size: 128  # bytes to skip at the start of the file
+          byteorder: ">"  # applies to fields without an explicit byteorder
+          record_size: 32  # optional; defaults to the end of the last field
+          fields:
+            sync: {dtype: u2}
+            seconds: {dtype: f8, offset: 4}
+            temperature: {dtype: f4}
+            counts: {dtype: u2, shape: [4], dims: [index, channel]}
+          sync_field: sync
+          sync_value: 0xA55A
+          on_invalid_sync: drop  # or 'raise'
+    ```
+
+    ---------------------------------------------------------------------------------"""
+
+    class Parameters(BaseModel, extra=Extra.forbid):
+        fields: Dict[str, BinaryRecordField]
+        header_size: int = 0
+        byteorder: Literal["<", ">", "="] = "<"
+        record_size: Optional[int] = None
+        dim: str = "index"
+        sync_field: Optional[str] = None
+        sync_value: Optional[Union[StrictInt, str]] = None
+        on_invalid_sync: Literal["drop", "raise"] = "drop"
+
+        @validator("sync_value")
+        def sync_value_requires_sync_field(
+            cls, v: Optional[Union[StrictInt, str]], values: Dict[str, Any]
+        ) -> Optional[Union[StrictInt, str]]:
+            fields = values.get("fields", {})
+            if v is not None and values.get("sync_field") not in fields:
+                raise ValueError("'sync_value' requires 'sync_field' to be a field.")
+            return v
+
+    parameters: Parameters
+
+    @property
+    def record_dtype(self) -> np.dtype:  # type: ignore
+        names: List[str] = []
+        formats: List[Any] = []
+        offsets: List[int] = []
+        position = 0
+        for name, field in self.parameters.fields.items():
+            dtype = np.dtype(field.dtype)
+            if field.dtype[0] not in "<>=|!" and dtype.byteorder != "|":
+                dtype = dtype.newbyteorder(self.parameters.byteorder)
+            offset = position if field.offset is None else field.offset
+            names.append(name)
+            formats.append((dtype, tuple(field.shape)) if field.shape else dtype)
+            offsets.append(offset)
+            position = offset + dtype.itemsize * int(np.prod(field.shape or [1]))
+        spec: Dict[str, Any] = dict(names=names, formats=formats, offsets=offsets)
+        if self.parameters.record_size is not None:
+            spec["itemsize"] = self.parameters.record_size
+        return np.dtype(spec)
+
+    def read(self, input_key: str) -> xr.Dataset:
+        records = self._map_records(input_key)
+        records = self._validate_sync(records, input_key)
+        dim = self.parameters.dim
+        data_vars: Dict[str, Any] = {}
+        for name, field in self.parameters.fields.items():
+            dims = field.dims or [dim] + [
+                f"{name}_dim_{i}" for i in range(len(field.shape))
+            ]
+            data_vars[name] = (dims, records[name])
+        return xr.Dataset(data_vars=data_vars)
+
+    def _map_records(self, input_key: Any) -> NDArray[Any]:
+        dtype = self.record_dtype
+        header_size = self.parameters.header_size
+        if isinstance(input_key, (str, os.PathLike)):
+            n_bytes = os.path.getsize(input_key) - header_size
+            n_records, remainder = divmod(max(n_bytes, 0), dtype.itemsize)
+            self._warn_partial_record(remainder, input_key)
+            if n_records == 0:
+                return np.empty(0, dtype=dtype)
+            return np.memmap(  # type: ignore
+                input_key, dtype=dtype, mode="c", offset=header_size, shape=n_records
+            )
+
+        # Streams (e.g., archive members) can't be mapped, so view their buffer instead
+        buffer = input_key.getbuffer() if hasattr(input_key, "getbuffer") else None
+        if buffer is None:
+            buffer = input_key.read()
+        n_records, remainder = divmod(max(len(buffer) - header_size, 0), dtype.itemsize)
+        self._warn_partial_record(remainder, input_key)
+        return np.frombuffer(buffer, dtype=dtype, count=n_records, offset=header_size)
+
+    def _validate_sync(self, records: NDArray[Any], input_key: Any) -> NDArray[Any]:
+        if self.parameters.sync_value is None:
+            return records
+        sync_field = records[self.parameters.sync_field]
+        sync_value = self.parameters.sync_value
+        if isinstance(sync_value, str) and sync_field.dtype.kind == "S":
+            sync_value = sync_value.encode()
+        valid = sync_field == sync_value
+        if valid.all():
+            return records
+        n_invalid = int((~valid).sum())
+        if self.parameters.on_invalid_sync == "raise":
+            raise ValueError(
+                f"{n_invalid} of {len(records)} records in '{input_key}' do not have"
+                f" the expected sync value {self.parameters.sync_value!r}."
+            )
+        logger.warning(
+            "Dropping %d of %d records in '%s' with an invalid sync value.",
+            n_invalid,
+            len(records),
+            input_key,
+        )
+        return records[valid]
+
+    @staticmethod
+    def _warn_partial_record(remainder: int, input_key: Any) -> None:
+        if remainder:
+            logger.warning(
+                "Ignoring %d trailing bytes in '%s' that do not make up a full record.",
+                remainder,
+                input_key,
+            )
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, ClassVar, Dict, Iterator, Optional
 
 import pandas as pd
 import xarray as xr
@@ -14,14 +14,96 @@ class CSVReader(DataReader):
     `from_dataframe_kwargs`, whose contents are passed as keyword arguments to
     `pandas.read_csv()` and `xarray.Dataset.from_dataframe()` respectively.
 
+    When used by a retriever, only the columns the retriever needs are parsed and
+    floating-point columns are parsed directly as their output dtype. This can be
+    disabled with the `project_columns` parameter. Setting `engine: pyarrow` in
+    `read_csv_kwargs` is supported and is usually the fastest option for wide files.
+
     ---------------------------------------------------------------------------------"""
 
     class Parameters(BaseModel, extra=Extra.forbid):
         read_csv_kwargs: Dict[str, Any] = {}
         from_dataframe_kwargs: Dict[str, Any] = {}
+        project_columns: bool = True
+        """If True, only parse the columns requested by the retriever. Projection is
+        skipped if `read_csv_kwargs` already sets `usecols` or sets `index_col` or
+        `parse_dates` by column position."""
 
     parameters: Parameters = Parameters()
 
+    supports_streams: ClassVar[bool] = True
+
     def read(self, input_key: str) -> xr.Dataset:
         df: pd.DataFrame = pd.read_csv(input_key, **self.parameters.read_csv_kwargs)  # type: ignore
         return xr.Dataset.from_dataframe(df, **self.parameters.from_dataframe_kwargs)
+
+    def read_subset(
+        self, input_key: str, variables: Dict[str, Optional[str]]
+    ) -> xr.Dataset:
+        read_csv_kwargs = self._get_projected_kwargs(input_key, variables)
+        if read_csv_kwargs is None:
+            return self.read(input_key)
+        df: pd.DataFrame = pd.read_csv(input_key, **read_csv_kwargs)  # type: ignore
+        return xr.Dataset.from_dataframe(df, **self.parameters.from_dataframe_kwargs)
+
+    def read_chunks(
+        self,
+        input_key: str,
+        chunk_size: int,
+        variables: Optional[Dict[str, Optional[str]]] = None,
+    ) -> Iterator[xr.Dataset]:
+        read_csv_kwargs = None
+        if variables is not None:
+            read_csv_kwargs = self._get_projected_kwargs(input_key, variables)
+        if read_csv_kwargs is None:
+            read_csv_kwargs = dict(self.parameters.read_csv_kwargs)
+
+        # The pyarrow engine cannot stream, so fall back to pandas' default C parser
+        if read_csv_kwargs.get("engine") == "pyarrow":
+            read_csv_kwargs.pop("engine")
+
+        with pd.read_csv(input_key, chunksize=chunk_size, **read_csv_kwargs) as chunks:  # type: ignore
+            for df in chunks:
+                yield xr.Dataset.from_dataframe(
+                    df, **self.parameters.from_dataframe_kwargs
+                )
+
+    def _get_projected_kwargs(
+        self, input_key: Any, variables: Dict[str, Optional[str]]
+    ) -> Optional[Dict[str, Any]]:
+        kwargs = dict(self.parameters.read_csv_kwargs)
+        if not self.parameters.project_columns or not variables or "usecols" in kwargs:
+            return None
+
+        # Columns referenced by other read_csv options must be parsed as well
+        keep = set(variables)
+        for option in ("index_col", "parse_dates"):
+            value = kwargs.get(option)
+            if value is None or isinstance(value, bool):
+                continue
+            value = value if isinstance(value, list) else [value]
+            if not all(isinstance(v, str) for v in value):  # type: ignore
+                return None
+            keep.update(value)  # type: ignore
+
+        if kwargs.get("engine") == "pyarrow":
+            # pyarrow requires a list of columns that actually exist in the file
+            ignore = {"engine", "index_col", "parse_dates", "dtype"}
+            header_kwargs = {k: v for k, v in kwargs.items() if k not in ignore}
+            columns = pd.read_csv(input_key, nrows=0, **header_kwargs).columns  # type: ignore
+            if hasattr(input_key, "seek"):
+                input_key.seek(0)
+            kwargs["usecols"] = [c for c in columns if c in keep]
+        else:
+            kwargs["usecols"] = lambda column: column in keep  # type: ignore
+
+        # Explicit dtypes from read_csv_kwargs always take precedence
+        # (pandas' pyarrow engine fails to combine per-column dtypes with index_col)
+        user_dtype = kwargs.get("dtype")
+        pyarrow_index = kwargs.get("engine") == "pyarrow" and "index_col" in kwargs
+        if not pyarrow_index and (user_dtype is None or isinstance(user_dtype, dict)):
+            dtypes = {n: dtype for n, dtype in variables.items() if dtype is not None}
+            dtypes.update(user_dtype or {})  # type: ignore
+            if dtypes:
+                kwargs["dtype"] = dtypes
+        return kwargs
@@ -1,18 +1,99 @@
-from typing import Any, Dict
+import os
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Any, Dict, Iterator, Optional
 
 import xarray as xr
 
 from ..base import DataReader
 
+HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+
 
 class NetCDFReader(DataReader):
     """---------------------------------------------------------------------------------
     Thin wrapper around xarray's `open_dataset()` function, with optional parameters
     used as keyword arguments in the function call.
 
+    Datasets are opened lazily, so data are only read from disk once they are used. When
+    used by a retriever, variables the retriever does not need are dropped before they
+    are ever read or decoded.
+
+    With the `engine: auto` parameter, netCDF4/HDF5 files are opened with the h5netcdf
+    engine when it is installed, because it does not serialize reads through the global
+    netCDF-C lock and can read directly from streams. Other files, or all files if
+    h5netcdf isn't installed, use xarray's default engine. Note that h5netcdf can
+    decode some variables and attributes differently than the netCDF4 engine.
+
+    When read in chunks, the file is opened lazily and sliced along its 'time' dimension
+    (or its first unlimited dimension), loading one chunk into memory at a time.
+
     ---------------------------------------------------------------------------------"""
 
     parameters: Dict[str, Any] = {}
 
     def read(self, input_key: str) -> xr.Dataset:
-        return xr.open_dataset(input_key, **self.parameters)  # type: ignore
+        parameters = dict(self.parameters)
+        if parameters.get("engine") == "auto":
+            engine = self._select_engine(input_key)
+            if engine is None:
+                del parameters["engine"]
+            else:
+                parameters["engine"] = engine
+        return xr.open_dataset(input_key, **parameters)  # type: ignore
+
+    def read_subset(
+        self, input_key: str, variables: Dict[str, Optional[str]]
+    ) -> xr.Dataset:
+        dataset = self.read(input_key)
+        if not set(variables).intersection(dataset.variables):
+            return dataset
+        keep = set(variables) | set(dataset.dims)
+        to_drop = [name for name in dataset.variables if name not in keep]
+        return dataset.drop_vars(to_drop)
+
+    def read_chunks(
+        self,
+        input_key: str,
+        chunk_size: int,
+        variables: Optional[Dict[str, Optional[str]]] = None,
+    ) -> Iterator[xr.Dataset]:
+        if variables is None:
+            dataset = self.read(input_key)
+        else:
+            dataset = self.read_subset(input_key, variables)
+        dim = self._get_record_dim(dataset)
+        if dim is None:
+            yield dataset
+            return
+        for start in range(0, dataset.sizes[dim], chunk_size):
+            yield dataset.isel({dim: slice(start, start + chunk_size)}).load()
+
+    @staticmethod
+    def _get_record_dim(dataset: xr.Dataset) -> Optional[str]:
+        if "time" in dataset.dims:
+            return "time"
+        unlimited_dims = dataset.encoding.get("unlimited_dims", set())
+        return next(iter(sorted(unlimited_dims)), None)
+
+    @staticmethod
+    def _select_engine(input_key: Any) -> Optional[str]:
+        if not _h5netcdf_installed():
+            return None
+        if isinstance(input_key, (str, os.PathLike)):
+            if not os.path.isfile(input_key):
+                return None  # e.g., remote urls; let xarray decide
+            with open(input_key, "rb") as file:
+                signature = file.read(len(HDF5_SIGNATURE))
+        elif hasattr(input_key, "seek") and hasattr(input_key, "read"):
+            position = input_key.tell()
+            signature = input_key.read(len(HDF5_SIGNATURE))
+            input_key.seek(position)
+        else:
+            return None
+        return "h5netcdf" if signature == HDF5_SIGNATURE else None
+
+
+@lru_cache(maxsize=None)
+def _h5netcdf_installed() -> bool:
+    return find_spec("h5netcdf") is not None and find_spec("h5py") is not None
@@ -1,12 +1,13 @@
-import re
 import tarfile
+from functools import partial
 from io import BytesIO
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Tuple
 
 import xarray as xr
 from pydantic import BaseModel, Extra
 
 from ..base import ArchiveReader, DataReader
+from ..base.archive_reader import MemberOpener
 
 
 class TarReader(ArchiveReader):
@@ -50,6 +51,10 @@ class TarReader(ArchiveReader):
             # Pattern(s) used to exclude certain files in the archive from being handled.
             # This parameter is optional, and the default value is shown below:
             exclude: ['.*__MACOSX/.*', '.*DS_Store']
+
+            # The number of threads used to decode members of the archive in parallel.
+            # This parameter is optional, and the default value is shown below:
+            max_workers: 1
     ```
 
     """
@@ -59,6 +64,7 @@ class TarReader(ArchiveReader):
         read_tar_kwargs: Dict[str, Any] = {}
         readers: Dict[str, Any] = {}
         exclude: List[str] = []
+        max_workers: int = 1
 
     parameters: Parameters = Parameters()
 
@@ -88,21 +94,29 @@ class TarReader(ArchiveReader):
         else:
             fileobj = input_key
 
-        tar = tarfile.open(fileobj=fileobj, **self.parameters.read_tar_kwargs)  # type: ignore
-
-        for info_obj in tar:  # type: ignore
-            filename = info_obj.name  # type: ignore
-            if re.match(self.parameters.exclude, filename):  # type: ignore
-                continue
-
-            for key in self.parameters.readers.keys():
-                reader: Optional[DataReader] = self.parameters.readers.get(key, None)
-                if reader:
-                    tar_bytes = BytesIO(tar.extractfile(filename).read())  # type: ignore
-                    data = reader.read(tar_bytes)  # type: ignore
-
-                    if isinstance(data, xr.Dataset):
-                        data = {filename: data}  # type: ignore
-                    output.update(data)  # type: ignore
-
+        # TarFile objects are not thread-safe and compressed tars can only be read
+        # efficiently front-to-back, so members are always extracted in order here.
+        # With max_workers > 1 only the decoding of the extracted bytes is parallel.
+        max_workers = self.parameters.max_workers
+        members: List[Tuple[str, DataReader, MemberOpener]] = []
+        try:
+            with tarfile.open(fileobj=fileobj, **self.parameters.read_tar_kwargs) as tar:  # type: ignore
+                for info_obj in tar:
+                    if not info_obj.isfile():
+                        continue
+                    filename = info_obj.name
+                    for reader in self._match_member_readers(filename):
+                        if max_workers > 1:
+                            content = tar.extractfile(info_obj).read()  # type: ignore
+                            opener = partial(BytesIO, content)
+                            members.append((filename, reader, opener))
+                        else:
+                            opener = partial(tar.extractfile, info_obj)
+                            member = (filename, reader, opener)
+                            output.update(self._read_members([member]))  # type: ignore
+        finally:
+            if fileobj is not input_key:
+                fileobj.close()  # type: ignore
+
+        output.update(self._read_members(members, max_workers))
         return output
@@ -1,12 +1,11 @@
-import re
-from io import BytesIO
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, Dict, List
 from zipfile import ZipFile
 
 import xarray as xr
 from pydantic import BaseModel, Extra
 
-from ..base import ArchiveReader, DataReader
+from ..base import ArchiveReader
 
 
 class ZipReader(ArchiveReader):
@@ -49,6 +48,10 @@ class ZipReader(ArchiveReader):
             # Pattern(s) used to exclude certain files in the archive from being handled.
             # This parameter is optional, and the default value is shown below:
             exclude: ['.*__MACOSX/.*', '.*DS_Store']
+
+            # The number of threads used to read members of the archive in parallel.
+            # This parameter is optional, and the default value is shown below:
+            max_workers: 1
     ```
 
     """
@@ -58,6 +61,7 @@ class ZipReader(ArchiveReader):
         read_zip_kwargs: Dict[str, Any] = {}
         readers: Dict[str, Any] = {}
         exclude: List[str] = []
+        max_workers: int = 1
 
     parameters: Parameters = Parameters()
 
@@ -73,8 +77,6 @@ class ZipReader(ArchiveReader):
         Returns:
             Dict[str, xr.Dataset]: A mapping of {label: xr.Dataset}.
         """
-        output: Dict[str, xr.Dataset] = {}
-
         # If we are reading from a string / filepath then add option to specify more
         # parameters for opening (i.e., mode or encoding options)
         fileobj = None
@@ -85,23 +87,16 @@ class ZipReader(ArchiveReader):
         else:
             fileobj = input_key
 
-        zip_file = ZipFile(file=fileobj, **self.parameters.read_zip_kwargs)  # type: ignore
-
-        for filename in zip_file.namelist():
-            if re.match(self.parameters.exclude, filename):  # type: ignore
-                continue
-
-            for key in self.parameters.readers.keys():
-                if not re.match(key, filename):
-                    continue
-
-                reader: Optional[DataReader] = self.parameters.readers.get(key, None)
-                if reader:
-                    zip_bytes = BytesIO(zip_file.read(filename))
-                    data = reader.read(zip_bytes)  # type: ignore
-
-                    if isinstance(data, xr.Dataset):
-                        data = {filename: data}
-                    output.update(data)
-
-        return output
+        try:
+            with ZipFile(file=fileobj, **self.parameters.read_zip_kwargs) as zip_file:  # type: ignore
+                # ZipFile supports reading several members at once, so members can be
+                # opened lazily from the worker threads.
+                members = [
+                    (filename, reader, partial(zip_file.open, filename))
+                    for filename in zip_file.namelist()
+                    for reader in self._match_member_readers(filename)
+                ]
+                return self._read_members(members, self.parameters.max_workers)
+        finally:
+            if fileobj is not input_key:
+                fileobj.close()  # type: ignore
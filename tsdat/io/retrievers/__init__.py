@@ -11,8 +11,11 @@ from .storage_retriever import StorageRetriever
 from .storage_retriever_input import StorageRetrieverInput
 
 from .perform_data_retrieval import perform_data_retrieval
+from ._concat_sequential import _concat_sequential
+from ._get_input_variables import _get_input_variables
 from ._reindex_dataset_coords import _reindex_dataset_coords
 from ._rename_variables import _rename_variables
+from ._retrieval_plan import RetrievalPlan
 from ._run_data_converters import _run_data_converters
 
 __all__ = [
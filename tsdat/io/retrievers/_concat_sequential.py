@@ -0,0 +1,97 @@
+from typing import (
+    List,
+    Optional,
+)
+
+import numpy as np
+import xarray as xr
+
+
+def _concat_sequential(
+    datasets: List[xr.Dataset], dim: str = "time"
+) -> Optional[xr.Dataset]:
+    """-----------------------------------------------------------------------------
+    Concatenates consecutive datasets that share the same structure along a dimension.
+
+    This is a fast path for the common case of merging many time-sequential files. The
+    datasets must have the same variables with the same dimensions, identical values
+    for everything that is not indexed by `dim`, and sorted, non-overlapping indexes
+    along `dim`. In that case an outer-join merge is equivalent to a concatenation, which
+    avoids aligning every dataset on the union of all indexes and comparing overlapping
+    values. Each variable is concatenated with a single allocation.
+
+    Variables along `dim` are cast to the dtypes the merge would give them: an outer
+    join fills each dataset's missing records with NaN, so e.g. integer and boolean data
+    become floating point and strings become objects. With that, the result is identical
+    to `xr.merge()`, dtypes included.
+
+    Args:
+        datasets (List[xr.Dataset]): The datasets to combine, in any order.
+        dim (str): The dimension to concatenate along. Defaults to 'time'.
+
+    Returns:
+        Optional[xr.Dataset]: The combined dataset, or None if the datasets do not meet
+            the requirements above and must be merged instead.
+
+    -----------------------------------------------------------------------------"""
+    if len(datasets) < 2 or not all(dim in ds.indexes for ds in datasets):
+        return None
+
+    first = datasets[0]
+    schema = {name: var.dims for name, var in first.variables.items()}
+    for ds in datasets[1:]:
+        if {name: var.dims for name, var in ds.variables.items()} != schema:
+            return None
+
+    # Sort by the first index value and require each dataset to start after the
+    # previous one ends
+    indexes = [ds.indexes[dim] for ds in datasets]
+    if not all(len(index) and index.is_monotonic_increasing for index in indexes):
+        return None
+    if not all(index.is_unique for index in indexes):
+        return None
+    order = sorted(range(len(datasets)), key=lambda i: indexes[i][0])
+    for prev, curr in zip(order, order[1:]):
+        if not indexes[prev][-1] < indexes[curr][0]:
+            return None
+
+    # Variables that don't vary along the dimension must agree everywhere
+    static = [name for name, dims in schema.items() if dim not in dims]
+    for ds in datasets[1:]:
+        if not all(ds[name].equals(first[name]) for name in static):
+            return None
+
+    combined = xr.concat(
+        [datasets[i] for i in order],
+        dim=dim,
+        data_vars="minimal",
+        coords="minimal",
+        compat="override",
+        join="override",
+        combine_attrs="override",
+    )
+
+    for name, dims in schema.items():
+        if dim in dims and name != dim:
+            dtype = _get_merged_dtype(combined[name].dtype)
+            if dtype != combined[name].dtype:
+                combined[name] = combined[name].astype(dtype)
+
+    # xr.merge keeps the attributes of the first dataset given, not the earliest one
+    combined.attrs = dict(first.attrs)
+    for name, var in first.variables.items():
+        combined[name].attrs = dict(var.attrs)
+    return combined
+
+
+def _get_merged_dtype(dtype: np.dtype) -> np.dtype:  # type: ignore
+    # The dtype xarray gives data filled with NaN (or NaT) where records are missing
+    if dtype.kind == "b":
+        # Booleans are reindexed to objects, which merging then turns into floats
+        return np.dtype(np.float64)
+    if dtype.kind in "fcmM":
+        return dtype
+    if dtype.kind in "iu":
+        # Integers of up to 16 bits fit in float32, larger ones need float64
+        return np.result_type(dtype, np.float32)
+    return np.dtype(object)
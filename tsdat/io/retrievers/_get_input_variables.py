@@ -0,0 +1,64 @@
+from typing import (
+    Dict,
+    Optional,
+)
+
+import numpy as np
+
+from .input_key_retrieval_rules import InputKeyRetrievalRules
+from ..base import RetrievedVariable
+from ..converters import UnitsConverter
+from ...config.dataset import DatasetConfig
+
+
+def _get_input_variables(
+    dataset_config: DatasetConfig,
+    input_config: InputKeyRetrievalRules,
+) -> Dict[str, Optional[str]]:
+    """-----------------------------------------------------------------------------
+    Collects the input variable names the retrieval rules need from an input key.
+
+    Each input variable name is mapped to the dtype it can safely be parsed as, or to
+    None if the reader should infer it. A dtype is only provided for variables that
+    end up as floating-point outputs and that are not transformed by anything other
+    than a UnitsConverter (which casts to the output dtype anyway). This lets readers
+    skip unneeded variables and avoid a second cast later in the pipeline.
+
+    Args:
+        dataset_config (DatasetConfig): The output dataset configuration.
+        input_config (InputKeyRetrievalRules): The rules selected for the input key.
+
+    Returns:
+        Dict[str, Optional[str]]: A mapping of input variable names to dtypes.
+
+    -----------------------------------------------------------------------------"""
+    variables: Dict[str, Optional[str]] = {}
+    rules: Dict[str, RetrievedVariable] = {
+        **input_config.coord_rules,
+        **input_config.data_var_rules,
+    }
+    for output_name, rule in rules.items():
+        dtype = _get_parse_dtype(output_name, rule, dataset_config)
+        names = rule.name if isinstance(rule.name, list) else [rule.name]
+        for name in names:
+            # The same input may feed several outputs; only keep a dtype all agree on
+            if name in variables and variables[name] != dtype:
+                variables[name] = None
+            else:
+                variables[name] = dtype
+    return variables
+
+
+def _get_parse_dtype(
+    output_name: str, rule: RetrievedVariable, dataset_config: DatasetConfig
+) -> Optional[str]:
+    if output_name not in dataset_config:
+        return None
+    if not all(isinstance(dc, UnitsConverter) for dc in rule.data_converters):
+        return None
+    dtype = dataset_config[output_name].dtype
+    try:
+        is_float = np.dtype(dtype).kind == "f"
+    except TypeError:
+        return None
+    return dtype if is_float else None
@@ -0,0 +1,150 @@
+import logging
+from copy import copy
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import xarray as xr
+
+from ._get_input_variables import _get_input_variables
+from ._reindex_dataset_coords import _reindex_dataset_coords
+from ._run_data_converters import _run_data_converters
+from .input_key_retrieval_rules import InputKeyRetrievalRules
+from ..base import RetrievedVariable
+from ...config.dataset import DatasetConfig
+from ...const import VarName
+
+logger = logging.getLogger(__name__)
+
+
+class RetrievalPlan:
+    """---------------------------------------------------------------------------------
+    Retrieval rules compiled for all input keys that match the same retrieval patterns.
+
+    The plan resolves which input variables map to which output coords and data_vars
+    once, so preparing a dataset only has to check which of those inputs are present,
+    rename them, reindex the coords, and run the converters. The retrieval rules are
+    never modified, so they do not need to be copied for each input key.
+
+    Args:
+        input_config (InputKeyRetrievalRules): The rules selected for any input key
+            matching the patterns this plan was compiled for.
+
+    ---------------------------------------------------------------------------------"""
+
+    def __init__(self, input_config: InputKeyRetrievalRules):
+        self.input_config = input_config
+
+        # (raw_name, output_name) pairs in the order the rules were declared
+        self.coord_names: List[Tuple[str, VarName]] = _get_raw_names(
+            input_config.coord_rules
+        )
+        self.data_var_names: List[Tuple[str, VarName]] = _get_raw_names(
+            input_config.data_var_rules
+        )
+
+        self.to_rename: Dict[str, str] = dict(self.coord_names + self.data_var_names)
+        for raw_name, output_name in self.coord_names:
+            # Don't rename coordinate if name hasn't changed
+            if raw_name == output_name:
+                self.to_rename.pop(raw_name, None)
+
+        self._input_variables: Optional[Dict[str, Optional[str]]] = None
+        self._input_variables_config: Optional[DatasetConfig] = None
+
+    def get_input_variables(
+        self, dataset_config: DatasetConfig
+    ) -> Dict[str, Optional[str]]:
+        """Returns the input variables needed by the plan and the dtypes to read them
+        as. The result is cached for the most recently used DatasetConfig."""
+        if self._input_variables_config is not dataset_config:
+            self._input_variables = _get_input_variables(
+                dataset_config, self.input_config
+            )
+            self._input_variables_config = dataset_config
+        return self._input_variables  # type: ignore
+
+    def apply(self, dataset: xr.Dataset, dataset_config: DatasetConfig) -> xr.Dataset:
+        """-----------------------------------------------------------------------------
+        Renames, reindexes, and converts the variables of a raw dataset.
+
+        Args:
+            dataset (xr.Dataset): The raw dataset returned by the DataReader.
+            dataset_config (DatasetConfig): The specification of the output dataset.
+
+        Returns:
+            xr.Dataset: The prepared dataset.
+
+        -----------------------------------------------------------------------------"""
+        input_config = self.input_config
+        to_rename = self.to_rename
+        missing = self._find_missing(dataset)
+        if missing:
+            input_config, to_rename = self._without_missing(missing)
+        dataset = dataset.rename(to_rename)
+        dataset = _reindex_dataset_coords(dataset, dataset_config, input_config)
+        dataset = _run_data_converters(dataset, dataset_config, input_config)
+        return dataset
+
+    def _find_missing(self, dataset: xr.Dataset) -> Set[str]:
+        missing: Set[str] = set()
+        for raw_name, output_name in self.coord_names:
+            if raw_name not in dataset:
+                missing.add(raw_name)
+                logger.warning(
+                    "Coordinate variable '%s' could not be retrieved from input. Please"
+                    " ensure the retrieval configuration file for the '%s' coord has"
+                    " the 'name' property set to the exact name of the variable in the"
+                    " dataset returned by the input DataReader.",
+                    raw_name,
+                    output_name,
+                )
+        for raw_name, output_name in self.data_var_names:
+            if raw_name not in dataset:
+                missing.add(raw_name)
+                logger.warning(
+                    "Data variable '%s' could not be retrieved from input. Please"
+                    " ensure the retrieval configuration file for the '%s' data"
+                    " variable has the 'name' property set to the exact name of the"
+                    " variable in the dataset returned by the input DataReader.",
+                    raw_name,
+                    output_name,
+                )
+        return missing
+
+    def _without_missing(
+        self, missing: Set[str]
+    ) -> Tuple[InputKeyRetrievalRules, Dict[str, str]]:
+        # Outputs are only dropped if none of their input names could be found
+        found = {
+            output_name
+            for raw_name, output_name in self.coord_names + self.data_var_names
+            if raw_name not in missing
+        }
+        input_config = copy(self.input_config)
+        input_config.coord_rules = {
+            name: rule
+            for name, rule in self.input_config.coord_rules.items()
+            if name in found
+        }
+        input_config.data_var_rules = {
+            name: rule
+            for name, rule in self.input_config.data_var_rules.items()
+            if name in found
+        }
+        to_rename = {k: v for k, v in self.to_rename.items() if k not in missing}
+        return input_config, to_rename
+
+
+def _get_raw_names(
+    rules: Dict[VarName, RetrievedVariable],
+) -> List[Tuple[str, VarName]]:
+    raw_names: List[Tuple[str, VarName]] = []
+    for output_name, rule in rules.items():
+        names = rule.name if isinstance(rule.name, list) else [rule.name]
+        raw_names.extend((name, output_name) for name in names)
+    return raw_names
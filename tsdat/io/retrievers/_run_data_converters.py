@@ -1,6 +1,7 @@
 import xarray as xr
 
 from .input_key_retrieval_rules import InputKeyRetrievalRules
+from ...tracing import span
 from ...utils import assign_data
 from ...config.dataset import DatasetConfig
 from ..base import (
@@ -31,18 +32,28 @@ def _run_data_converters(
     for coord_name, coord_config in input_config.coord_rules.items():
         for converter in coord_config.data_converters:
             data_array = retrieved_dataset.coords[coord_name]
-            data = converter.convert(
-                data_array, coord_name, dataset_config, retrieved_dataset
-            )
+            with span(
+                "data_converter",
+                converter=converter.__repr_name__(),
+                variable=coord_name,
+            ):
+                data = converter.convert(
+                    data_array, coord_name, dataset_config, retrieved_dataset
+                )
             if data is not None:
                 retrieved_dataset.coords[coord_name] = data
                 dataset = assign_data(dataset, data.data, coord_name)
     for var_name, var_config in input_config.data_var_rules.items():
         for converter in var_config.data_converters:
             data_array = retrieved_dataset.data_vars[var_name]
-            data = converter.convert(
-                data_array, var_name, dataset_config, retrieved_dataset
-            )
+            with span(
+                "data_converter",
+                converter=converter.__repr_name__(),
+                variable=var_name,
+            ):
+                data = converter.convert(
+                    data_array, var_name, dataset_config, retrieved_dataset
+                )
             if data is not None:
                 retrieved_dataset.data_vars[var_name] = data
                 dataset = assign_data(dataset, data.data, var_name)
@@ -1,24 +1,26 @@
 import logging
-from copy import deepcopy
 from typing import (
     Any,
     Dict,
+    Iterator,
     List,
+    Optional,
     Pattern,
+    Tuple,
     cast,
 )
 
 import xarray as xr
-from pydantic import BaseModel, Extra
+from pydantic import BaseModel, Extra, PrivateAttr
 
 from ...config.dataset import DatasetConfig
+from ...tracing import span
 from ..base import (
     DataReader,
     Retriever,
 )
-from ._reindex_dataset_coords import _reindex_dataset_coords
-from ._rename_variables import _rename_variables
-from ._run_data_converters import _run_data_converters
+from ._concat_sequential import _concat_sequential
+from ._retrieval_plan import RetrievalPlan
 from .input_key_retrieval_rules import InputKeyRetrievalRules
 
 logger = logging.getLogger(__name__)
@@ -29,7 +31,11 @@ class DefaultRetriever(Retriever):
 
     Reads data from one or more inputs, renames coordinates and data variables according
     to retrieval and dataset configurations, and applies registered DataConverters to
-    retrieved data."""
+    retrieved data.
+
+    Retrieval rules are compiled into a RetrievalPlan the first time an input key
+    matching a new combination of retrieval patterns is seen. Plans are cached on the
+    retriever, so input keys matching the same patterns reuse them across runs."""
 
     class Parameters(BaseModel, extra=Extra.forbid):
         merge_kwargs: Dict[str, Any] = {"join": "outer", "compat": "no_conflicts"}
@@ -37,6 +43,12 @@ class DefaultRetriever(Retriever):
         input keys are provided simultaneously, or if any registered DataReader objects
         could return a dataset mapping instead of a single dataset."""
 
+        concat_sequential: bool = True
+        """If True, datasets with the same structure and sorted, non-overlapping 'time'
+        indexes are concatenated along 'time' instead of being merged, which is much
+        faster for many time-sequential files. Only used with the default
+        merge_kwargs; other datasets are always merged with xr.merge()."""
+
         # IDEA: option to disable retrieval of input attrs
         # retain_global_attrs: bool = True
         # retain_variable_attrs: bool = True
@@ -47,30 +59,99 @@ class DefaultRetriever(Retriever):
     """A mapping of patterns to DataReaders that the retriever uses to determine which
     DataReader to use for reading any given input key."""
 
+    _rule_patterns: Optional[List[Pattern[str]]] = PrivateAttr(default=None)
+    _plans: Dict[Tuple[bool, ...], RetrievalPlan] = PrivateAttr(default_factory=dict)
+
     def retrieve(
         self, input_keys: List[str], dataset_config: DatasetConfig, **kwargs: Any
     ) -> xr.Dataset:
-        raw_mapping = self._get_raw_mapping(input_keys)
+        raw_mapping = self._get_raw_mapping(input_keys, dataset_config)
         dataset_mapping: Dict[str, xr.Dataset] = {}
         for key, dataset in raw_mapping.items():
-            input_config = InputKeyRetrievalRules(
-                input_key=key,
-                coord_rules=deepcopy(self.coords),  # type: ignore
-                data_var_rules=deepcopy(self.data_vars),  # type: ignore
+            dataset_mapping[key] = self._prepare_raw_dataset(
+                key, dataset, dataset_config
             )
-            dataset = _rename_variables(dataset, input_config)
-            dataset = _reindex_dataset_coords(dataset, dataset_config, input_config)
-            dataset = _run_data_converters(dataset, dataset_config, input_config)
-            dataset_mapping[key] = dataset
         output_dataset = self._merge_raw_mapping(dataset_mapping)
         return output_dataset
 
-    def _get_raw_mapping(self, input_keys: List[str]) -> Dict[str, xr.Dataset]:
+    def retrieve_chunks(
+        self,
+        input_keys: List[str],
+        dataset_config: DatasetConfig,
+        chunk_size: int,
+        **kwargs: Any,
+    ) -> Iterator[xr.Dataset]:
+        """-----------------------------------------------------------------------------
+        Retrieves the input data as a sequence of time-ordered chunks.
+
+        Input keys are streamed one after the other in the order given, so they should
+        be sorted by time and share the same structure. Each chunk read from an input
+        key is renamed, reindexed, and converted just like in `retrieve()`.
+
+        Args:
+            input_keys (List[str]): The input keys the registered DataReaders should
+                read from.
+            dataset_config (DatasetConfig): The specification of the output dataset.
+            chunk_size (int): The maximum number of records to read per chunk.
+
+        Yields:
+            xr.Dataset: The retrieved dataset, one chunk at a time.
+
+        -----------------------------------------------------------------------------"""
+        input_reader_mapping = self._match_inputs(input_keys)
+        for input_key, reader in input_reader_mapping.items():
+            logger.debug("Using %s to stream input_key '%s'", reader, input_key)
+            variables = self._get_input_variables(input_key, dataset_config)
+            for data in reader.read_chunks(input_key, chunk_size, variables):
+                if isinstance(data, xr.Dataset):
+                    data = {input_key: data}
+                dataset_mapping = {
+                    key: self._prepare_raw_dataset(key, dataset, dataset_config)
+                    for key, dataset in data.items()
+                }
+                yield self._merge_raw_mapping(dataset_mapping)
+
+    def _prepare_raw_dataset(
+        self, input_key: str, dataset: xr.Dataset, dataset_config: DatasetConfig
+    ) -> xr.Dataset:
+        return self._get_plan(input_key).apply(dataset, dataset_config)
+
+    def _get_input_variables(
+        self, input_key: str, dataset_config: DatasetConfig
+    ) -> Dict[str, Optional[str]]:
+        return self._get_plan(input_key).get_input_variables(dataset_config)
+
+    def _get_plan(self, input_key: str) -> RetrievalPlan:
+        # Input keys matching the same set of patterns select the same rules, so each
+        # distinct pattern only needs to be matched once per input key
+        if self._rule_patterns is None:
+            rules = [*self.coords.values(), *self.data_vars.values()]
+            patterns = [pattern for rule in rules for pattern in rule]
+            self._rule_patterns = list(dict.fromkeys(patterns))
+        signature = tuple(bool(p.match(input_key)) for p in self._rule_patterns)
+        plan = self._plans.get(signature)
+        if plan is None:
+            input_config = InputKeyRetrievalRules(
+                input_key=input_key,
+                coord_rules=self.coords,  # type: ignore
+                data_var_rules=self.data_vars,  # type: ignore
+            )
+            plan = self._plans[signature] = RetrievalPlan(input_config)
+        return plan
+
+    def _get_raw_mapping(
+        self, input_keys: List[str], dataset_config: Optional[DatasetConfig] = None
+    ) -> Dict[str, xr.Dataset]:
         dataset_mapping: Dict[str, xr.Dataset] = {}
         input_reader_mapping = self._match_inputs(input_keys)
         for input_key, reader in input_reader_mapping.items():  # IDEA: async
             logger.debug("Using %s to read input_key '%s'", reader, input_key)
-            data = reader.read(input_key)
+            with span("read", reader=reader.__repr_name__(), input_key=input_key):
+                if dataset_config is None:
+                    data = reader.read(input_key)
+                else:
+                    variables = self._get_input_variables(input_key, dataset_config)
+                    data = reader.read_subset(input_key, variables)
             if isinstance(data, xr.Dataset):
                 data = {input_key: data}
             dataset_mapping.update(data)
@@ -87,4 +168,13 @@ class DefaultRetriever(Retriever):
         return input_reader_mapping
 
     def _merge_raw_mapping(self, raw_mapping: Dict[str, xr.Dataset]) -> xr.Dataset:
-        return xr.merge(list(raw_mapping.values()), **self.parameters.merge_kwargs)  # type: ignore
+        datasets = list(raw_mapping.values())
+        default_merge = self.Parameters.__fields__["merge_kwargs"].default
+        if (
+            self.parameters.concat_sequential
+            and self.parameters.merge_kwargs == default_merge
+        ):
+            combined = _concat_sequential(datasets)
+            if combined is not None:
+                return combined
+        return xr.merge(datasets, **self.parameters.merge_kwargs)  # type: ignore
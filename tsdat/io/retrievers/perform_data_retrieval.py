@@ -3,6 +3,8 @@ import xarray as xr
 from typing import (
     Any,
     Dict,
+    Iterable,
+    Optional,
     Pattern,
     Tuple,
 )
@@ -32,62 +34,73 @@ def perform_data_retrieval(
     coord_data: Dict[VarName, xr.DataArray] = {}
     data_var_data: Dict[VarName, xr.DataArray] = {}
 
+    # The first input key each distinct pattern matches, computed once for all rules
+    first_match = _match_patterns(
+        [
+            pattern
+            for rules in (coord_rules, data_var_rules)
+            for retriever_dict in rules.values()
+            for pattern in retriever_dict
+        ],
+        input_data,
+    )
+
     # Retrieve coordinates
     for name, retriever_dict in coord_rules.items():
         for pattern, variable_retriever in retriever_dict.items():
-            if name in selected_coord_rules:  # already matched
-                break
-            for input_key, dataset in input_data.items():
-                if pattern.match(input_key):
-                    logger.info(
-                        "Coordinate '%s' retrieved from '%s': '%s'",
-                        name,
-                        input_key,
-                        variable_retriever.name,
-                    )
-                    coord_data[name] = dataset.get(
-                        variable_retriever.name, xr.DataArray([])
-                    )
-                    if not coord_data[name].equals(xr.DataArray([])):
-                        variable_retriever.source = input_key
-                    selected_coord_rules[name] = variable_retriever
-                    break
+            input_key = first_match[pattern]
+            if input_key is None:
+                continue
+            logger.info(
+                "Coordinate '%s' retrieved from '%s': '%s'",
+                name,
+                input_key,
+                variable_retriever.name,
+            )
+            data = input_data[input_key].get(variable_retriever.name)  # type: ignore
+            if data is not None:
+                coord_data[name] = data
+                variable_retriever.source = input_key
+            else:
+                coord_data[name] = xr.DataArray([])
+            selected_coord_rules[name] = variable_retriever
+            break
         if name not in selected_coord_rules:
             logger.warning("Could not retrieve coordinate '%s'.", name)
 
     # Retrieve data variables
     for name, retriever_dict in data_var_rules.items():
         for pattern, variable_retriever in retriever_dict.items():
-            if name in selected_data_var_rules:  # already matched
-                break
-            for input_key, dataset in input_data.items():
-                if pattern.match(input_key):
-                    logger.info(
-                        "Variable '%s' retrieved from '%s': '%s'",
-                        name,
-                        input_key,
-                        variable_retriever.name,
-                    )
-                    data_var_data[name] = dataset.get(
-                        variable_retriever.name, xr.DataArray([])
-                    )
-                    if data_var_data[name].equals(xr.DataArray([])):
-                        logger.warning(
-                            "Input key matched regex pattern but no matching variable"
-                            " could be found in the input dataset. A value of"
-                            " xr.DataArray([]) will be used instead.\n"
-                            "\tVariable: %s\n"
-                            "\tInput Variable: %s\n"
-                            "\tPattern: %s\n"
-                            "\tInput Key: %s\n",
-                            name,
-                            variable_retriever.name,
-                            pattern.pattern,
-                            input_key,
-                        )
-                    variable_retriever.source = input_key
-                    selected_data_var_rules[name] = variable_retriever
-                    break
+            input_key = first_match[pattern]
+            if input_key is None:
+                continue
+            logger.info(
+                "Variable '%s' retrieved from '%s': '%s'",
+                name,
+                input_key,
+                variable_retriever.name,
+            )
+            data = input_data[input_key].get(variable_retriever.name)  # type: ignore
+            if data is not None:
+                data_var_data[name] = data
+            else:
+                data_var_data[name] = xr.DataArray([])
+                logger.warning(
+                    "Input key matched regex pattern but no matching variable"
+                    " could be found in the input dataset. A value of"
+                    " xr.DataArray([]) will be used instead.\n"
+                    "\tVariable: %s\n"
+                    "\tInput Variable: %s\n"
+                    "\tPattern: %s\n"
+                    "\tInput Key: %s\n",
+                    name,
+                    variable_retriever.name,
+                    pattern.pattern,
+                    input_key,
+                )
+            variable_retriever.source = input_key
+            selected_data_var_rules[name] = variable_retriever
+            break
         if name not in selected_data_var_rules:
             logger.warning("Could not retrieve variable '%s'.", name)
 
@@ -99,3 +112,15 @@ def perform_data_retrieval(
     )
 
     # TODO: set default dim_range for time dim (ARM uses 1 day)
+
+
+def _match_patterns(
+    patterns: Iterable[Pattern[Any]], input_keys: Iterable[InputKey]
+) -> Dict[Pattern[Any], Optional[InputKey]]:
+    """Maps each distinct pattern to the first input key it matches, or None."""
+    keys = list(input_keys)
+    first_match: Dict[Pattern[Any], Optional[InputKey]] = {}
+    for pattern in patterns:
+        if pattern not in first_match:
+            first_match[pattern] = next((k for k in keys if pattern.match(k)), None)
+    return first_match
@@ -1,15 +1,19 @@
-from datetime import timedelta
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import (
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     Optional,
+    Tuple,
 )
 
 import pandas as pd
 import xarray as xr
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from ...config.dataset import DatasetConfig
 from ...const import InputKey
@@ -17,6 +21,7 @@ from ..base import (
     Retriever,
     Storage,
 )
+from ..storage import FileSystem
 from .global_arm_transform_params import GlobalARMTransformParams
 from .global_fetch_params import GlobalFetchParams
 from .perform_data_retrieval import perform_data_retrieval
@@ -36,6 +41,37 @@ class StorageRetriever(Retriever):
 
     parameters: Optional[TransParameters] = None
 
+    _fetch_windows: Optional[Dict[Tuple[Any, ...], Dict[Path, xr.Dataset]]] = (
+        PrivateAttr(default=None)
+    )
+
+    @contextmanager
+    def sliding_window(self) -> Iterator[None]:
+        """------------------------------------------------------------------------------------
+        Reuses data fetched for the previous time range while the context is active.
+
+        Consecutive retrievals (e.g., one day after another) with `time_padding` or
+        transformation `range`/`width` parameters fetch overlapping time ranges. While
+        this context is active the data files read by the most recent fetch for each
+        datastream are kept in memory, and a following fetch only reads the files it
+        doesn't share with it from the storage area. The fetched data are the same as
+        without the context, so time ranges are best retrieved in order. Each retrieval
+        gets its own copy of the data, so input data hooks and converters can still
+        modify their inputs in place.
+
+        Only storage classes based on `FileSystem` reuse their files; others fetch all
+        their data each time.
+
+        ------------------------------------------------------------------------------------
+        """
+        previous = self._fetch_windows
+        if previous is None:
+            self._fetch_windows = {}
+        try:
+            yield
+        finally:
+            self._fetch_windows = previous
+
     # TODO: `input_data_hook` is not included in docstring.
     def retrieve(
         self,
@@ -85,7 +121,7 @@ class StorageRetriever(Retriever):
         input_data = self.__fetch_inputs(storage_input_keys, storage)
 
         if input_data_hook is not None:
-            input_data = input_data_hook(input_data)  # type:ignore
+            input_data = input_data_hook(input_data)  # type: ignore
 
         # Perform coord/variable retrieval
         retrieved_data, retrieval_selections = perform_data_retrieval(
@@ -200,15 +236,43 @@ class StorageRetriever(Retriever):
         input_data: Dict[InputKey, xr.Dataset] = {}
         for key in input_keys:
             padding = self._get_retrieval_padding(key.input_key)
-            retrieved_dataset = storage.fetch_data(
+            retrieved_dataset = self.__fetch_window(
+                key,
+                storage,
                 start=key.start - padding[1] if padding[0] < 1 else key.start,
                 end=key.end + padding[1] if padding[0] > -1 else key.end,
-                datastream=key.datastream,
-                metadata_kwargs=key.kwargs,
             )
             input_data[key.input_key] = retrieved_dataset
         return input_data
 
+    def __fetch_window(
+        self,
+        key: StorageRetrieverInput,
+        storage: Storage,
+        start: datetime,
+        end: datetime,
+    ) -> xr.Dataset:
+        if self._fetch_windows is None or not isinstance(storage, FileSystem):
+            return storage.fetch_data(
+                start=start,
+                end=end,
+                datastream=key.datastream,
+                metadata_kwargs=key.kwargs,
+            )
+
+        window_key = (key.datastream, tuple(sorted(key.kwargs.items())))
+        dataset = storage.fetch_data(
+            start=start,
+            end=end,
+            datastream=key.datastream,
+            metadata_kwargs=key.kwargs,
+            opened_files=self._fetch_windows.setdefault(window_key, {}),
+        )
+
+        # Hooks and converters may modify their inputs in place, so hand out a copy
+        # that doesn't share data with the files kept for the next fetch
+        return dataset.copy(deep=True)
+
     # TODO: Seems like a static method here, should refactor into as such.
     def __trim_dataset(
         self, dataset: xr.Dataset, input_keys: List[StorageRetrieverInput]
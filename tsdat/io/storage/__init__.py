@@ -1,9 +1,13 @@
+from .fetch_cache import FetchCache, fetch_cache
 from .file_system import FileSystem
 from .file_system_s3 import FileSystemS3
+from .input_manifest import InputManifest
 from .zarr_local_storage import ZarrLocalStorage
 
 __all__ = [
+    "FetchCache",
     "FileSystem",
     "FileSystemS3",
+    "InputManifest",
     "ZarrLocalStorage",
 ]
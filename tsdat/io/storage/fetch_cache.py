@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Literal, Optional, Tuple
+
+import numpy as np
+import xarray as xr
+
+logger = logging.getLogger(__name__)
+
+FetchCacheMode = Literal["off", "copy", "read_only"]
+
+
+class FetchCache:
+    """---------------------------------------------------------------------------------
+    Thread-safe, in-memory LRU cache of datasets fetched from a storage area.
+
+    Storage classes add fetched datasets under a key that identifies both the request
+    and the exact state of the files it was read from (e.g., their paths and
+    modification times), so an entry can never be served after its files change.
+    Datasets are loaded into memory and their arrays are made read-only when they are
+    added. The least recently used entries are evicted once the cached datasets take up
+    more than `max_bytes` bytes.
+
+    Cached datasets are never handed out directly. Depending on the mode, callers get
+    either a deep copy they are free to modify ('copy'), or a shallow copy whose
+    variables can be reassigned but whose arrays cannot be modified in place
+    ('read_only').
+
+    Args:
+        max_bytes (int): The memory budget for cached datasets. Defaults to the value
+            of the ``TSDAT_FETCH_CACHE_MB`` environment variable (in megabytes), or 1 GB.
+
+    ---------------------------------------------------------------------------------"""
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("TSDAT_FETCH_CACHE_MB", 1024)) * 1024**2
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[xr.Dataset, int]]" = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes used by the cached datasets."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, mode: FetchCacheMode = "copy") -> Optional[xr.Dataset]:
+        """Returns a copy or read-only view of the cached dataset, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _share(entry[0], mode)
+
+    def put(
+        self, key: Hashable, dataset: xr.Dataset, mode: FetchCacheMode = "copy"
+    ) -> xr.Dataset:
+        """Adds the dataset to the cache and returns a copy or read-only view of it."""
+        dataset = dataset.load()
+        nbytes = dataset.nbytes
+        if nbytes > self.max_bytes:
+            logger.debug("Not caching fetched dataset of %d bytes (too large)", nbytes)
+            return dataset
+        for variable in dataset.variables.values():
+            if isinstance(variable.data, np.ndarray):
+                variable.data.flags.writeable = False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous[1]
+            self._entries[key] = (dataset, nbytes)
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_nbytes
+        return _share(dataset, mode)
+
+    def clear(self) -> None:
+        """Removes all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+
+def _share(dataset: xr.Dataset, mode: FetchCacheMode) -> xr.Dataset:
+    return dataset.copy(deep=mode != "read_only")
+
+
+fetch_cache = FetchCache()
+"""The process-wide cache shared by all storage instances that enable `fetch_cache`."""
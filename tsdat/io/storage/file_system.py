@@ -1,18 +1,23 @@
 import logging
+import os
 import re
 import shutil
+import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Union
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Union
 
 import xarray as xr
 from pydantic import Field, validator
 
 from tsdat.tstring import Template
 
+from ...tracing import span
 from ...utils import get_file_datetime
 from ..base import Storage
 from ..handlers import FileHandler, NetCDFHandler
+from .fetch_cache import FetchCacheMode, fetch_cache
+from .input_manifest import InputManifest, InputManifestMode
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +63,38 @@ class FileSystem(Storage):
         At a minimum the template must include ``{date_time}``.
         """
 
+        fetch_cache: FetchCacheMode = Field("off", env="TSDAT_FETCH_CACHE")
+        """Keeps datasets returned by ``fetch_data()`` in a process-wide in-memory cache
+        so pipelines that fetch the same data don't read it again. Entries are tied to
+        the modification times of the files they were read from.
+
+        * ``off``: don't use the cache.
+        * ``copy``: return a deep copy of the cached dataset.
+        * ``read_only``: return a shallow copy whose arrays are read-only. This avoids
+          copying data, but in-place modifications of the data will raise an error.
+
+        The cache budget is set by the ``TSDAT_FETCH_CACHE_MB`` environment variable.
+        Defaults to ``off``.
+
+        NOTE: This parameter can also be set via the ``TSDAT_FETCH_CACHE`` environment
+        variable."""
+
+        input_manifest: InputManifestMode = Field("off", env="TSDAT_INPUT_MANIFEST")
+        """Records the input files processed into each datastream in a SQLite database
+        under the storage root ('.input_manifest.sqlite'), so that ingest pipelines skip
+        inputs that were already processed and haven't changed since (unless run with
+        ``force=True``). See ``InputManifest`` for details. Not supported by
+        ``FileSystemS3``, which logs a warning and ignores it.
+
+        * ``off``: don't record or skip inputs.
+        * ``stat``: inputs are unchanged if their size and modification time are.
+        * ``hash``: inputs are unchanged if their contents' hash is.
+
+        Defaults to ``off``.
+
+        NOTE: This parameter can also be set via the ``TSDAT_INPUT_MANIFEST``
+        environment variable."""
+
         @validator("storage_root", allow_reuse=True)
         def _ensure_storage_root_exists(cls, storage_root: Path) -> Path:
             if not storage_root.is_dir():
@@ -82,6 +119,14 @@ class FileSystem(Storage):
             / self.parameters.data_filename_template
         )
 
+    def get_input_manifest(self) -> Optional[InputManifest]:
+        if self.parameters.input_manifest == "off":
+            return None
+        return InputManifest(
+            self.parameters.storage_root / ".input_manifest.sqlite",
+            self.parameters.input_manifest,
+        )
+
     def last_modified(self, datastream: str) -> Union[datetime, None]:
         """Find the last modified time for any data in that datastream.
 
@@ -158,6 +203,31 @@ class FileSystem(Storage):
         saved_filepath = shutil.copy2(filepath, target_path)
         logger.info("Saved ancillary file to: %s", saved_filepath)
 
+    def _get_uploadable_tmp_dir(self) -> tempfile.TemporaryDirectory:  # type: ignore
+        # Files written next to the storage area can be moved into it with a rename
+        if self._saves_ancillary_files_locally():
+            try:
+                return tempfile.TemporaryDirectory(
+                    prefix=".uploadable-", dir=self.parameters.storage_root
+                )
+            except OSError:
+                logger.debug("Could not create a temporary directory in storage_root")
+        return super()._get_uploadable_tmp_dir()
+
+    def _publish_ancillary_file(self, filepath: Path, target_path: Path):
+        if not self._saves_ancillary_files_locally():
+            return self.save_ancillary_file(filepath, target_path=target_path)
+        target_path.parent.mkdir(exist_ok=True, parents=True)
+        try:
+            os.replace(filepath, target_path)
+        except OSError:  # e.g., across filesystems
+            return self.save_ancillary_file(filepath, target_path=target_path)
+        logger.info("Saved ancillary file to: %s", target_path)
+
+    def _saves_ancillary_files_locally(self) -> bool:
+        # Subclasses (e.g., FileSystemS3) may save ancillary files somewhere else
+        return type(self).save_ancillary_file is FileSystem.save_ancillary_file
+
     def save_data(self, dataset: xr.Dataset, **kwargs: Any):
         """-----------------------------------------------------------------------------
         Saves a dataset to the storage area.
@@ -175,7 +245,9 @@ class FileSystem(Storage):
             self.data_filepath_template.substitute(substitutions, allow_missing=False)
         )
         filepath.parent.mkdir(exist_ok=True, parents=True)
-        self.handler.writer.write(dataset, filepath)
+        writer = self.handler.writer
+        with span("write", writer=writer.__repr_name__(), path=filepath.as_posix()):
+            writer.write(dataset, filepath)
         logger.info("Saved %s dataset to %s", datastream, filepath.as_posix())
 
     def fetch_data(
@@ -184,6 +256,7 @@ class FileSystem(Storage):
         end: datetime,
         datastream: str,
         metadata_kwargs: Union[Dict[str, str], None] = None,
+        opened_files: Optional[Dict[Path, xr.Dataset]] = None,
         **kwargs: Any,
     ) -> xr.Dataset:
         """-----------------------------------------------------------------------------
@@ -197,16 +270,30 @@ class FileSystem(Storage):
                 resolve the data storage path. This is only required if the template
                 data storage path includes any properties other than datastream or
                 fields contained in the datastream. Defaults to None.
+            opened_files (Dict[Path, xr.Dataset], optional): Data files read by a
+                previous fetch, keyed by path. Files found in it are reused instead of
+                being read again, and on return it holds the files read for this fetch.
+                Used by `StorageRetriever.sliding_window()`. Defaults to None.
 
         Returns:
             xr.Dataset: A dataset containing all the data in the storage area that spans
             the specified datetimes.
 
         -----------------------------------------------------------------------------"""
-        data_files = self._find_data(
-            start, end, datastream, metadata_kwargs=metadata_kwargs
+        data_files = sorted(
+            self._find_data(start, end, datastream, metadata_kwargs=metadata_kwargs)
         )
-        datasets = self._open_data_files(*sorted(data_files))
+        cache_key = self._get_fetch_cache_key(start, end, metadata_kwargs, data_files)
+        if cache_key is not None:
+            cached = fetch_cache.get(cache_key, self.parameters.fetch_cache)
+            if cached is not None:
+                logger.debug("Using cached %s data for %s - %s", datastream, start, end)
+                return cached
+
+        if opened_files is None:
+            datasets = self._open_data_files(*data_files)
+        else:
+            datasets = self._reuse_data_files(data_files, opened_files)
         dataset = xr.Dataset()
         if len(datasets) == 0:
             logger.warning(
@@ -223,8 +310,61 @@ class FileSystem(Storage):
                 compat="equals",
             )
             dataset = dataset.sel(time=slice(start, end))
+        if cache_key is not None:
+            dataset = fetch_cache.put(cache_key, dataset, self.parameters.fetch_cache)
+            # Data are loaded into the cache, so don't keep the files open for it
+            if opened_files is None:
+                for opened in datasets:
+                    opened.close()
         return dataset
 
+    def _reuse_data_files(
+        self, filepaths: List[Path], opened_files: Dict[Path, xr.Dataset]
+    ) -> List[xr.Dataset]:
+        # Reads the files not in opened_files and replaces its contents with the files
+        # needed now. Files are loaded so reusing them doesn't read them again
+        new_filepaths = [path for path in filepaths if path not in opened_files]
+        new_datasets = self._open_data_files(*new_filepaths)
+        for filepath, dataset in zip(new_filepaths, new_datasets):
+            opened_files[filepath] = dataset.load()  # type: ignore
+            dataset.close()
+        for filepath in set(opened_files) - set(filepaths):
+            del opened_files[filepath]
+        return [opened_files[path] for path in filepaths]
+
+    def _get_fetch_cache_key(
+        self,
+        start: datetime,
+        end: datetime,
+        metadata_kwargs: Optional[Dict[str, str]],
+        data_files: List[Path],
+    ) -> Optional[Hashable]:
+        if self.parameters.fetch_cache == "off":
+            return None
+        versions = self._get_file_versions(data_files)
+        if versions is None:
+            return None
+        return (
+            str(self.data_filepath_template),
+            repr(self.handler),
+            start,
+            end,
+            tuple(sorted((metadata_kwargs or {}).items())),
+            versions,
+        )
+
+    def _get_file_versions(
+        self, filepaths: List[Path]
+    ) -> Optional[tuple[tuple[str, int, int], ...]]:
+        # Identifies the current state of the files, or None if that isn't possible
+        versions: list[tuple[str, int, int]] = []
+        for filepath in filepaths:
+            if not filepath.is_file():
+                return None
+            stat = filepath.stat()
+            versions.append((filepath.as_posix(), stat.st_mtime_ns, stat.st_size))
+        return tuple(versions)
+
     def _find_data(
         self,
         start: datetime,
@@ -5,13 +5,15 @@ from datetime import datetime, timezone
 from functools import lru_cache
 from pathlib import Path
 from time import time
-from typing import Any, Dict, List, Protocol, Union
+from typing import Any, Dict, List, Optional, Protocol, Union
 
 import xarray as xr
 from pydantic import Field, validator
 
+from ...tracing import span
 from ...utils import get_file_datetime
 from .file_system import FileSystem
+from .input_manifest import InputManifest
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +53,17 @@ class FileSystemS3(FileSystem):
         def _ensure_storage_root_exists(cls, storage_root: Path) -> Path:
             return storage_root  # HACK: Don't run parent validator to create storage root file
 
+        @validator("input_manifest")
+        def _input_manifest_unsupported(cls, input_manifest: str) -> str:
+            # The manifest is a local file, which the S3 storage root isn't
+            if input_manifest != "off":
+                logger.warning(
+                    "FileSystemS3 does not support the input manifest, so"
+                    " input_manifest='%s' is ignored and inputs are never skipped",
+                    input_manifest,
+                )
+            return "off"
+
     parameters: Parameters = Field(default_factory=Parameters)  # type: ignore
     """ File-system and AWS-specific parameters, such as the path to where files should
     be saved or additional keyword arguments to specific functions used by the storage
@@ -126,6 +139,9 @@ class FileSystemS3(FileSystem):
     def _get_timehash(seconds: int = 3600) -> int:
         return round(time() / seconds)
 
+    def get_input_manifest(self) -> Optional[InputManifest]:
+        return None  # Not supported, see Parameters._input_manifest_unsupported()
+
     def last_modified(self, datastream: str) -> Union[datetime, None]:
         """Returns the datetime of the last modification to the datastream's storage
         area."""
@@ -216,7 +232,10 @@ class FileSystemS3(FileSystem):
             )
         )
         with tempfile.TemporaryDirectory() as tmp_dir:
-            self.handler.writer.write(dataset, Path(tmp_dir) / filepath.name)
+            tmp_path = Path(tmp_dir) / filepath.name
+            writer = self.handler.writer
+            with span("write", writer=writer.__repr_name__(), path=tmp_path.as_posix()):
+                writer.write(dataset, tmp_path)
             for file in Path(tmp_dir).glob("**/*"):
                 if file.is_file():
                     key = (filepath.parent / file.relative_to(tmp_dir)).as_posix()
@@ -247,6 +266,9 @@ class FileSystemS3(FileSystem):
         paths = [Path(obj.key) for obj in matches]
         return self._filter_between_dates(paths, start, end)
 
+    def _get_file_versions(self, filepaths: List[Path]) -> None:
+        return None  # S3 objects are not cached
+
     def _open_data_files(self, *filepaths: Path) -> List[xr.Dataset]:
         dataset_list: List[xr.Dataset] = []
         with tempfile.TemporaryDirectory() as tmp_dir:
@@ -0,0 +1,97 @@
+import hashlib
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Literal, Optional, Union
+
+InputManifestMode = Literal["off", "stat", "hash"]
+
+
+class InputManifest:
+    """---------------------------------------------------------------------------------
+    SQLite record of the input files each datastream was produced from, used to skip
+    inputs that were already processed (e.g., raw files redelivered by a transfer
+    system). Safe to share between processes.
+
+    Inputs are identified by their input key and a fingerprint of the file's contents:
+    with the 'stat' mode the fingerprint is the file's size and modification time, which
+    is fast but treats touched or re-copied files as changed; with the 'hash' mode it is
+    the SHA-256 hash of the file. Input keys that aren't local files never count as
+    processed.
+
+    Args:
+        path (Union[str, Path]): The path to the database file. It is created if needed.
+        mode (InputManifestMode): How files are fingerprinted, either 'stat' or 'hash'.
+
+    ---------------------------------------------------------------------------------"""
+
+    def __init__(self, path: Union[str, Path], mode: InputManifestMode = "stat"):
+        if mode not in ("stat", "hash"):
+            raise ValueError(f"'mode' must be 'stat' or 'hash'. Got '{mode}'")
+        self.path = Path(path)
+        self.mode = mode
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS inputs (datastream TEXT, input_key TEXT,"
+                " fingerprint TEXT, processed TEXT, PRIMARY KEY (datastream, input_key))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # The connection's own context manager commits, but doesn't close it
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection:
+            with connection:
+                yield connection
+
+    def get_fingerprints(self, input_keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Returns the fingerprint of each input key, or None for input keys that aren't
+        local files."""
+        return {key: self._get_fingerprint(key) for key in input_keys}
+
+    def is_processed(
+        self, datastream: str, fingerprints: Dict[str, Optional[str]]
+    ) -> bool:
+        """Returns True if all the inputs were processed into the datastream before, and
+        none of them changed since."""
+        if not fingerprints or None in fingerprints.values():
+            return False
+        with self._connect() as connection:
+            for key, fingerprint in fingerprints.items():
+                row = connection.execute(
+                    "SELECT fingerprint FROM inputs WHERE datastream = ? AND input_key = ?",
+                    (datastream, key),
+                ).fetchone()
+                if row is None or row[0] != fingerprint:
+                    return False
+        return True
+
+    def record(self, datastream: str, fingerprints: Dict[str, Optional[str]]) -> None:
+        """Records that the inputs were processed into the datastream."""
+        processed = datetime.now(timezone.utc).isoformat()
+        rows = [
+            (datastream, key, fingerprint, processed)
+            for key, fingerprint in fingerprints.items()
+            if fingerprint is not None
+        ]
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO inputs VALUES (?, ?, ?, ?)", rows
+            )
+
+    def _get_fingerprint(self, input_key: str) -> Optional[str]:
+        path = Path(input_key)
+        try:
+            stat = path.stat()
+        except (OSError, ValueError):
+            return None
+        if not path.is_file():
+            return None
+        if self.mode == "stat":
+            return f"{stat.st_size}:{stat.st_mtime_ns}"
+        digest = hashlib.sha256()
+        with path.open("rb") as file:
+            for block in iter(lambda: file.read(1024**2), b""):
+                digest.update(block)
+        return f"sha256:{digest.hexdigest()}"
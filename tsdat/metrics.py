@@ -0,0 +1,344 @@
+"""-------------------------------------------------------------------------------------
+History of pipeline run metrics, used to spot performance regressions.
+
+When the ``TSDAT_METRICS_DB`` environment variable is set to the path of a SQLite
+database, every pipeline run appends a row to its 'runs' table with: how long the run
+and each of its stages took, the bytes and number of files read and written, the number
+of records (time samples) retrieved and saved, and the number of values flagged by the
+quality checks. Stage timings are gathered from the spans in `tsdat.tracing`. The
+``tsdat report`` command summarizes these metrics for each datastream.
+
+-------------------------------------------------------------------------------------"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import median
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Union
+
+from pydantic import BaseModel
+
+from .tracing import SpanRecord, TraceSink
+
+if TYPE_CHECKING:  # pragma: no cover
+    import xarray as xr
+
+__all__ = [
+    "DatastreamSummary",
+    "MetricsCollector",
+    "MetricsStore",
+    "RunMetrics",
+    "get_metrics_store",
+    "summarize_runs",
+]
+
+logger = logging.getLogger(__name__)
+
+
+class RunMetrics(BaseModel):
+    """Metrics for a single pipeline run."""
+
+    started: datetime
+    pipeline: str
+    datastream: str
+    input_key: str
+    tsdat_version: str
+    status: str
+    """Either 'success' or 'failed'."""
+    error: Optional[str] = None
+    seconds: float
+    bytes_read: int = 0
+    bytes_written: int = 0
+    files_read: int = 0
+    files_written: int = 0
+    rows_in: Optional[int] = None
+    """The number of time samples in the retrieved dataset."""
+    rows_out: Optional[int] = None
+    """The number of time samples in the saved dataset."""
+    qc_failures: int = 0
+    """The total number of values with any quality check flag set."""
+    qc: Dict[str, int] = {}
+    """The number of flagged values per qc variable."""
+    stages: Dict[str, float] = {}
+    """Seconds spent in each stage, keyed by span path (e.g., 'run/quality')."""
+
+
+class MetricsCollector(TraceSink):
+    """---------------------------------------------------------------------------------
+    Trace sink that accumulates the metrics of a single pipeline run.
+
+    Sinks receive the spans of every thread, so only spans whose tracing context has
+    the collector's `run_id` are counted. The run must therefore add it to its context
+    (see `tsdat.tracing.trace_context()`).
+
+    Args:
+        pipeline (str): The name of the pipeline.
+        datastream (str): The datastream produced by the pipeline.
+        input_key (str): The input key(s) the pipeline is run on.
+
+    ---------------------------------------------------------------------------------"""
+
+    def __init__(self, pipeline: str, datastream: str, input_key: str):
+        self.pipeline = pipeline
+        self.datastream = datastream
+        self.input_key = input_key
+        self.run_id = uuid.uuid4().hex
+        self.started = datetime.now(timezone.utc)
+        self.stages: Dict[str, float] = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.files_read = 0
+        self.files_written = 0
+        self.rows_in: Optional[int] = None
+        self._perf_start = time.perf_counter()
+
+    def emit(self, record: SpanRecord) -> None:
+        if record.context.get("run_id") != self.run_id:
+            return  # From another run, e.g., plotting in the background
+        self.stages[record.path] = self.stages.get(record.path, 0.0) + record.seconds
+        if self.rows_in is None:
+            self.rows_in = record.context.get("dataset_rows")
+        if record.name == "read" and "input_key" in record.attrs:
+            self.files_read += 1
+            self.bytes_read += _get_size(record.attrs["input_key"])
+        elif record.name == "write" and "path" in record.attrs:
+            self.files_written += 1
+            self.bytes_written += _get_size(record.attrs["path"])
+
+    def finish(
+        self,
+        dataset: Optional["xr.Dataset"],
+        error: Optional[BaseException] = None,
+    ) -> RunMetrics:
+        """Returns the metrics of the run, given the dataset it produced."""
+        from . import get_version
+
+        qc: Dict[str, int] = {}
+        rows_out: Optional[int] = None
+        if dataset is not None:
+            rows_out = dataset.sizes.get("time")
+            for name in dataset.data_vars:
+                if str(name).startswith("qc_"):
+                    qc[str(name)] = int((dataset[name].values != 0).sum())
+        return RunMetrics(
+            started=self.started,
+            pipeline=self.pipeline,
+            datastream=self.datastream,
+            input_key=self.input_key,
+            tsdat_version=get_version(),
+            status="success" if error is None else "failed",
+            error=None if error is None else f"{type(error).__name__}: {error}",
+            seconds=time.perf_counter() - self._perf_start,
+            bytes_read=self.bytes_read,
+            bytes_written=self.bytes_written,
+            files_read=self.files_read,
+            files_written=self.files_written,
+            rows_in=self.rows_in,
+            rows_out=rows_out,
+            qc_failures=sum(qc.values()),
+            qc=qc,
+            stages=self.stages,
+        )
+
+
+_COLUMNS = list(RunMetrics.__fields__)
+_JSON_COLUMNS = {"qc", "stages"}
+
+
+class MetricsStore:
+    """---------------------------------------------------------------------------------
+    Append-only SQLite database of pipeline run metrics. Safe to share between
+    processes.
+
+    Args:
+        path (Union[str, Path]): The path to the database file. It is created if needed.
+
+    ---------------------------------------------------------------------------------"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            columns = ", ".join(_COLUMNS)
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, {columns})"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS runs_datastream ON runs (datastream, started)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # The connection's own context manager commits, but doesn't close it
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection:
+            with connection:
+                yield connection
+
+    def append(self, metrics: RunMetrics) -> None:
+        """Adds the metrics of a run to the database."""
+        row = [
+            json.dumps(value) if name in _JSON_COLUMNS else value
+            for name, value in metrics.dict().items()
+        ]
+        row[_COLUMNS.index("started")] = metrics.started.isoformat()
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._connect() as connection:
+            connection.execute(
+                f"INSERT INTO runs ({', '.join(_COLUMNS)}) VALUES ({placeholders})", row
+            )
+
+    def query(
+        self, datastream: Optional[str] = None, since: Optional[datetime] = None
+    ) -> List[RunMetrics]:
+        """Returns the metrics of the matching runs, oldest first."""
+        conditions: List[str] = []
+        parameters: List[Any] = []
+        if datastream is not None:
+            conditions.append("datastream = ?")
+            parameters.append(datastream)
+        if since is not None:
+            conditions.append("started >= ?")
+            parameters.append(since.isoformat())
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM runs{where} ORDER BY started, id",
+                parameters,
+            ).fetchall()
+        return [
+            RunMetrics(
+                **{
+                    name: json.loads(value) if name in _JSON_COLUMNS else value
+                    for name, value in zip(_COLUMNS, row)
+                }
+            )
+            for row in rows
+        ]
+
+
+class DatastreamSummary(BaseModel):
+    """Throughput trends and regressions of the runs producing one datastream."""
+
+    datastream: str
+    runs: int
+    failed: int
+    median_seconds: float
+    """Median duration of successful runs."""
+    median_throughput: Optional[float]
+    """Median bytes read per second of successful runs that read local files."""
+    median_rows_out: Optional[float]
+    median_qc_failures: float
+    seconds_by_version: Dict[str, float]
+    """Median duration of successful runs for each tsdat version."""
+    baseline_seconds: Optional[float] = None
+    """Median duration of the successful runs before the most recent ones."""
+    recent_seconds: Optional[float] = None
+    """Median duration of the most recent successful runs."""
+    regression: bool = False
+    """True if the recent runs are slower than the baseline by more than the threshold."""
+    slowest_stage: Optional[str] = None
+    """For regressions, the stage whose median duration increased the most."""
+
+
+def summarize_runs(
+    runs: List[RunMetrics], recent: int = 5, threshold: float = 1.5
+) -> List[DatastreamSummary]:
+    """-----------------------------------------------------------------------------
+    Summarizes run metrics for each datastream and flags performance regressions.
+
+    Args:
+        runs (List[RunMetrics]): The runs to summarize, oldest first.
+        recent (int): The number of most recent successful runs that are compared
+            against the earlier ones. Defaults to 5.
+        threshold (float): Recent runs whose median duration exceeds this multiple of
+            the earlier runs' median duration are flagged as a regression. Defaults to
+            1.5.
+
+    Returns:
+        List[DatastreamSummary]: One summary per datastream, sorted by datastream.
+
+    -----------------------------------------------------------------------------"""
+    by_datastream: Dict[str, List[RunMetrics]] = {}
+    for run in runs:
+        by_datastream.setdefault(run.datastream, []).append(run)
+
+    summaries: List[DatastreamSummary] = []
+    for datastream, ds_runs in sorted(by_datastream.items()):
+        ok = [run for run in ds_runs if run.status == "success"]
+        by_version: Dict[str, List[float]] = {}
+        for run in ok:
+            by_version.setdefault(run.tsdat_version, []).append(run.seconds)
+        throughput = [
+            r.bytes_read / r.seconds for r in ok if r.bytes_read and r.seconds
+        ]
+        rows_out = [r.rows_out for r in ok if r.rows_out is not None]
+        summary = DatastreamSummary(
+            datastream=datastream,
+            runs=len(ds_runs),
+            failed=len(ds_runs) - len(ok),
+            median_seconds=_median([r.seconds for r in ok]) or 0.0,
+            median_throughput=_median(throughput),
+            median_rows_out=_median(rows_out),  # type: ignore
+            median_qc_failures=_median([r.qc_failures for r in ok]) or 0.0,  # type: ignore
+            seconds_by_version={v: median(s) for v, s in by_version.items()},
+        )
+        if len(ok) > recent:
+            baseline, latest = ok[:-recent], ok[-recent:]
+            summary.baseline_seconds = median(r.seconds for r in baseline)
+            summary.recent_seconds = median(r.seconds for r in latest)
+            if summary.recent_seconds > threshold * summary.baseline_seconds:
+                summary.regression = True
+                summary.slowest_stage = _get_slowest_stage(baseline, latest)
+        summaries.append(summary)
+    return summaries
+
+
+def _median(values: List[float]) -> Optional[float]:
+    return median(values) if values else None
+
+
+def _get_slowest_stage(
+    baseline: List[RunMetrics], latest: List[RunMetrics]
+) -> Optional[str]:
+    increases: Dict[str, float] = {}
+    for stage in {stage for run in latest for stage in run.stages}:
+        before = median(run.stages.get(stage, 0.0) for run in baseline)
+        after = median(run.stages.get(stage, 0.0) for run in latest)
+        increases[stage] = after - before
+    # The run itself includes every stage, so only consider its parts
+    increases.pop("run", None)
+    return max(increases, key=increases.__getitem__) if increases else None
+
+
+def get_metrics_store() -> Optional[MetricsStore]:
+    """Returns the store configured by the ``TSDAT_METRICS_DB`` environment variable,
+    or None if it isn't set."""
+    path = os.environ.get("TSDAT_METRICS_DB")
+    if not path:
+        return None
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = MetricsStore(path)
+    return store
+
+
+_stores: Dict[str, MetricsStore] = {}
+
+
+def _get_size(path: str) -> int:
+    try:
+        if os.path.isdir(path):
+            return sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, _, names in os.walk(path)
+                for name in names
+            )
+        return os.path.getsize(path)
+    except OSError:  # e.g., not a local file
+        return 0
@@ -0,0 +1,259 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+_DATE_FORMAT = "%Y%m%d.%H%M%S"
+
+
+class WindowResult(NamedTuple):
+    """The outcome of running a pipeline on a single backfill window."""
+
+    start: datetime
+    end: datetime
+    status: str
+    """One of 'success', 'failed', or 'skipped' (completed by an earlier backfill)."""
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def key(self) -> str:
+        return _get_window_key(self.start, self.end)
+
+
+class BackfillSummary(BaseModel):
+    """Progress and throughput of a backfill."""
+
+    windows: int
+    completed: int = 0
+    """Windows processed successfully by this backfill."""
+    skipped: int = 0
+    """Windows already completed by an earlier backfill."""
+    failed: int = 0
+    seconds: float = 0.0
+    """Wall-clock time spent so far."""
+    completed_through: Optional[datetime] = None
+    """The end of the last window such that it and every earlier window are done."""
+
+    @property
+    def remaining(self) -> int:
+        return self.windows - self.completed - self.skipped - self.failed
+
+    @property
+    def windows_per_hour(self) -> float:
+        return 3600 * self.completed / self.seconds if self.seconds else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds until all windows are processed."""
+        if not self.completed:
+            return None
+        return self.remaining * self.seconds / (self.completed + self.failed)
+
+
+def split_date_range(
+    start: datetime, end: datetime, days: float = 1
+) -> List[Tuple[datetime, datetime]]:
+    """Splits the time range into consecutive windows of the given number of days. The
+    last window is shortened to end at `end`."""
+    if days <= 0:
+        raise ValueError(f"'days' must be positive. Got {days}")
+    step = timedelta(days=days)
+    windows: List[Tuple[datetime, datetime]] = []
+    while start < end:
+        windows.append((start, min(start + step, end)))
+        start += step
+    return windows
+
+
+class Backfill:
+    """---------------------------------------------------------------------------------
+    Reprocesses a date range with a `TransformationPipeline`, one window at a time.
+
+    The range is split into windows of `days` days, and each window is processed as one
+    pipeline run (like `TransformationPipeline.run_days()`). Windows are handed out to
+    worker processes in chronological order, in blocks of `block_size` consecutive
+    windows. Each block is processed in order by one worker and shares input files read
+    for its windows (see `StorageRetriever.sliding_window()`), so larger blocks
+    refetch less of the padding around each window. Each worker instantiates the
+    pipeline only once. Every window writes its own output files, so windows finishing
+    out of order don't overwrite each other.
+
+    Completed windows are recorded in `state_file` as soon as they finish, so running
+    the same backfill again (e.g., after it was interrupted) skips them and resumes
+    after the last completed window. A window only counts as completed once its data
+    and plots are saved.
+
+    Args:
+        config_path (Path): The pipeline config file. It must describe a
+            `TransformationPipeline`.
+        start (datetime): The start of the range.
+        end (datetime): The end of the range.
+        days (float): The length of each window, in days. Defaults to 1.
+        workers (int): The number of worker processes. With 1 (the default) windows
+            are processed in the current process.
+        block_size (int): The number of consecutive windows each worker processes at a
+            time. Defaults to 1.
+        state_file (Optional[Path]): JSON file recording the completed windows. If
+            None, nothing is recorded and no windows are skipped.
+
+    ---------------------------------------------------------------------------------"""
+
+    def __init__(
+        self,
+        config_path: Path,
+        start: datetime,
+        end: datetime,
+        days: float = 1,
+        workers: int = 1,
+        block_size: int = 1,
+        state_file: Optional[Path] = None,
+    ):
+        self.config_path = Path(config_path)
+        self.windows = split_date_range(start, end, days)
+        self.workers = workers
+        self.block_size = max(1, block_size)
+        self.state_file = None if state_file is None else Path(state_file)
+        self.completed: Set[str] = self._read_state()
+
+    def run(
+        self,
+        on_progress: Optional[Callable[[WindowResult, BackfillSummary], None]] = None,
+    ) -> BackfillSummary:
+        """-----------------------------------------------------------------------------
+        Processes all windows that weren't completed yet.
+
+        Args:
+            on_progress (Optional[Callable[[WindowResult, BackfillSummary], None]]):
+                Called with the result of each window and the overall progress as each
+                window finishes.
+
+        Returns:
+            BackfillSummary: The final progress and throughput.
+
+        -----------------------------------------------------------------------------"""
+        summary = BackfillSummary(windows=len(self.windows))
+        started = time.perf_counter()
+
+        def record(result: WindowResult) -> None:
+            if result.status == "success":
+                summary.completed += 1
+                self.completed.add(result.key)
+                self._write_state()
+            elif result.status == "skipped":
+                summary.skipped += 1
+            else:
+                summary.failed += 1
+            summary.seconds = time.perf_counter() - started
+            summary.completed_through = self._get_completed_through()
+            if on_progress is not None:
+                on_progress(result, summary)
+
+        pending: List[Tuple[datetime, datetime]] = []
+        for start, end in self.windows:
+            if _get_window_key(start, end) in self.completed:
+                record(WindowResult(start, end, "skipped"))
+            else:
+                pending.append((start, end))
+        blocks = [
+            pending[i : i + self.block_size]
+            for i in range(0, len(pending), self.block_size)
+        ]
+
+        if self.workers <= 1 or len(blocks) <= 1:
+            for block in blocks:
+                _run_block(self.config_path, block, record)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures: Set["Future[List[WindowResult]]"] = {
+                    executor.submit(_run_block, self.config_path, block)
+                    for block in blocks
+                }
+                while futures:
+                    done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for result in future.result():
+                            record(result)
+        return summary
+
+    def _get_completed_through(self) -> Optional[datetime]:
+        completed_through: Optional[datetime] = None
+        for start, end in self.windows:
+            if _get_window_key(start, end) not in self.completed:
+                break
+            completed_through = end
+        return completed_through
+
+    def _read_state(self) -> Set[str]:
+        if self.state_file is None or not self.state_file.is_file():
+            return set()
+        state = json.loads(self.state_file.read_text())
+        return set(state.get("completed", []))
+
+    def _write_state(self) -> None:
+        if self.state_file is None:
+            return
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "config": self.config_path.as_posix(),
+            "completed": sorted(self.completed),
+        }
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.state_file.parent, prefix=".backfill", delete=False
+        ) as file:
+            json.dump(state, file, indent=2)
+        os.replace(file.name, self.state_file)
+
+
+def _get_window_key(start: datetime, end: datetime) -> str:
+    return f"{start.strftime(_DATE_FORMAT)}-{end.strftime(_DATE_FORMAT)}"
+
+
+def _run_block(
+    config_path: Path,
+    windows: List[Tuple[datetime, datetime]],
+    callback: Optional[Callable[[WindowResult], None]] = None,
+) -> List[WindowResult]:
+    from .dispatcher import _get_pipeline
+    from .pipelines import TransformationPipeline
+
+    pipeline = _get_pipeline(config_path)
+    if not isinstance(pipeline, TransformationPipeline):
+        raise TypeError(
+            f"Backfills need a TransformationPipeline, but {config_path} describes a"
+            f" {pipeline.__repr_name__()}"
+        )
+
+    results: List[WindowResult] = []
+    with pipeline.retriever.sliding_window():  # type: ignore
+        for start, end in windows:
+            inputs = [start.strftime(_DATE_FORMAT), end.strftime(_DATE_FORMAT)]
+            begin = time.perf_counter()
+            try:
+                pipeline.run(inputs, wait=True)
+            except Exception as e:
+                logger.exception("Failed to process %s with %s", inputs, config_path)
+                result = WindowResult(
+                    start,
+                    end,
+                    "failed",
+                    f"{type(e).__name__}: {e}",
+                    time.perf_counter() - begin,
+                )
+            else:
+                result = WindowResult(
+                    start, end, "success", None, time.perf_counter() - begin
+                )
+            results.append(result)
+            if callback is not None:
+                callback(result)
+    return results
@@ -1,18 +1,32 @@
+import logging
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from copy import deepcopy
 from datetime import datetime
 from getpass import getuser
 from pathlib import Path
-from typing import Any, Iterable, List, Optional, Pattern, cast
+from typing import Any, Callable, Dict, Iterator, List, Optional, Pattern, cast
 
 import numpy as np
 import xarray as xr
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 from ...config.dataset import DatasetConfig
 from ...io.base import Retriever, Storage
 from ...qc.base import QualityManagement
+from ...metrics import MetricsCollector, get_metrics_store
+from ...tracing import add_sink, remove_sink, trace_context
 from ...utils import ParameterizedClass, model_to_dict
 
+logger = logging.getLogger(__name__)
+
+# Background work (e.g., plotting) started by the current run, see `_trace_run()`
+_run_background: ContextVar[Optional[List["Future[Any]"]]] = ContextVar(
+    "tsdat_run_background", default=None
+)
+
 
 class Pipeline(ParameterizedClass, ABC):
     """---
@@ -41,6 +55,10 @@ class Pipeline(ParameterizedClass, ABC):
     cfg_filepath: Optional[Path] = None
     """The pipeline.yaml file containing the parameters used to instantiate this object"""
 
+    _config_attrs: Dict[Optional[str], Dict[str, Any]] = PrivateAttr(
+        default_factory=dict
+    )
+
     @abstractmethod
     def run(self, inputs: List[str], **kwargs: Any) -> Any:
         """-----------------------------------------------------------------------------
@@ -56,12 +74,70 @@ class Pipeline(ParameterizedClass, ABC):
         -----------------------------------------------------------------------------"""
         ...
 
+    @contextmanager
+    def _trace_run(self, inputs: List[str]) -> Iterator[None]:
+        """Sets the tracing context (see `tsdat.tracing`) for a run on the inputs and
+        records the run's metrics if a metrics store is configured (see
+        `tsdat.metrics`). Metrics of runs that leave work in the background (see
+        `IngestPipeline.run()`) are recorded once that work is finished."""
+        context = dict(
+            pipeline=self.__repr_name__(),
+            datastream=self.dataset_config.attrs.datastream,
+            input_key=",".join(inputs),
+        )
+        store = get_metrics_store()
+        if store is None:
+            with trace_context(**context):
+                yield
+            return
+
+        collector = add_sink(MetricsCollector(**context))
+        background: List["Future[Any]"] = []
+        token = _run_background.set(background)
+        error: Optional[BaseException] = None
+        try:
+            with trace_context(**context, run_id=collector.run_id):
+                yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _run_background.reset(token)
+            dataset = getattr(self, "ds", None) if error is None else None
+
+            def record(background_error: Optional[BaseException] = None) -> None:
+                remove_sink(collector)
+                try:
+                    metrics = collector.finish(dataset, error or background_error)
+                    store.append(metrics)  # type: ignore
+                except Exception:
+                    logger.exception("Could not record metrics for %s", context)
+
+            if not background:
+                record()
+            else:
+                # Queued behind the run's background work, so that waiting for the
+                # background tasks also waits for the metrics to be recorded
+                from ..pipelines.background_tasks import get_background_tasks
+
+                tasks = get_background_tasks()
+                if tasks is None:
+                    _record_when_done(background, record)
+                else:
+                    tasks.submit(
+                        context["input_key"], _record_when_done, background, record
+                    )
+
     def prepare_retrieved_dataset(self, dataset: xr.Dataset) -> xr.Dataset:
         """-----------------------------------------------------------------------------
         Modifies the retrieved dataset by dropping variables not declared in the
         DatasetConfig, adding static variables, initializing non-retrieved variables,
         and importing global and variable-level attributes from the DatasetConfig.
 
+        This is done in a single pass over the output variables. Variables that already
+        have the configured dtype are not cast (and so not copied), and attributes are
+        converted from the DatasetConfig once per pipeline.
+
         Args:
             dataset (xr.Dataset): The retrieved dataset.
 
@@ -70,6 +146,8 @@ class Pipeline(ParameterizedClass, ABC):
             DatasetConfig.
 
         -----------------------------------------------------------------------------"""
+        from tsdat import get_version
+
         output_vars = (
             list(self.dataset_config.coords)
             + list(self.dataset_config.data_vars)
@@ -77,78 +155,93 @@ class Pipeline(ParameterizedClass, ABC):
         )
         retrieved_variables = cast(List[str], list(dataset.variables))
         vars_to_drop = [ret for ret in retrieved_variables if ret not in output_vars]
-        vars_to_add = [out for out in output_vars if out not in retrieved_variables]
-
+        # BUG: can't carry through old QC variables
+        vars_to_drop += [v for v in dataset.data_vars if "qc_" in v]
         dataset = dataset.drop_vars(vars_to_drop)
-        dataset = self._add_dataset_dtypes(dataset)
-        dataset = self._add_dataset_variables(dataset, vars_to_add)
-        dataset = self._add_dataset_attrs(dataset, output_vars)
+        dataset.attrs.update(self._get_config_attrs(None))
+
+        for name in output_vars:
+            if name not in self.dataset_config:
+                continue  # Retrieved QC variables, dropped above
+            if name not in retrieved_variables:
+                dataset[name] = self._get_initial_data(dataset, name)
+            elif name in dataset.data_vars:
+                dataset[name] = _cast(dataset[name], self.dataset_config[name].dtype)
+            dataset[name].attrs.update(self._get_config_attrs(name))
+            if "qc" in name:
+                # Change non-list flags to list
+                attrs = dataset[name].attrs
+                for key, value in attrs.items():
+                    if "flag" in key and not isinstance(value, (list, np.ndarray)):
+                        attrs[key] = [value]
         # TODO: reorder dataset coords / data vars to match the order in the config file
 
         # BUG: can't carry through old QC variables
         dataset = self._force_drop_qc(dataset)
 
-        return dataset
-
-    def _add_dataset_variables(
-        self, dataset: xr.Dataset, vars_to_add: Iterable[str]
-    ) -> xr.Dataset:
-        for name in vars_to_add:
-            dims = self.dataset_config[name].dims
-            dtype = self.dataset_config[name].dtype
-            data = self.dataset_config[name].data
-
-            if data is None:
-                fill_value = self.dataset_config[name].attrs.fill_value
-                shape = tuple(len(dataset[d]) for d in dims)
-                data = np.full(shape=shape, fill_value=fill_value, dtype=dtype)  # type: ignore
-            else:
-                # cast to specified data type. Note that np.array preserves scalars
-                data = np.array(data, dtype=dtype)  # type: ignore
-
-            dataset[name] = xr.DataArray(data=data, dims=dims)
-        return dataset
-
-    def _add_dataset_dtypes(self, dataset: xr.Dataset) -> xr.Dataset:
-        for name in dataset.data_vars:
-            if ("qc" in name) and not hasattr(self.dataset_config, name):
-                continue
-            dtype = self.dataset_config[name].dtype  # type: ignore
-            dataset[name] = dataset[name].astype(dtype)
-            # Add QC variables (should be added in transform converter)
-            if f"qc_{name}" in dataset:
-                # Assuming missing values have a bit of 1
-                dataset[f"qc_{name}"] = dataset[f"qc_{name}"].fillna(1).astype(np.int32)
-        return dataset
-
-    def _add_dataset_attrs(
-        self, dataset: xr.Dataset, output_vars: Iterable[str]
-    ) -> xr.Dataset:
-        from tsdat import get_version
-
-        global_attrs = model_to_dict(self.dataset_config.attrs)
-        dataset.attrs.update(**global_attrs)
-
-        for name in output_vars:
-            if ("qc" in name) and not hasattr(self.dataset_config, name):
-                # Change non-list flags to list
-                for a in dataset[name].attrs:
-                    attr = dataset[name].attrs[a]
-                    if not (
-                        isinstance(attr, list) or isinstance(attr, np.ndarray)
-                    ) and ("flag" in a):
-                        dataset[name].attrs[a] = [attr]
-            else:
-                var_attrs = model_to_dict(self.dataset_config[name].attrs)
-                dataset[name].attrs.update(var_attrs)
-
         history = f"Created by {getuser()} at {datetime.now().isoformat()} using tsdat v{get_version()}"
         dataset.attrs["history"] = history
 
         return dataset
 
+    def _get_initial_data(self, dataset: xr.Dataset, name: str) -> xr.DataArray:
+        dims = self.dataset_config[name].dims
+        dtype = self.dataset_config[name].dtype
+        data = self.dataset_config[name].data
+
+        if data is None:
+            fill_value = self.dataset_config[name].attrs.fill_value
+            shape = tuple(len(dataset[d]) for d in dims)
+            data = np.full(shape, fill_value, dtype=dtype)  # type: ignore
+        else:
+            # cast to specified data type. Note that np.array preserves scalars
+            data = np.array(data, dtype=dtype)  # type: ignore
+
+        return xr.DataArray(data=data, dims=dims)
+
+    def _get_config_attrs(self, name: Optional[str]) -> Dict[str, Any]:
+        # Converting the pydantic attrs models is slow, so only do it once per pipeline.
+        # Copies are returned so datasets never share mutable attribute values.
+        if name not in self._config_attrs:
+            attrs = (
+                self.dataset_config.attrs
+                if name is None
+                else self.dataset_config[name].attrs
+            )
+            self._config_attrs[name] = model_to_dict(attrs)
+        return {
+            key: (
+                deepcopy(value)
+                if isinstance(value, (list, dict, np.ndarray))
+                else value
+            )
+            for key, value in self._config_attrs[name].items()
+        }
+
     def _force_drop_qc(self, dataset: xr.Dataset) -> xr.Dataset:
         """Drop QC variables since act-atmos isn't smart enough to see repeated tests"""
         qc_vars = [v for v in dataset.data_vars if "qc_" in v]
         dataset = dataset.drop_vars(qc_vars)
         return dataset
+
+
+def _cast(data: xr.DataArray, dtype: Any) -> xr.DataArray:
+    try:
+        unchanged = data.dtype == np.dtype(dtype)
+    except TypeError:
+        unchanged = False
+    if not unchanged:
+        return data.astype(dtype)
+    # Skip the copy astype() would make, but drop the encoding like astype() does
+    data = data.copy(deep=False)
+    data.encoding = {}
+    return data
+
+
+def _record_when_done(
+    futures: List["Future[Any]"], record: Callable[[Optional[BaseException]], None]
+) -> None:
+    # Calls record() once the futures are done, with the first error they raised
+    wait(futures)
+    errors = [f.exception() for f in futures if not f.cancelled() and f.exception()]
+    record(errors[0] if errors else None)
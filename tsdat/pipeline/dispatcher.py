@@ -0,0 +1,220 @@
+import logging
+import re
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Tuple,
+)
+
+from .base import Pipeline
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchResult(NamedTuple):
+    """The outcome of running a pipeline on a single input key."""
+
+    input_key: str
+    pipeline: Optional[str]
+    """The path to the config of the pipeline that was run, or None if no pipeline's
+    triggers matched the input key."""
+    status: str
+    """One of 'success', 'failed', or 'skipped' (no matching pipeline, or an unchanged
+    input that was already processed)."""
+    error: Optional[str] = None
+    seconds: float = 0.0
+    finished: float = 0.0
+    """When the input key finished processing, as a Unix timestamp."""
+
+
+class PipelineDispatcher:
+    """---------------------------------------------------------------------------------
+    Routes input keys to the pipelines whose triggers match them and runs them.
+
+    The triggers of all pipeline configs are compiled into a single regex, so routing an
+    input key takes one regex match regardless of the number of pipelines. If several
+    pipelines match an input key, the first config (in sorted path order) is used.
+
+    Pipelines are instantiated lazily, at most once per process, and reused for every
+    input key routed to them. If the persistent pipeline cache is enabled (see
+    `tsdat.config.pipeline.load_pipeline()`), worker processes don't have to rebuild
+    them from the configs. Input keys can be run across a pool of worker processes.
+
+    Args:
+        config_paths (Iterable[Path]): The pipeline config files to dispatch to.
+
+    ---------------------------------------------------------------------------------"""
+
+    def __init__(self, config_paths: Iterable[Path]):
+        from ..config.utils import read_yaml
+
+        self.config_paths: List[Path] = sorted(Path(p) for p in config_paths)
+        self.triggers: Dict[Path, List[str]] = {
+            path: list(read_yaml(path).get("triggers") or [])
+            for path in self.config_paths
+        }
+        self._matcher = _compile_triggers(list(self.triggers.items()))
+
+    @classmethod
+    def from_dir(
+        cls, config_dir: Path, pattern: str = "**/pipeline*.yaml"
+    ) -> "PipelineDispatcher":
+        """Creates a dispatcher for all the pipeline configs in a directory that match
+        the glob pattern."""
+        return cls(Path(config_dir).glob(pattern))
+
+    def match(self, input_key: str) -> Optional[Path]:
+        """Returns the path to the config of the pipeline that should process the
+        input key, or None if no pipeline's triggers match it."""
+        return self._matcher(input_key)
+
+    def route(self, input_keys: Iterable[str]) -> Dict[Optional[Path], List[str]]:
+        """Groups input keys by the config of the pipeline that should process them."""
+        routes: Dict[Optional[Path], List[str]] = {}
+        for input_key in input_keys:
+            routes.setdefault(self.match(input_key), []).append(input_key)
+        return routes
+
+    def run(
+        self,
+        input_keys: Iterable[str],
+        workers: int = 1,
+        executor: Optional[Executor] = None,
+        force: bool = False,
+    ) -> List[DispatchResult]:
+        """-----------------------------------------------------------------------------
+        Runs each input key through the pipeline its triggers route it to.
+
+        Args:
+            input_keys (Iterable[str]): The input keys to process. Each one is processed
+                as a separate pipeline run.
+            workers (int): The number of worker processes to use. With 1 (the default)
+                input keys are processed sequentially in the current process.
+            executor (Optional[Executor]): A process pool to run the input keys on
+                instead of creating a new one. Worker processes keep the pipelines they
+                instantiate, so long-running callers should reuse the same pool.
+            force (bool): Process input keys even if the storage's input manifest shows
+                they were already processed (see `IngestPipeline.run()`).
+
+        Returns:
+            List[DispatchResult]: The outcome for each input key, in input order.
+                With background plotting (see `IngestPipeline.run()`), input keys
+                processed in the current process are only reported as successful once
+                their plots are finished.
+
+        -----------------------------------------------------------------------------"""
+        tasks = [(key, self.match(key), force) for key in input_keys]
+        if executor is None and (workers <= 1 or len(tasks) <= 1):
+            return _wait_for_background([_run_task(task) for task in tasks])
+        chunksize = max(1, len(tasks) // (workers * 4))
+        if executor is not None:
+            return list(executor.map(_run_task, tasks, chunksize=chunksize))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_run_task, tasks, chunksize=chunksize))
+
+
+# Pipelines instantiated in this process, keyed by config path
+_pipelines: Dict[Path, Pipeline] = {}
+
+
+def _get_pipeline(config_path: Path) -> Pipeline:
+    from ..config.pipeline import load_pipeline
+
+    pipeline = _pipelines.get(config_path)
+    if pipeline is None:
+        pipeline = _pipelines[config_path] = load_pipeline(config_path)
+    return pipeline
+
+
+def _run_task(task: Tuple[str, Optional[Path], bool]) -> DispatchResult:
+    input_key, config_path, force = task
+    if config_path is None:
+        logger.warning("No pipeline triggers matched input key '%s'", input_key)
+        return DispatchResult(input_key, None, "skipped", finished=time.time())
+    start = time.perf_counter()
+    try:
+        kwargs = {"force": True} if force else {}
+        dataset = _get_pipeline(config_path).run([input_key], **kwargs)
+    except Exception as e:
+        logger.exception("Failed to process '%s' with %s", input_key, config_path)
+        return DispatchResult(
+            input_key,
+            config_path.as_posix(),
+            "failed",
+            f"{type(e).__name__}: {e}",
+            time.perf_counter() - start,
+            time.time(),
+        )
+    status = "skipped" if dataset is None else "success"
+    return DispatchResult(
+        input_key,
+        config_path.as_posix(),
+        status,
+        None,
+        time.perf_counter() - start,
+        time.time(),
+    )
+
+
+def _wait_for_background(results: List[DispatchResult]) -> List[DispatchResult]:
+    from .pipelines.background_tasks import get_background_tasks
+
+    background = get_background_tasks()
+    if background is None:
+        return results
+    background.wait()
+    for i, result in enumerate(results):
+        error = background.pop_error(result.input_key)
+        if error is not None and result.status == "success":
+            results[i] = result._replace(
+                status="failed", error=f"{type(error).__name__}: {error}"
+            )
+    return results
+
+
+def _compile_triggers(
+    triggers: List[Tuple[Path, List[str]]],
+) -> Callable[[str], Optional[Path]]:
+    # Each pipeline's triggers are wrapped in a named group; it is the outermost group
+    # of the alternative that matched, so `lastgroup` tells which pipeline it was
+    paths = {f"_pipeline{i}": path for i, (path, _) in enumerate(triggers)}
+    alternatives = [
+        f"(?P<_pipeline{i}>" + "|".join(f"(?:{t})" for t in patterns) + ")"
+        for i, (_, patterns) in enumerate(triggers)
+        if patterns
+    ]
+    # Numbered backreferences would point at the wrong groups once combined
+    has_backrefs = any(re.search(r"\\\d", t) for _, p in triggers for t in p)
+    combined: Optional[Pattern[str]] = None
+    if alternatives and not has_backrefs:
+        try:
+            combined = re.compile("|".join(alternatives))
+        except re.error:  # e.g., duplicate group names across pipelines
+            logger.debug("Could not combine pipeline triggers; matching separately")
+
+    if combined is not None:
+        pattern = combined
+
+        def match(input_key: str) -> Optional[Path]:
+            m = pattern.match(input_key)
+            return None if m is None else paths[m.lastgroup]  # type: ignore
+
+        return match
+
+    compiled = [(path, [re.compile(t) for t in p]) for path, p in triggers]
+
+    def match_separately(input_key: str) -> Optional[Path]:
+        for path, patterns in compiled:
+            if any(p.match(input_key) for p in patterns):
+                return path
+        return None
+
+    return match_separately
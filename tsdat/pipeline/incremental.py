@@ -0,0 +1,233 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .backfill import _DATE_FORMAT, BackfillSummary, WindowResult, _run_block
+
+_EPOCH = datetime(1970, 1, 1)
+_NEVER = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+Window = Tuple[datetime, datetime]
+
+
+class IncrementalUpdate:
+    """---------------------------------------------------------------------------------
+    Reprocesses only the output windows of a `TransformationPipeline` whose input data
+    changed since the last update, e.g., for nightly VAP updates.
+
+    Output windows are consecutive periods of `days` days, aligned to midnight. The
+    state file records, for each input datastream, the modification time of its newest
+    file as of the last update (its watermark), and for each output window the
+    watermarks of the inputs it was last computed from.
+
+    On each update, the storage's `modified_since()` is used to find the data dates of
+    input files modified after the watermarks. A window is recomputed if:
+
+    * it was computed before and one of the modified files falls within its time range
+      padded by the retriever's time padding (so neighbouring windows that read the
+      file as padding are refreshed too), or
+    * it wasn't computed before and one of the modified files starts within it, or
+    * it failed the last time it was run.
+
+    Stale windows are run in order and share the input files they read (see
+    `StorageRetriever.sliding_window()`), which gives them the same data as running each
+    window on its own.
+
+    Only storage classes that implement `modified_since()` (e.g., `FileSystem`) can be
+    updated incrementally. The first update processes every window with input data.
+
+    Args:
+        config_path (Path): The pipeline config file. It must describe a
+            `TransformationPipeline`.
+        state_file (Path): JSON file recording the watermarks.
+        days (float): The length of each window, in days. Defaults to 1. Must be the
+            same for every update using the same state file.
+
+    ---------------------------------------------------------------------------------"""
+
+    def __init__(self, config_path: Path, state_file: Path, days: float = 1):
+        if days <= 0:
+            raise ValueError(f"'days' must be positive. Got {days}")
+        self.config_path = Path(config_path)
+        self.state_file = Path(state_file)
+        self.days = days
+        self.watermarks: Dict[str, Optional[datetime]] = {}
+        self.windows: Dict[str, Dict[str, Optional[datetime]]] = {}
+        self._read_state()
+
+    def find_stale_windows(self) -> List[Window]:
+        """Returns the windows that need to be recomputed, in chronological order."""
+        return self._find_stale_windows(self._get_pipeline())[0]
+
+    def run(
+        self,
+        on_progress: Optional[Callable[[WindowResult, BackfillSummary], None]] = None,
+    ) -> BackfillSummary:
+        """-----------------------------------------------------------------------------
+        Recomputes the windows affected by input data modified since the last update
+        and records the new watermarks.
+
+        Args:
+            on_progress (Optional[Callable[[WindowResult, BackfillSummary], None]]):
+                Called with the result of each window and the overall progress as each
+                window finishes.
+
+        Returns:
+            BackfillSummary: The final progress and throughput.
+
+        -----------------------------------------------------------------------------"""
+        stale, current = self._find_stale_windows(self._get_pipeline())
+        summary = BackfillSummary(windows=len(stale))
+        started = time.perf_counter()
+
+        def record(result: WindowResult) -> None:
+            if result.status == "success":
+                summary.completed += 1
+                self.windows[result.key] = dict(current)
+            else:
+                summary.failed += 1
+                self.windows[result.key] = {datastream: None for datastream in current}
+            self._write_state()
+            summary.seconds = time.perf_counter() - started
+            if on_progress is not None:
+                on_progress(result, summary)
+
+        if stale:
+            _run_block(self.config_path, stale, record)
+        for datastream, watermark in current.items():
+            if watermark is not None:
+                self.watermarks[datastream] = watermark
+        self._write_state()
+        summary.seconds = time.perf_counter() - started
+        return summary
+
+    def _get_pipeline(self):
+        from .dispatcher import _get_pipeline
+        from .pipelines import TransformationPipeline
+
+        pipeline = _get_pipeline(self.config_path)
+        if not isinstance(pipeline, TransformationPipeline):
+            raise TypeError(
+                "Incremental updates need a TransformationPipeline, but"
+                f" {self.config_path} describes a {pipeline.__repr_name__()}"
+            )
+        return pipeline
+
+    def _find_stale_windows(
+        self, pipeline
+    ) -> Tuple[List[Window], Dict[str, Optional[datetime]]]:
+        step = timedelta(days=self.days)
+        stale: Set[datetime] = {
+            _parse_window_key(key)[0]
+            for key, watermarks in self.windows.items()
+            if None in watermarks.values()
+        }
+        computed = {_parse_window_key(key)[0] for key in self.windows}
+
+        # Capture the watermarks before looking for changes so that files modified
+        # while updating are picked up again by the next update
+        current: Dict[str, Optional[datetime]] = {}
+        for datastream in pipeline.parameters.datastreams:
+            current[datastream] = pipeline.storage.last_modified(datastream)
+
+        for datastream in pipeline.parameters.datastreams:
+            since = self.watermarks.get(datastream) or _NEVER
+            # Windows recomputed after the last full update (e.g., by an interrupted
+            # update) can have newer watermarks, so they're checked separately
+            by_watermark: Dict[datetime, Set[datetime]] = {since: set()}
+            for key, watermarks in self.windows.items():
+                watermark = watermarks.get(datastream)
+                if watermark is None:
+                    watermark = since  # New datastream or already stale
+                by_watermark.setdefault(max(watermark, since), set()).add(
+                    _parse_window_key(key)[0]
+                )
+
+            direction, padding = self._get_padding(pipeline, datastream)
+            before = padding if direction < 1 else timedelta()
+            after = padding if direction > -1 else timedelta()
+            for watermark, window_starts in by_watermark.items():
+                for date in pipeline.storage.modified_since(datastream, watermark):
+                    if watermark == since:
+                        own_window = _floor(date, step)
+                        if own_window not in computed:
+                            stale.add(own_window)
+                    start = _floor(date - after - step, step)
+                    while start - before <= date:
+                        if date <= start + step + after and start in window_starts:
+                            stale.add(start)
+                        start += step
+
+        return [(start, start + step) for start in sorted(stale)], current
+
+    @staticmethod
+    def _get_padding(pipeline, datastream: str) -> Tuple[int, timedelta]:
+        # Any dates work here, they're only used to select the retriever's parameters
+        input_key = f"{datastream}::{_EPOCH.strftime(_DATE_FORMAT)}::" + (
+            _EPOCH + timedelta(days=1)
+        ).strftime(_DATE_FORMAT)
+        return pipeline.retriever._get_retrieval_padding(input_key)  # type: ignore
+
+    def _read_state(self) -> None:
+        if not self.state_file.is_file():
+            return
+        state = json.loads(self.state_file.read_text())
+        if state.get("days", self.days) != self.days:
+            raise ValueError(
+                f"{self.state_file} records windows of {state['days']} days, not"
+                f" {self.days}. Use a different state file to change the window length."
+            )
+        self.watermarks = {
+            datastream: _parse_watermark(watermark)
+            for datastream, watermark in state.get("watermarks", {}).items()
+        }
+        self.windows = {
+            key: {
+                datastream: _parse_watermark(watermark)
+                for datastream, watermark in watermarks.items()
+            }
+            for key, watermarks in state.get("windows", {}).items()
+        }
+
+    def _write_state(self) -> None:
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "config": self.config_path.as_posix(),
+            "days": self.days,
+            "watermarks": _format_watermarks(self.watermarks),
+            "windows": {
+                key: _format_watermarks(self.windows[key])
+                for key in sorted(self.windows)
+            },
+        }
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.state_file.parent, prefix=".incremental", delete=False
+        ) as file:
+            json.dump(state, file, indent=2)
+        os.replace(file.name, self.state_file)
+
+
+def _floor(date: datetime, step: timedelta) -> datetime:
+    return _EPOCH + ((date - _EPOCH) // step) * step
+
+
+def _parse_window_key(key: str) -> Window:
+    start, end = key.split("-")
+    return datetime.strptime(start, _DATE_FORMAT), datetime.strptime(end, _DATE_FORMAT)
+
+
+def _parse_watermark(watermark: Optional[str]) -> Optional[datetime]:
+    return None if watermark is None else datetime.fromisoformat(watermark)
+
+
+def _format_watermarks(
+    watermarks: Dict[str, Optional[datetime]],
+) -> Dict[str, Optional[str]]:
+    return {
+        datastream: None if watermark is None else watermark.isoformat()
+        for datastream, watermark in watermarks.items()
+    }
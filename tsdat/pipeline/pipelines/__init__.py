@@ -1,8 +1,11 @@
 from .add_inputs_attr import add_inputs_attr
+from .group_inputs_by_window import group_inputs_by_window
 from .ingest_pipeline import IngestPipeline
+from .run_many_error import RunManyError
 from .transformation_pipeline import TransformationPipeline
 
 __all__ = [
     "IngestPipeline",
+    "RunManyError",
     "TransformationPipeline",
 ]
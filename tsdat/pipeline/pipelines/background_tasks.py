@@ -0,0 +1,114 @@
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTasks:
+    """---------------------------------------------------------------------------------
+    Thread pool that runs the plotting stage of pipeline runs in the background.
+
+    Tasks are run in the tracing context of the run that submitted them. At most
+    `2 * workers` tasks are pending at once; submitting more blocks until the oldest one
+    is finished, so slow plotting can't hold on to an unbounded number of datasets.
+    Tasks can be submitted and waited for from several threads.
+
+    Errors are logged as soon as they happen and are kept, by input key, until they are
+    retrieved with `pop_error()` or `pop_errors()`.
+
+    Args:
+        workers (int): The number of threads used to run tasks.
+
+    ---------------------------------------------------------------------------------"""
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="tsdat-background"
+        )
+        self._pending: Deque[Tuple[str, "Future[Any]"]] = deque()
+        self._errors: Dict[str, BaseException] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self, input_key: str, fn: Callable[..., Any], *args: Any
+    ) -> "Future[Any]":
+        """Runs fn(*args) in the background on behalf of the given input key(s) and
+        returns its future."""
+        while True:
+            with self._lock:
+                if len(self._pending) < 2 * self.workers:
+                    future = self._executor.submit(copy_context().run, fn, *args)
+                    self._pending.append((input_key, future))
+                    break
+                oldest = self._pending.popleft()
+            self._collect(*oldest)
+        future.add_done_callback(lambda f: _log_error(input_key, f))
+        return future
+
+    def wait(self) -> None:
+        """Waits for all pending tasks to be finished."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return
+                oldest = self._pending.popleft()
+            self._collect(*oldest)
+
+    def pop_error(self, input_key: str) -> Optional[BaseException]:
+        """Returns (and forgets) the error raised by a finished task for the input key."""
+        with self._lock:
+            return self._errors.pop(input_key, None)
+
+    def pop_errors(self) -> Dict[str, BaseException]:
+        """Returns (and forgets) the errors raised by finished tasks, by input key."""
+        with self._lock:
+            errors, self._errors = self._errors, {}
+        return errors
+
+    def shutdown(self) -> None:
+        """Waits for all pending tasks and stops the threads."""
+        self.wait()
+        self._executor.shutdown(wait=True)
+
+    def _collect(self, input_key: str, future: "Future[Any]") -> None:
+        error = future.exception()
+        if error is not None:
+            with self._lock:
+                self._errors.setdefault(input_key, error)
+
+
+def _log_error(input_key: str, future: "Future[Any]") -> None:
+    error = future.exception()
+    if error is not None:
+        logger.error("Background plotting failed for '%s'", input_key, exc_info=error)
+
+
+def get_background_workers() -> int:
+    """Returns the number of background threads configured by the
+    ``TSDAT_BACKGROUND_WORKERS`` environment variable, or 0 if it isn't set.
+
+    NOTE: matplotlib's pyplot interface isn't thread safe, so only use more than one
+    worker if the pipelines' plotting hooks create figures with `Figure()` directly."""
+    value = os.environ.get("TSDAT_BACKGROUND_WORKERS", "").strip()
+    return int(value) if value else 0
+
+
+def get_background_tasks() -> Optional[BackgroundTasks]:
+    """Returns the process-wide `BackgroundTasks` pool if background plotting is enabled
+    by the ``TSDAT_BACKGROUND_WORKERS`` environment variable, or None."""
+    workers = get_background_workers()
+    if workers <= 0:
+        return None
+    tasks = _pools.get(workers)
+    if tasks is None:
+        tasks = _pools[workers] = BackgroundTasks(workers)
+    return tasks
+
+
+_pools: Dict[int, BackgroundTasks] = {}
@@ -0,0 +1,57 @@
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from ...utils import get_file_datetime
+
+# e.g., 20220324, 20220324.214300, 20220324_214300, or 20220324T214300
+_DATE_TIME_PATTERN = re.compile(r"(?<!\d)(\d{8})(?:[._T-]?(\d{6}))?(?!\d)")
+
+
+def group_inputs_by_window(
+    inputs: List[str], window: str = "1D", filename_template: Optional[str] = None
+) -> Dict[datetime, List[str]]:
+    """---------------------------------------------------------------------------------
+    Groups input keys by the output time window their data fall in.
+
+    The time of each input is taken from its filename, either using the given tsdat
+    filename template (the same syntax as the storage `data_filename_template`
+    parameter), or from the first 'YYYYMMDD' or 'YYYYMMDD.hhmmss' date in the filename
+    if no template is given.
+
+    Args:
+        inputs (List[str]): The input keys to group.
+        window (str): The length of each output time window, as a pandas timedelta
+            string (e.g., '1D', '6h'). Windows start at multiples of this length since
+            1970-01-01. Defaults to '1D'.
+        filename_template (Optional[str]): Template used to parse input filenames.
+
+    Returns:
+        Dict[datetime, List[str]]: The input keys in each window, sorted by time and
+        keyed by the start of the window.
+
+    ---------------------------------------------------------------------------------"""
+    freq = pd.Timedelta(window)
+    timestamps = {key: _get_input_datetime(key, filename_template) for key in inputs}
+    groups: Dict[datetime, List[str]] = {}
+    for key in sorted(inputs, key=timestamps.__getitem__):
+        start = pd.Timestamp(timestamps[key]).floor(freq).to_pydatetime()
+        groups.setdefault(start, []).append(key)
+    return dict(sorted(groups.items()))
+
+
+def _get_input_datetime(input_key: str, filename_template: Optional[str]) -> datetime:
+    filename = Path(input_key).name
+    if filename_template is not None:
+        return get_file_datetime(filename, filename_template)
+    match = _DATE_TIME_PATTERN.search(filename)
+    if match is None:
+        raise ValueError(
+            f"Could not determine the time of input '{input_key}'. Please provide a"
+            " filename template to extract it."
+        )
+    date, time = match.group(1), match.group(2) or "000000"
+    return datetime.strptime(date + time, "%Y%m%d%H%M%S")
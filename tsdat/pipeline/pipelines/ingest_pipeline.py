@@ -1,13 +1,30 @@
+import logging
+from concurrent.futures import Future
+from contextvars import ContextVar
+from datetime import datetime
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import xarray as xr
 from pydantic import PrivateAttr
 
-from tsdat.utils import decode_cf
-
+from ...io.storage import InputManifest
+from ...tracing import set_dataset_size, span
+from ...utils import normalize_cf_encoding
 from ..base import Pipeline
+from ..base.pipeline import _record_when_done, _run_background
 from .add_inputs_attr import add_inputs_attr
+from .background_tasks import get_background_tasks
+from .group_inputs_by_window import group_inputs_by_window
+from .run_many_error import RunManyError
+
+logger = logging.getLogger(__name__)
+
+# The pipeline, dataset, and uploadable dir being plotted in the current thread, so that
+# `ds` and `tmp_dir` stay correct while plots are rendered in the background
+_plotting: ContextVar[Optional[Tuple[int, xr.Dataset, Path]]] = ContextVar(
+    "tsdat_plotting", default=None
+)
 
 
 class IngestPipeline(Pipeline):
@@ -25,29 +42,331 @@ class IngestPipeline(Pipeline):
 
     @property
     def ds(self) -> Optional[xr.Dataset]:
+        plotting = _plotting.get()
+        if plotting is not None and plotting[0] == id(self):
+            return plotting[1]
         return self._ds
 
     @property
     def tmp_dir(self) -> Optional[Path]:
+        plotting = _plotting.get()
+        if plotting is not None and plotting[0] == id(self):
+            return plotting[2]
         return self._tmp_dir
 
-    def run(self, inputs: List[str], **kwargs: Any) -> xr.Dataset:
-        dataset = self.retriever.retrieve(inputs, self.dataset_config)
-        dataset = self.prepare_retrieved_dataset(dataset)
-        add_inputs_attr(dataset, inputs)
-        dataset = self.hook_customize_dataset(dataset)
-        dataset = self.quality.manage(dataset)
-        dataset = self.hook_finalize_dataset(dataset)
-        # HACK: Fix encoding on datetime64 variables. Use a shallow copy to retain units
-        # on datetime64 variables in the pipeline (but remove with decode_cf())
-        dataset = decode_cf(dataset)
-        self.storage.save_data(dataset)
-        with self.storage.uploadable_dir() as tmp_dir:
-            self._ds = dataset
-            self._tmp_dir = tmp_dir
-            self.hook_plot_dataset(dataset)
+    def run(
+        self, inputs: List[str], wait: bool = False, force: bool = False, **kwargs: Any
+    ) -> Optional[xr.Dataset]:
+        """-----------------------------------------------------------------------------
+        Runs the data pipeline on the provided inputs.
+
+        If the storage keeps a manifest of processed inputs (see
+        `Storage.get_input_manifest()`), inputs that were all processed before and
+        haven't changed since are skipped, and the inputs are recorded once the output
+        data are saved and plotted. Inputs whose plots fail are processed again by the
+        next run.
+
+        If background plotting is enabled with the ``TSDAT_BACKGROUND_WORKERS``
+        environment variable, `hook_plot_dataset()` is run in a background thread while
+        the dataset is saved, and this returns as soon as the dataset is saved. Plots of
+        runs whose data could not be saved are not uploaded. Errors raised while
+        plotting are logged and raised by `wait_for_background()`. The plot hook gets a
+        shallow copy of the dataset, so it may add or change attributes and variables
+        for plotting, but it must not modify the data of existing variables in place.
+
+        Args:
+            inputs (List[str]): A list of input keys that the pipeline's Retriever class
+                can use to load data into the pipeline.
+            wait (bool): With background plotting, wait for the plots (and any other
+                pending background work) to be finished and raise any error from this
+                run's plotting. Defaults to False.
+            force (bool): Process the inputs even if the input manifest shows they were
+                already processed. Defaults to False.
+
+        Returns:
+            Optional[xr.Dataset]: The processed dataset, or None if the inputs were
+            skipped.
+
+        -----------------------------------------------------------------------------"""
+        manifest = self.storage.get_input_manifest()
+        fingerprints, processed = self._check_inputs(manifest, inputs, force)
+        if processed:
+            return None
+
+        input_key = ",".join(inputs)
+        with self._trace_run(inputs), span("run"):
+            with span("retrieve"):
+                dataset = self.retriever.retrieve(inputs, self.dataset_config)
+            set_dataset_size(dataset)
+            with span("prepare_retrieved_dataset"):
+                dataset = self.prepare_retrieved_dataset(dataset)
+            add_inputs_attr(dataset, inputs)
+            with span("hook_customize_dataset"):
+                dataset = self.hook_customize_dataset(dataset)
+            with span("quality"):
+                dataset = self.quality.manage(dataset)
+            with span("hook_finalize_dataset"):
+                dataset = self.hook_finalize_dataset(dataset)
+            # HACK: Fix encoding on datetime64 variables. This moves their units from
+            # the attrs into the encoding, in place
+            with span("decode_cf"):
+                dataset = normalize_cf_encoding(dataset)
+            plot = self._save_and_plot(dataset, input_key)
+            if manifest is not None:
+                self._record_inputs(manifest, fingerprints, input_key, [plot])
+            if wait:
+                self._wait_for_plots(input_key)
         return dataset
 
+    def run_many(
+        self,
+        inputs: List[str],
+        window: str = "1D",
+        filename_template: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Dict[datetime, List[str]]:
+        """-----------------------------------------------------------------------------
+        Runs the pipeline on a large list of inputs, once per output time window.
+
+        Inputs are grouped by the time in their filenames (see `group_inputs_by_window`)
+        and each group is processed as a single run that produces one output dataset.
+        The pipeline and its compiled retrieval rules, attributes, and other setup are
+        shared by all runs, so this is much faster than running each input separately
+        (e.g., when backfilling many small raw files).
+
+        Windows that fail are logged and skipped so the remaining windows are still
+        processed. A `RunManyError` listing the failed windows is raised at the end.
+
+        Args:
+            inputs (List[str]): A list of input keys that the pipeline's Retriever class
+                can use to load data into the pipeline.
+            window (str): The length of each output time window, as a pandas timedelta
+                string (e.g., '1D', '6h'). Defaults to '1D'.
+            filename_template (Optional[str]): Template used to extract the time from
+                each input filename. Defaults to the first date found in the filename.
+
+        Returns:
+            Dict[datetime, List[str]]: The input keys processed for each time window.
+
+        Raises:
+            RunManyError: If any of the windows failed, once all windows were run.
+
+        -----------------------------------------------------------------------------"""
+        groups = group_inputs_by_window(inputs, window, filename_template)
+        errors: Dict[datetime, BaseException] = {}
+        for window_start, window_inputs in groups.items():
+            logger.info(
+                "Running %d inputs for window starting %s",
+                len(window_inputs),
+                window_start,
+            )
+            try:
+                self.run(window_inputs, **kwargs)
+            except Exception as e:
+                logger.exception("Failed to process window starting %s", window_start)
+                errors[window_start] = e
+        if errors:
+            raise RunManyError(errors, groups) from next(iter(errors.values()))
+        return groups
+
+    def run_chunked(
+        self, inputs: List[str], chunk_size: int, force: bool = False, **kwargs: Any
+    ) -> None:
+        """-----------------------------------------------------------------------------
+        Runs the pipeline on the provided inputs one chunk of records at a time.
+
+        Retrieval, quality management, and saving are done chunk by chunk so that peak
+        memory use is bounded by `chunk_size` rather than by the size of the inputs.
+        Each chunk is saved (and plotted) as its own output dataset. The last record of
+        the previous chunk is prepended while running quality checks so that checks
+        comparing consecutive values (e.g., deltas and monotonicity) also apply across
+        chunk boundaries.
+
+        Inputs must be given in time order and share the same structure. Like with
+        `run()`, inputs already processed are skipped if the storage keeps a manifest of
+        processed inputs. The inputs are recorded once every chunk is saved and plotted.
+
+        Args:
+            inputs (List[str]): A list of input keys that the pipeline's Retriever class
+                can use to load data into the pipeline.
+            chunk_size (int): The maximum number of records to process at once.
+            force (bool): Process the inputs even if the input manifest shows they were
+                already processed. Defaults to False.
+
+        -----------------------------------------------------------------------------"""
+        manifest = self.storage.get_input_manifest()
+        fingerprints, processed = self._check_inputs(manifest, inputs, force)
+        if processed:
+            return
+
+        input_key = ",".join(inputs)
+        plots: "List[Optional[Future[Any]]]" = []
+        overlap: Optional[xr.Dataset] = None
+        chunks = self.retriever.retrieve_chunks(
+            inputs, self.dataset_config, chunk_size=chunk_size, **kwargs
+        )
+        with self._trace_run(inputs):
+            for dataset in chunks:
+                with span("run_chunk"):
+                    set_dataset_size(dataset)
+                    with span("prepare_retrieved_dataset"):
+                        dataset = self.prepare_retrieved_dataset(dataset)
+                    add_inputs_attr(dataset, inputs)
+                    with span("hook_customize_dataset"):
+                        dataset = self.hook_customize_dataset(dataset)
+                    with span("quality"):
+                        dataset, overlap = self._run_chunk_quality(dataset, overlap)
+                    with span("hook_finalize_dataset"):
+                        dataset = self.hook_finalize_dataset(dataset)
+                    with span("decode_cf"):
+                        dataset = normalize_cf_encoding(dataset)
+                    plots.append(self._save_and_plot(dataset, input_key))
+            if manifest is not None:
+                self._record_inputs(manifest, fingerprints, input_key, plots)
+
+    def _run_chunk_quality(
+        self, dataset: xr.Dataset, overlap: Optional[xr.Dataset]
+    ) -> Tuple[xr.Dataset, Optional[xr.Dataset]]:
+        if "time" not in dataset.dims:
+            return self.quality.manage(dataset), None
+        n_overlap = 0
+        if overlap is not None:
+            n_overlap = overlap.sizes["time"]
+            dataset = xr.concat(
+                [overlap, dataset],
+                dim="time",
+                data_vars="minimal",
+                coords="minimal",
+                compat="override",
+                combine_attrs="override",
+            )
+        overlap = dataset.isel(time=slice(-1, None)).copy(deep=True)
+        dataset = self.quality.manage(dataset)
+        return dataset.isel(time=slice(n_overlap, None)), overlap
+
+    def wait_for_background(
+        self, raise_errors: bool = True
+    ) -> Dict[str, BaseException]:
+        """-----------------------------------------------------------------------------
+        Waits for all pending background plotting (see `run()`) to be finished.
+
+        Args:
+            raise_errors (bool): Raise the first error from the background work, if
+                any. Defaults to True.
+
+        Returns:
+            Dict[str, BaseException]: The errors from the background work since the last
+            call, keyed by the run's input keys (joined by ',').
+
+        -----------------------------------------------------------------------------"""
+        background = get_background_tasks()
+        if background is None:
+            return {}
+        background.wait()
+        errors = background.pop_errors()
+        if errors and raise_errors:
+            raise next(iter(errors.values()))
+        return errors
+
+    def _check_inputs(
+        self, manifest: Optional[InputManifest], inputs: List[str], force: bool
+    ) -> Tuple[Dict[str, Optional[str]], bool]:
+        # Returns the fingerprints of the inputs and whether they were all processed
+        # before. The inputs are fingerprinted before reading them, so inputs that
+        # change while being processed are processed again next time
+        if manifest is None:
+            return {}, False
+        fingerprints = manifest.get_fingerprints(inputs)
+        datastream = self.dataset_config.attrs.datastream
+        if not force and manifest.is_processed(datastream, fingerprints):
+            logger.info("Skipping unchanged inputs already processed: %s", inputs)
+            return fingerprints, True
+        return fingerprints, False
+
+    def _record_inputs(
+        self,
+        manifest: InputManifest,
+        fingerprints: Dict[str, Optional[str]],
+        input_key: str,
+        plots: "List[Optional[Future[Any]]]",
+    ) -> None:
+        # Records the inputs in the manifest once all their plots are finished, if none
+        # of them failed. Plots run in the foreground have already succeeded
+        datastream = self.dataset_config.attrs.datastream
+        futures = [plot for plot in plots if plot is not None]
+        background = get_background_tasks()
+        if not futures or background is None:
+            manifest.record(datastream, fingerprints)
+            return
+
+        def record(error: Optional[BaseException]) -> None:
+            if error is None:
+                manifest.record(datastream, fingerprints)
+
+        # Queued behind the plots, so waiting for the background tasks also waits for
+        # the inputs to be recorded
+        background.submit(input_key, _record_when_done, futures, record)
+
+    def _save_and_plot(
+        self, dataset: xr.Dataset, input_key: str, wait: bool = False
+    ) -> "Optional[Future[Any]]":
+        # Returns the future of the plotting task if it was run in the background
+        background = get_background_tasks()
+        if background is None:
+            with span("save_data"):
+                self.storage.save_data(dataset)
+            self._plot(dataset)
+            return None
+
+        # The plot hook gets its own copy of the attrs and encodings, as it runs while
+        # the dataset is being written
+        saved: "Future[bool]" = Future()
+        future = background.submit(
+            input_key, self._plot, dataset.copy(deep=False), saved
+        )
+        run_background = _run_background.get()
+        if run_background is not None:
+            run_background.append(future)
+        try:
+            with span("save_data"):
+                self.storage.save_data(dataset)
+        except BaseException:
+            saved.set_result(False)
+            raise
+        saved.set_result(True)
+        self._ds = dataset
+        if wait:
+            self._wait_for_plots(input_key)
+        return future
+
+    def _wait_for_plots(self, input_key: str) -> None:
+        # Waits for the pending background work and raises this run's plotting error
+        background = get_background_tasks()
+        if background is None:
+            return
+        background.wait()
+        error = background.pop_error(input_key)
+        if error is not None:
+            raise error
+
+    def _plot(self, dataset: xr.Dataset, saved: "Optional[Future[bool]]" = None):
+        try:
+            with self.storage.uploadable_dir() as tmp_dir, span("hook_plot_dataset"):
+                if saved is None:
+                    self._ds = dataset
+                    self._tmp_dir = tmp_dir
+                token = _plotting.set((id(self), dataset, tmp_dir))
+                try:
+                    self.hook_plot_dataset(dataset)
+                finally:
+                    _plotting.reset(token)
+                # Like when running in the foreground, don't upload plots if the data
+                # could not be saved
+                if saved is not None and not saved.result():
+                    raise _NotSaved
+        except _NotSaved:
+            pass
+
     def hook_customize_dataset(self, dataset: xr.Dataset) -> xr.Dataset:
         """-----------------------------------------------------------------------------
         Code hook to customize the retrieved dataset prior to qc being applied.
@@ -80,6 +399,9 @@ class IngestPipeline(Pipeline):
         """-----------------------------------------------------------------------------
         Code hook to create plots for the data which runs after the dataset has been saved.
 
+        With background plotting (see `run()`) this runs while the dataset is saved, so
+        it must not modify the data of the dataset's variables in place.
+
         Args:
             dataset (xr.Dataset): The dataset to plot.
 
@@ -109,3 +431,7 @@ class IngestPipeline(Pipeline):
             root_dir=root_dir,
             **kwargs,
         )
+
+
+class _NotSaved(Exception):
+    pass
@@ -0,0 +1,18 @@
+from datetime import datetime
+from typing import Dict, List
+
+
+class RunManyError(RuntimeError):
+    """Raised by `IngestPipeline.run_many()` once every window was run, if some of the
+    windows failed. Keeps the input keys of every window and the errors of the failed
+    ones, by the start of each window."""
+
+    def __init__(
+        self,
+        errors: Dict[datetime, BaseException],
+        groups: Dict[datetime, List[str]],
+    ):
+        self.errors = errors
+        self.groups = groups
+        failed = ", ".join(start.isoformat() for start in errors)
+        super().__init__(f"{len(errors)} of {len(groups)} windows failed: {failed}")
@@ -1,11 +1,14 @@
+from datetime import datetime
 from typing import Any, Dict, List
 
 import xarray as xr
 from pydantic import BaseModel
 
 from tsdat.io.retrievers import StorageRetriever
-from tsdat.utils import decode_cf
 
+from ...tracing import set_dataset_size, span
+from ...utils import normalize_cf_encoding
+from ..backfill import split_date_range
 from .add_inputs_attr import add_inputs_attr
 from .ingest_pipeline import IngestPipeline
 
@@ -26,13 +29,15 @@ class TransformationPipeline(IngestPipeline):
     parameters: Parameters
     retriever: StorageRetriever
 
-    def run(self, inputs: List[str], **kwargs: Any) -> xr.Dataset:
+    def run(self, inputs: List[str], wait: bool = False, **kwargs: Any) -> xr.Dataset:
         """-----------------------------------------------------------------------------
         Runs the data pipeline on the provided inputs.
 
         Args:
             inputs (List[str]): A 2-element list of start-date, end-date that the
                 pipeline should process.
+            wait (bool): With background plotting (see `IngestPipeline.run()`), wait for
+                the plots to be finished. Defaults to False.
 
         Returns:
             xr.Dataset: The processed dataset.
@@ -52,28 +57,56 @@ class TransformationPipeline(IngestPipeline):
             for datastream in self.parameters.datastreams
         ]
 
-        dataset = self.retriever.retrieve(
-            input_keys,
-            dataset_config=self.dataset_config,
-            storage=self.storage,
-            input_data_hook=self.hook_customize_input_datasets,
-            **kwargs,
-        )
-        add_inputs_attr(dataset, input_keys)
-        dataset = self.prepare_retrieved_dataset(dataset)
-        dataset = self.hook_customize_dataset(dataset)
-        dataset = self.quality.manage(dataset)
-        dataset = self.hook_finalize_dataset(dataset)
-        # HACK: Fix encoding on datetime64 variables. Use a shallow copy to retain units
-        # on datetime64 variables in the pipeline (but remove with decode_cf())
-        dataset = decode_cf(dataset)
-        self.storage.save_data(dataset)
-        with self.storage.uploadable_dir() as tmp_dir:
-            self._ds = dataset
-            self._tmp_dir = tmp_dir
-            self.hook_plot_dataset(dataset)
+        with self._trace_run(input_keys), span("run"):
+            with span("retrieve"):
+                dataset = self.retriever.retrieve(
+                    input_keys,
+                    dataset_config=self.dataset_config,
+                    storage=self.storage,
+                    input_data_hook=self.hook_customize_input_datasets,
+                    **kwargs,
+                )
+            add_inputs_attr(dataset, input_keys)
+            set_dataset_size(dataset)
+            with span("prepare_retrieved_dataset"):
+                dataset = self.prepare_retrieved_dataset(dataset)
+            with span("hook_customize_dataset"):
+                dataset = self.hook_customize_dataset(dataset)
+            with span("quality"):
+                dataset = self.quality.manage(dataset)
+            with span("hook_finalize_dataset"):
+                dataset = self.hook_finalize_dataset(dataset)
+            # HACK: Fix encoding on datetime64 variables. This moves their units from
+            # the attrs into the encoding, in place
+            with span("decode_cf"):
+                dataset = normalize_cf_encoding(dataset)
+            self._save_and_plot(dataset, ",".join(input_keys), wait=wait)
         return dataset
 
+    def run_days(self, start: str, end: str, days: float = 1, **kwargs: Any) -> None:
+        """-----------------------------------------------------------------------------
+        Runs the pipeline once for each consecutive period between two dates.
+
+        Periods are processed in order, and input files read for one period are reused
+        for the next one wherever the padded time ranges overlap (see
+        `StorageRetriever.sliding_window()`), so each input file is only read once.
+
+        Args:
+            start (str): The start date of the first period, formatted as 'YYYYMMDD' or
+                'YYYYMMDD.hhmmss'.
+            end (str): The end date of the last period, in the same format.
+            days (float): The length of each period, in days. Defaults to 1.
+
+        -----------------------------------------------------------------------------"""
+        periods = split_date_range(_parse_date(start), _parse_date(end), days)
+        with self.retriever.sliding_window():
+            for period_start, period_end in periods:
+                inputs = [
+                    period_start.strftime("%Y%m%d.%H%M%S"),
+                    period_end.strftime("%Y%m%d.%H%M%S"),
+                ]
+                self.run(inputs, **kwargs)
+
     def hook_customize_input_datasets(
         self, input_datasets: Dict[str, xr.Dataset], **kwargs: Any
     ) -> Dict[str, xr.Dataset]:
@@ -92,3 +125,7 @@ class TransformationPipeline(IngestPipeline):
 
         -----------------------------------------------------------------------------"""
         return input_datasets
+
+
+def _parse_date(date: str) -> datetime:
+    return datetime.strptime(date, "%Y%m%d.%H%M%S" if "." in date else "%Y%m%d")
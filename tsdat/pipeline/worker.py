@@ -0,0 +1,269 @@
+import json
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .dispatcher import DispatchResult, PipelineDispatcher, _pipelines
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStats(BaseModel):
+    """Latency counters for the input keys routed to one pipeline."""
+
+    count: int = 0
+    failures: int = 0
+    total_seconds: float = 0.0
+    """Total time spent running the pipeline."""
+    max_seconds: float = 0.0
+    last_seconds: float = 0.0
+    max_latency: float = 0.0
+    """The longest time between an input key being queued and it being processed."""
+    last_latency: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+    def add(self, result: DispatchResult, latency: float) -> None:
+        self.count += 1
+        self.failures += result.status == "failed"
+        self.total_seconds += result.seconds
+        self.max_seconds = max(self.max_seconds, result.seconds)
+        self.last_seconds = result.seconds
+        self.max_latency = max(self.max_latency, latency)
+        self.last_latency = latency
+
+
+class PipelineWorker:
+    """---------------------------------------------------------------------------------
+    Long-running service that processes input keys queued in a spool directory.
+
+    Each file placed in the spool directory is a job listing one or more input keys, one
+    per line (blank lines and lines starting with '#' are ignored). To avoid a job being
+    picked up before it is completely written, write it under a name starting with '.'
+    and rename it once done. Jobs are claimed by moving them into the worker's own
+    '.processing/<host>.<pid>' subdirectory, so several workers can share a spool
+    directory, and are moved to 'done' or 'failed' (if any of their input keys failed)
+    afterwards.
+
+    Jobs claimed by a worker that crashed or was killed before finishing them are moved
+    back into the spool directory when a worker on the same host starts.
+
+    Input keys are routed to pipelines with a `PipelineDispatcher`. Instantiated
+    pipelines are kept in memory (in this process, or in each of the worker processes)
+    between jobs, so each input key only costs the data processing itself. When any yaml
+    file in the config directory changes, or on SIGHUP, the worker finishes its current
+    jobs and then reloads the pipelines.
+
+    Per-pipeline latency counters are available through `stats` and are written to
+    'stats.json' in the spool directory after each batch of jobs.
+
+    Args:
+        config_dir (Path): The directory to search for pipeline config files.
+        spool_dir (Path): The directory to read jobs from.
+        pattern (str): Glob pattern used to find pipeline config files.
+        workers (int): The number of worker processes used to run pipelines. With 1
+            (the default) pipelines are run in the current process.
+        poll_interval (float): Seconds to wait between checks for new jobs.
+
+    ---------------------------------------------------------------------------------"""
+
+    def __init__(
+        self,
+        config_dir: Path,
+        spool_dir: Path,
+        pattern: str = "**/pipeline*.yaml",
+        workers: int = 1,
+        poll_interval: float = 1.0,
+    ):
+        self.config_dir = Path(config_dir)
+        self.spool_dir = Path(spool_dir)
+        self.pattern = pattern
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stats: Dict[str, PipelineStats] = {}
+        self.jobs_processed = 0
+        self.reloads = 0
+        self._stop = threading.Event()
+        self._reload = threading.Event()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._config_state = self._get_config_state()
+        self.dispatcher = PipelineDispatcher.from_dir(self.config_dir, self.pattern)
+        for subdir in (".processing", "done", "failed"):
+            (self.spool_dir / subdir).mkdir(parents=True, exist_ok=True)
+        self._claim_dir = (
+            self.spool_dir / ".processing" / f"{socket.gethostname()}.{os.getpid()}"
+        )
+        self._requeue_abandoned_jobs()
+
+    def serve(self) -> None:
+        """Processes jobs until `stop()` is called or the process receives SIGINT or
+        SIGTERM. Jobs that have already been claimed are finished before returning."""
+        self._install_signal_handlers()
+        logger.info(
+            "Serving %d pipelines from %s",
+            len(self.dispatcher.config_paths),
+            self.spool_dir,
+        )
+        try:
+            while not self._stop.is_set():
+                if not self.process_pending():
+                    self._stop.wait(self.poll_interval)
+        finally:
+            self.close()
+
+    def stop(self) -> None:
+        """Asks `serve()` to return once the current jobs are finished."""
+        self._stop.set()
+
+    def reload(self) -> None:
+        """Asks the worker to reload its pipelines before processing more jobs."""
+        self._reload.set()
+
+    def process_pending(self) -> int:
+        """Processes all jobs currently in the spool directory and returns the number of
+        jobs that were processed."""
+        self._reload_if_changed()
+        jobs = self._claim_jobs()
+        if not jobs:
+            return 0
+
+        input_keys = [key for _, keys, _ in jobs for key in keys]
+        results = iter(
+            self.dispatcher.run(
+                input_keys, workers=self.workers, executor=self._get_executor()
+            )
+        )
+        for job, keys, queued_at in jobs:
+            failed = False
+            for _ in keys:
+                result = next(results)
+                failed |= result.status == "failed"
+                name = result.pipeline or "<unmatched>"
+                stats = self.stats.setdefault(name, PipelineStats())
+                stats.add(result, result.finished - queued_at)
+            destination = self.spool_dir / ("failed" if failed else "done") / job.name
+            os.replace(job, destination)
+        self.jobs_processed += len(jobs)
+        self._write_stats()
+        return len(jobs)
+
+    def close(self) -> None:
+        """Shuts down the worker processes, if any."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        try:
+            self._claim_dir.rmdir()
+        except OSError:  # Missing, or holds unfinished jobs
+            pass
+
+    def _claim_jobs(self) -> List[Tuple[Path, List[str], float]]:
+        jobs: List[Tuple[Path, List[str], float]] = []
+        for path in sorted(self.spool_dir.iterdir()):
+            if path.name.startswith(".") or path.name == "stats.json":
+                continue
+            if not path.is_file():
+                continue
+            claimed = self._claim_dir / path.name
+            self._claim_dir.mkdir(exist_ok=True)
+            try:
+                queued_at = path.stat().st_mtime
+                os.replace(path, claimed)
+            except FileNotFoundError:  # Claimed by another worker
+                continue
+            lines = claimed.read_text().splitlines()
+            keys = [k.strip() for k in lines if k.strip() and not k.startswith("#")]
+            jobs.append((claimed, keys, queued_at))
+        return jobs
+
+    def _requeue_abandoned_jobs(self) -> None:
+        # Moves jobs claimed by workers of this host that are no longer running (or by
+        # older versions, which claimed jobs directly into '.processing') back into the
+        # spool directory. Workers on other hosts can't be checked, so their jobs are
+        # left for them to recover.
+        hostname = socket.gethostname()
+        for path in sorted((self.spool_dir / ".processing").iterdir()):
+            if path.is_file():
+                jobs = [path]
+            else:
+                host, _, pid = path.name.rpartition(".")
+                if host != hostname or not pid.isdigit() or _is_running(int(pid)):
+                    continue
+                jobs = sorted(path.iterdir())
+            for job in jobs:
+                logger.warning("Requeueing abandoned job %s", job.name)
+                os.replace(job, self.spool_dir / job.name)
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers > 1 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _get_config_state(self) -> Dict[Path, int]:
+        state: Dict[Path, int] = {}
+        for path in self.config_dir.rglob("*.y*ml"):
+            try:
+                state[path] = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return state
+
+    def _reload_if_changed(self) -> None:
+        state = self._get_config_state()
+        if state == self._config_state and not self._reload.is_set():
+            return
+        logger.info("Reloading pipelines from %s", self.config_dir)
+        self._reload.clear()
+        self._config_state = state
+        self.close()  # Worker processes hold on to the old pipelines
+        _pipelines.clear()
+        self.dispatcher = PipelineDispatcher.from_dir(self.config_dir, self.pattern)
+        self.reloads += 1
+
+    def _write_stats(self) -> None:
+        summary: Dict[str, Any] = {
+            "jobs_processed": self.jobs_processed,
+            "reloads": self.reloads,
+            "pipelines": {
+                name: {**stats.dict(), "mean_seconds": stats.mean_seconds}
+                for name, stats in self.stats.items()
+            },
+        }
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.spool_dir, prefix=".stats", delete=False
+        ) as file:
+            json.dump(summary, file, indent=2)
+        os.replace(file.name, self.spool_dir / "stats.json")
+
+    def _install_signal_handlers(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+        signal.signal(signal.SIGINT, lambda *_: self.stop())
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, lambda *_: self.reload())
+
+
+def _is_running(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # os.kill() would terminate the process
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Running as another user
+    return True
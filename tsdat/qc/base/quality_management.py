@@ -3,6 +3,7 @@ from typing import List
 import xarray as xr
 from pydantic import BaseModel, Extra
 
+from ...tracing import span
 from .quality_manager import QualityManager
 
 
@@ -24,5 +25,6 @@ class QualityManagement(BaseModel, extra=Extra.forbid):
 
         """
         for manager in self.managers:
-            dataset = manager.run(dataset)
+            with span("quality_manager", manager=manager.name):
+                dataset = manager.run(dataset)
         return dataset
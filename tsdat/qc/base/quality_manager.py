@@ -3,6 +3,7 @@ from typing import Callable, Dict, Hashable, List
 import xarray as xr
 from pydantic import BaseModel, Extra
 
+from ...tracing import span
 from .quality_checker import QualityChecker
 from .quality_handler import QualityHandler
 
@@ -42,11 +43,21 @@ class QualityManager(BaseModel, extra=Extra.forbid):
         -----------------------------------------------------------------------------"""
         variables = self._get_variables_to_run(dataset)
         for variable_name in variables:
-            issues = self.checker.run(dataset, variable_name)
+            with span(
+                "quality_checker",
+                checker=self.checker.__repr_name__(),
+                variable=variable_name,
+            ):
+                issues = self.checker.run(dataset, variable_name)
             if issues is None:
                 continue
             for handler in self.handlers:
-                dataset = handler.run(dataset, variable_name, issues)
+                with span(
+                    "quality_handler",
+                    handler=handler.__repr_name__(),
+                    variable=variable_name,
+                ):
+                    dataset = handler.run(dataset, variable_name, issues)
         return dataset
 
     def _get_variables_to_run(self, dataset: xr.Dataset) -> List[str]:
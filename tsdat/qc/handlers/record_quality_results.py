@@ -5,7 +5,6 @@ import numpy as np
 import xarray as xr
 from numpy.typing import NDArray
 from pydantic import BaseModel, Extra, root_validator, validator
-import act
 
 from ..base import QualityHandler
 
@@ -59,6 +58,7 @@ class RecordQualityResults(QualityHandler):
         variable_name: str,
         failures: NDArray[np.bool_],
     ) -> xr.Dataset:
+        import act  # type: ignore # noqa: F401 (registers the 'qcfilter' accessor)
 
         dataset.qcfilter.add_test(
             variable_name,
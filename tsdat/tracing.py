@@ -0,0 +1,407 @@
+"""-------------------------------------------------------------------------------------
+Timing spans for the stages of tsdat pipelines.
+
+Pipelines wrap each stage (retrieval, preparing the dataset, each QualityManager, each
+DataConverter, DataReader and DataWriter call, saving, plotting, etc.) in a `span()`.
+When a span finishes a `SpanRecord` is sent to every registered sink, together with the
+context of the current pipeline run (the pipeline, input key, and datastream). Tracing
+is off until a sink is added, in which case `span()` returns a shared no-op object, so
+the instrumentation costs a single check per stage.
+
+Sinks can be added in code with `add_sink()`, or through the ``TSDAT_TRACE`` environment
+variable, a comma-separated list of ``log`` (log each span at INFO level) and
+``jsonl:<path>`` (append each span as a line of JSON to the file).
+
+Spans can also record how much memory each stage uses, to help track down out-of-memory
+failures and redundant copies of large arrays. This is off by default because tracing
+allocations with `tracemalloc` slows Python down considerably. Turn it on with
+`enable_memory_profiling()` or by setting ``TSDAT_TRACE_MEMORY`` to the threshold to use.
+Stages that allocate more than `threshold` times the size of the dataset being processed
+are logged as warnings, even if no sinks are registered. Note that tracemalloc counts the
+allocations of the whole process and has a single peak counter, which each span resets
+(`tracemalloc.reset_peak()`). Spans running at the same time in other threads (e.g.,
+background plotting) therefore inflate each other's peaks.
+
+-------------------------------------------------------------------------------------"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    import xarray as xr
+
+__all__ = [
+    "CallbackSink",
+    "JsonLinesSink",
+    "LoggingSink",
+    "SpanRecord",
+    "TraceSink",
+    "add_sink",
+    "clear_sinks",
+    "disable_memory_profiling",
+    "enable_memory_profiling",
+    "is_enabled",
+    "remove_sink",
+    "set_dataset_size",
+    "span",
+    "trace_context",
+]
+
+logger = logging.getLogger(__name__)
+
+
+class SpanRecord(NamedTuple):
+    """A finished span."""
+
+    name: str
+    path: str
+    """The names of the enclosing spans and this one, joined by '/'."""
+    start: float
+    """When the span started, in seconds since the epoch."""
+    seconds: float
+    context: Dict[str, Any]
+    """The context of the pipeline run, e.g., the pipeline, input_key, and datastream."""
+    attrs: Dict[str, Any]
+    """Details about the span itself, e.g., the class of the QualityManager that ran."""
+    error: Optional[str] = None
+    """The name of the exception raised inside the span, if any."""
+    memory: Optional[Dict[str, Any]] = None
+    """Memory used by the span if memory profiling is enabled (sizes in bytes):
+    'allocated' (net change in memory allocated by Python), 'peak' (the most memory
+    allocated at once above the starting point), 'rss_peak' (the peak resident set size
+    of the process), 'dataset_nbytes' (the size of the dataset being processed, if
+    known), and 'flagged' (True if 'peak' exceeded the threshold)."""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class TraceSink(ABC):
+    """Base class for objects that receive finished spans."""
+
+    @abstractmethod
+    def emit(self, record: SpanRecord) -> None: ...
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesSink(TraceSink):
+    """Appends each span to a file as a single line of JSON."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", buffering=1)
+        self._lock = threading.Lock()
+
+    def emit(self, record: SpanRecord) -> None:
+        line = json.dumps(record.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class LoggingSink(TraceSink):
+    """Logs each span as a single message."""
+
+    def __init__(self, logger_name: str = __name__, level: int = logging.INFO):
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def emit(self, record: SpanRecord) -> None:
+        context = " ".join(f"{k}={v}" for k, v in record.context.items())
+        attrs = " ".join(f"{k}={v}" for k, v in record.attrs.items())
+        self.logger.log(
+            self.level,
+            "%s took %.4fs %s %s",
+            record.path,
+            record.seconds,
+            attrs,
+            context,
+        )
+
+
+class CallbackSink(TraceSink):
+    """Calls a function with each span."""
+
+    def __init__(self, callback: Callable[[SpanRecord], Any]):
+        self.callback = callback
+
+    def emit(self, record: SpanRecord) -> None:
+        self.callback(record)
+
+
+_sinks: List[TraceSink] = []
+_memory_threshold: Optional[float] = None
+_memory_min_bytes = 0
+_started_tracemalloc = False  # Whether tracemalloc was started by tsdat
+# Spans currently tracking memory in this thread/context, innermost last
+_memory_spans: ContextVar[Tuple["_Span", ...]] = ContextVar(
+    "tsdat_memory_spans", default=()
+)
+_context: ContextVar[Dict[str, Any]] = ContextVar("tsdat_trace_context", default={})
+_path: ContextVar[Tuple[str, ...]] = ContextVar("tsdat_trace_path", default=())
+
+
+def add_sink(sink: TraceSink) -> TraceSink:
+    """Registers a sink to receive all spans and returns it."""
+    _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink: TraceSink) -> None:
+    """Unregisters and closes a sink."""
+    if sink in _sinks:
+        _sinks.remove(sink)
+        sink.close()
+
+
+def clear_sinks() -> None:
+    """Unregisters and closes all sinks, turning tracing off."""
+    for sink in list(_sinks):
+        remove_sink(sink)
+
+
+def is_enabled() -> bool:
+    """Returns True if any sinks are registered or memory profiling is enabled."""
+    return bool(_sinks) or _memory_threshold is not None
+
+
+def enable_memory_profiling(threshold: float = 2.0, min_bytes: int = 1024**2) -> None:
+    """-----------------------------------------------------------------------------
+    Records the memory used by each span and flags spans that use too much.
+
+    Args:
+        threshold (float): Spans whose peak Python memory allocation exceeds this
+            multiple of the dataset size (see `set_dataset_size()`) are logged as
+            warnings. Defaults to 2.0.
+        min_bytes (int): Spans that allocate less than this many bytes are never
+            flagged, to avoid noise from small datasets. Defaults to 1 MB.
+
+    -----------------------------------------------------------------------------"""
+    global _memory_threshold, _memory_min_bytes, _started_tracemalloc
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _memory_threshold = threshold
+    _memory_min_bytes = min_bytes
+
+
+def disable_memory_profiling() -> None:
+    """Stops recording memory use, and stops tracemalloc if it was started by
+    `enable_memory_profiling()`."""
+    global _memory_threshold, _started_tracemalloc
+    _memory_threshold = None
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+def set_dataset_size(dataset: "xr.Dataset") -> None:
+    """Records the size of the dataset being processed in the current trace context:
+    'dataset_nbytes', which is used to flag spans that allocate much more memory than
+    the data they work on, and 'dataset_rows', the length of its time dimension."""
+    if is_enabled():
+        _context.set(
+            {
+                **_context.get(),
+                "dataset_nbytes": dataset.nbytes,
+                "dataset_rows": dataset.sizes.get("time"),
+            }
+        )
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = (
+        "name",
+        "attrs",
+        "_start",
+        "_perf_start",
+        "_token",
+        "_memory_start",
+        "_memory_peak",
+        "_memory_token",
+        "_rss_start",
+    )
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self._memory_start: Optional[int] = None
+
+    def __enter__(self) -> "_Span":
+        self._token = _path.set(_path.get() + (self.name,))
+        if _memory_threshold is not None and tracemalloc.is_tracing():
+            self._start_memory()
+        self._start = time.time()
+        self._perf_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        seconds = time.perf_counter() - self._perf_start
+        memory = self._stop_memory() if self._memory_start is not None else None
+        path = "/".join(_path.get())
+        _path.reset(self._token)
+        record = SpanRecord(
+            name=self.name,
+            path=path,
+            start=self._start,
+            seconds=seconds,
+            context=_context.get(),
+            attrs=self.attrs,
+            error=None if exc_type is None else exc_type.__name__,
+            memory=memory,
+        )
+        if memory is not None and memory["flagged"]:
+            logger.warning(
+                "%s allocated up to %.1f MB, %.1fx the size of the dataset (%s)",
+                path,
+                memory["peak"] / 1024**2,
+                memory["peak"] / memory["dataset_nbytes"],
+                " ".join(f"{k}={v}" for k, v in self.attrs.items()),
+            )
+        for sink in list(_sinks):
+            try:
+                sink.emit(record)
+            except Exception:
+                logger.exception("Trace sink %s failed", sink)
+
+    def _start_memory(self) -> None:
+        # tracemalloc has a single peak counter, so it is reset for each span and the
+        # peaks of inner spans are passed on to the spans enclosing them
+        current, peak = tracemalloc.get_traced_memory()
+        spans = _memory_spans.get()
+        if spans:
+            parent = spans[-1]
+            parent._memory_peak = max(parent._memory_peak, peak)
+        tracemalloc.reset_peak()
+        self._memory_start = self._memory_peak = current
+        self._rss_start = _get_peak_rss()
+        self._memory_token = _memory_spans.set(spans + (self,))
+
+    def _stop_memory(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self._memory_peak)
+        _memory_spans.reset(self._memory_token)
+        spans = _memory_spans.get()
+        if spans:
+            parent = spans[-1]
+            parent._memory_peak = max(parent._memory_peak, peak)
+        start: int = self._memory_start  # type: ignore
+        rss_peak = _get_peak_rss()
+        dataset_nbytes = _context.get().get("dataset_nbytes")
+        peak_used = peak - start
+        return {
+            "allocated": current - start,
+            "peak": peak_used,
+            "rss_peak": rss_peak,
+            "rss_peak_increase": (
+                None if rss_peak is None else rss_peak - self._rss_start  # type: ignore
+            ),
+            "dataset_nbytes": dataset_nbytes,
+            "flagged": bool(
+                dataset_nbytes
+                and _memory_threshold is not None
+                and peak_used >= _memory_min_bytes
+                and peak_used > _memory_threshold * dataset_nbytes
+            ),
+        }
+
+
+def span(name: str, /, **attrs: Any) -> Union[_Span, _NoopSpan]:
+    """-----------------------------------------------------------------------------
+    Times the code inside a `with` block and sends the result to the registered sinks.
+
+    Args:
+        name (str): The name of the stage, e.g., 'retrieve' or 'quality_manager'.
+        **attrs: Details about this stage, e.g., the name of the QualityManager.
+
+    Returns:
+        A context manager. If tracing is off it does nothing.
+
+    -----------------------------------------------------------------------------"""
+    if not _sinks and _memory_threshold is None:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+class _TraceContext:
+    __slots__ = ("context", "_token")
+
+    def __init__(self, context: Dict[str, Any]):
+        self.context = context
+
+    def __enter__(self) -> "_TraceContext":
+        self._token = _context.set({**_context.get(), **self.context})
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        _context.reset(self._token)
+
+
+def trace_context(**context: Any) -> Union[_TraceContext, _NoopSpan]:
+    """Adds the keyword arguments to the context of all spans finished inside the
+    `with` block (e.g., the input_key and datastream of a pipeline run)."""
+    if not _sinks and _memory_threshold is None:
+        return _NOOP
+    return _TraceContext(context)
+
+
+def _get_peak_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024  # KB on Linux
+
+
+def _configure_from_env() -> None:
+    for sink in filter(None, os.environ.get("TSDAT_TRACE", "").split(",")):
+        sink = sink.strip()
+        if sink == "log":
+            add_sink(LoggingSink())
+        elif sink.startswith("jsonl:"):
+            add_sink(JsonLinesSink(sink[len("jsonl:") :]))
+        else:
+            logger.warning("Ignoring unknown TSDAT_TRACE sink '%s'", sink)
+    if threshold := os.environ.get("TSDAT_TRACE_MEMORY"):
+        enable_memory_profiling(float(threshold))
+
+
+_configure_from_env()
@@ -17,6 +17,7 @@ from .get_start_date_and_time_str import (
 )
 from .get_start_time import get_start_time as get_start_time
 from .model_to_dict import model_to_dict as model_to_dict
+from .normalize_cf_encoding import normalize_cf_encoding as normalize_cf_encoding
 from .parameterized_class import ParameterizedClass as ParameterizedClass
 from .record_corrections_applied import (
     record_corrections_applied as record_corrections_applied,
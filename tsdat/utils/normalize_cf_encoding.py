@@ -0,0 +1,128 @@
+from typing import Any, Hashable, List
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from .decode_cf import decode_cf
+
+_TIME_UNITS = {
+    "days",
+    "hours",
+    "minutes",
+    "seconds",
+    "milliseconds",
+    "microseconds",
+    "nanoseconds",
+}
+_DECODED_ATTRS = {
+    "scale_factor",
+    "add_offset",
+    "_Unsigned",
+    "_Encoding",
+    "calendar",
+    "coordinates",
+    "dtype",
+}
+
+
+def normalize_cf_encoding(dataset: xr.Dataset) -> xr.Dataset:
+    """---------------------------------------------------------------------------------
+    Targeted, in-place equivalent of `tsdat.utils.decode_cf()` for datasets that were
+    built in memory, e.g., by a pipeline.
+
+    Rather than running `xarray.decode_cf()` over every variable (which wraps each one
+    in a lazily-decoded copy), this only fixes what that would have changed:
+
+    * Units on datetime64 variables are moved from attrs to the encoding and the
+      'dtype' encoding is removed from them.
+    * '_FillValue' entries already in the encoding are removed, and '_FillValue' and
+      'missing_value' attrs are moved to the encoding. Values equal to them are masked
+      with NaN (in place for floating point data, integer data is converted to float
+      like xarray does).
+    * The original dtype is recorded in the encoding of other variables.
+
+    Datasets with variables that actually need decoding (e.g., packed or character
+    data, or numeric times) are passed to `tsdat.utils.decode_cf()` instead.
+
+    Args:
+        dataset (xr.Dataset): The dataset to normalize. It is modified in place.
+
+    Returns:
+        xr.Dataset: The normalized dataset.
+
+    ---------------------------------------------------------------------------------"""
+    if any(
+        _needs_decoding(name, var, dataset) for name, var in dataset.variables.items()
+    ):
+        return decode_cf(dataset)
+
+    for variable in dataset.variables.values():
+        variable.encoding.pop("_FillValue", None)  # type: ignore
+        if variable.dtype.kind in "mM":
+            # See decode_cf() for why datetimes need this, other variables like these
+            # are left unchanged by xarray.decode_cf()
+            if variable.dtype.kind == "M":
+                if "units" in variable.attrs:
+                    variable.encoding["units"] = variable.attrs.pop("units")  # type: ignore
+                variable.encoding.pop("dtype", None)  # type: ignore
+            continue
+
+        original_dtype = variable.dtype
+        fill_values = _pop_fill_values(variable)
+        if fill_values:
+            _mask(variable, fill_values)
+        variable.encoding.setdefault("dtype", original_dtype)  # type: ignore
+    return dataset
+
+
+def _needs_decoding(name: Hashable, variable: xr.Variable, dataset: xr.Dataset) -> bool:
+    kind = variable.dtype.kind
+    if kind in "mM":
+        return False
+    if kind in "OS" or not variable.dtype.isnative:
+        return True
+    if _DECODED_ATTRS.intersection(variable.attrs):
+        return True
+    units = variable.attrs.get("units")
+    if units is not None and ("since" in str(units) or str(units) in _TIME_UNITS):
+        return True
+    if "_FillValue" in variable.attrs or "missing_value" in variable.attrs:
+        # Masked values are only handled here for plain numeric numpy data
+        if kind not in "iuf" or not isinstance(variable.data, np.ndarray):
+            return True
+        if name in dataset.indexes:
+            return True
+    return False
+
+
+def _pop_fill_values(variable: xr.Variable) -> List[Any]:
+    fill_values: List[Any] = []
+    for attr in ("missing_value", "_FillValue"):
+        if attr not in variable.attrs:
+            continue
+        value = variable.attrs.pop(attr)
+        if value is None:
+            continue
+        values = [v for v in np.ravel(value) if not pd.isnull(v)]
+        if not values and variable.dtype.kind in "iu":
+            continue  # xarray drops these, with a warning
+        variable.encoding[attr] = value  # type: ignore
+        fill_values.extend(values)
+    return fill_values
+
+
+def _mask(variable: xr.Variable, fill_values: List[Any]) -> None:
+    data: np.ndarray = variable.data  # type: ignore
+    mask = np.isin(data, fill_values)
+    if data.dtype.kind == "f":
+        if not mask.any():
+            return
+        if not data.flags.writeable:
+            data = data.copy()
+        np.putmask(data, mask, np.nan)
+    else:
+        dtype = np.float32 if data.dtype.itemsize <= 2 else np.float64
+        data = data.astype(dtype)
+        np.putmask(data, mask, np.nan)
+    variable.data = data